@@ -0,0 +1,371 @@
+"""
+Run full DKG ceremonies in one process and report how they scale with the party size.
+
+The client `DKG` talks to one node app per party member through an ASGI transport. Every node
+runs the real DKG router and is told apart by `NodeSettingsMiddleware`. The nodes share in-memory
+repositories, whose keys are already prefixed with the node id. For every (party size, threshold)
+the benchmark reports:
+
+- the wall time of each round,
+- the request and response bytes of each round,
+- the mean and max per-node CPU time of each round, split into crypto (FROST and signing),
+  signature verification, share encryption and serialization. Serialization also covers the
+  rest of the handler: pydantic, canonical encoding and repository access.
+
+Signature verification runs inline on the handler thread, so its CPU is charged to the node.
+
+    python -m benchmarks.dkg_benchmark [--sizes 3,5,10,25,50,100] [--thresholds 0.5,1] [--repeat 3]
+        [--output dkg_benchmark.json] [--baseline baseline.json] [--tolerance 0.1]
+    python -m benchmarks.dkg_benchmark --results dkg_benchmark.json --baseline baseline.json
+
+With `--baseline` the results are compared with a saved run. The exit status is 1 when a wall
+time, CPU time or payload size grew by more than `--tolerance`.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from frost_lib import secp256k1_tr
+
+import zexfrost.node.dkg as node_dkg
+import zexfrost.node.router.dkg as dkg_routes
+from zexfrost.client.dkg import DKG
+from zexfrost.compression import ContentEncoding
+from zexfrost.custom_types import Node
+from zexfrost.key import Key
+from zexfrost.node.party import set_party
+from zexfrost.node.repository import (
+    set_broadcast_repository,
+    set_dkg_repository,
+    set_key_repository,
+    set_share_repository,
+)
+from zexfrost.node.router import dkg_router
+from zexfrost.node.router.utils import NodeSettingsMiddleware
+from zexfrost.node.settings import NodeSettings, get_node_settings
+from zexfrost.repository import MemoryRepository
+from zexfrost.utils import batch_verify_data, get_curve
+
+ROUNDS = ("round1", "round2", "round3")
+CATEGORIES = ("crypto", "verification", "encryption", "serialization")
+
+_round: ContextVar[str] = ContextVar("benchmark_round", default="")
+
+
+class _InlineExecutor(Executor):
+    def map(self, fn: Callable, *iterables: Iterable, timeout: float | None = None, chunksize: int = 1):  # type: ignore[override]
+        return map(fn, *iterables)
+
+
+class CpuRecorder:
+    """Thread CPU time per (node, round, category) of the node handlers."""
+
+    def __init__(self):
+        self.samples: dict[tuple[str, str, str], float] = defaultdict(float)
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    def _add(self, category: str, elapsed: float) -> None:
+        # dict item updates are atomic under the GIL.
+        self.samples[(get_node_settings().ID, _round.get(), category)] += elapsed
+
+    def timed(self, category: str, fn: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(category, time.thread_time() - start)
+
+        return wrapper
+
+    def handler(self, round: str, fn: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            token = _round.set(round)
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add("total", time.thread_time() - start)
+                _round.reset(token)
+
+        return wrapper
+
+    def node_cpu(self, node_ids: list[str], round: str) -> dict[str, dict[str, float]]:
+        per_node = []
+        for node_id in node_ids:
+            total = self.samples[(node_id, round, "total")]
+            split = {category: self.samples[(node_id, round, category)] for category in CATEGORIES[:-1]}
+            split["serialization"] = max(0.0, total - sum(split.values()))
+            split["total"] = total
+            per_node.append(split)
+        return {
+            "mean": {key: statistics.fmean(node[key] for node in per_node) for key in per_node[0]},
+            "max": {key: max(node[key] for node in per_node) for key in per_node[0]},
+        }
+
+
+def instrument(recorder: CpuRecorder) -> None:
+    node_dkg.call_curve = recorder.timed("crypto", node_dkg.call_curve)
+    node_dkg.single_sign_data = recorder.timed("crypto", node_dkg.single_sign_data)
+    node_dkg.map_call = recorder.timed("encryption", node_dkg.map_call)
+    node_dkg.batch_verify = recorder.timed(
+        "verification", lambda items: batch_verify_data(items, executor=_InlineExecutor())
+    )
+    dkg_routes._round1 = recorder.handler("round1", dkg_routes._round1)
+    dkg_routes._round2 = recorder.handler("round2", dkg_routes._round2)
+    dkg_routes._round3 = recorder.handler("round3", dkg_routes._round3)
+
+
+def _request_round(path: str) -> str:
+    if "round1" in path:
+        return "round1"
+    if "round2/status" in path or "round3" in path:
+        return "round3"
+    return "round2"
+
+
+class PartyTransport(httpx.AsyncBaseTransport):
+    """Routes each request to the node app of its host and counts the bytes per round."""
+
+    def __init__(self, apps: dict[str, Any]):
+        self.transports = {host: httpx.ASGITransport(app=app) for host, app in apps.items()}
+        self.request_bytes: dict[str, int] = defaultdict(int)
+        self.response_bytes: dict[str, int] = defaultdict(int)
+
+    def reset(self) -> None:
+        self.request_bytes.clear()
+        self.response_bytes.clear()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        round = _request_round(request.url.path)
+        self.request_bytes[round] += len(await request.aread())
+        response = await self.transports[request.url.host].handle_async_request(request)
+        content = await response.aread()
+        self.response_bytes[round] += len(content)
+        return httpx.Response(response.status_code, headers=response.headers, content=content)
+
+
+def build_party(size: int) -> tuple[tuple[Node, ...], dict[str, Any]]:
+    curve = get_curve("secp256k1")
+    app = FastAPI()
+    app.include_router(dkg_router)
+    party = []
+    apps = {}
+    for index in range(1, size + 1):
+        settings = NodeSettings(ID=f"{index:064x}", PRIVATE_KEY=curve.keypair_new().signing_key)
+        host = f"node{index}"
+        party.append(
+            Node(
+                id=settings.ID,
+                host=f"http://{host}",
+                port=80,
+                public_key=Key(settings.CURVE_NAME, settings.PRIVATE_KEY).public_key,
+            )
+        )
+        apps[host] = NodeSettingsMiddleware(app, settings)
+    return tuple(party), apps
+
+
+async def ceremony(
+    party: tuple[Node, ...],
+    min_signers: int,
+    client: httpx.AsyncClient,
+    compression: ContentEncoding | None,
+) -> dict[str, float]:
+    dkg = DKG(
+        curve=secp256k1_tr,
+        party=party,
+        max_signers=len(party),
+        min_singers=min_signers,
+        repository=MemoryRepository(),
+        http_client=client,
+        timeout=600,
+        compression=compression,
+    )
+    walls = {}
+    start = time.perf_counter()
+    round1_result = await dkg.round1()
+    walls["round1"] = time.perf_counter() - start
+    start = time.perf_counter()
+    round2_result = await dkg.round2(round1_result)
+    walls["round2"] = time.perf_counter() - start
+    start = time.perf_counter()
+    await dkg.round3(round2_result)
+    walls["round3"] = time.perf_counter() - start
+    return walls
+
+
+def _median_dict(samples: list[dict[str, Any]]) -> dict[str, Any]:
+    result: dict[str, Any] = {}
+    for key, value in samples[0].items():
+        if isinstance(value, dict):
+            result[key] = _median_dict([sample[key] for sample in samples])
+        else:
+            result[key] = statistics.median(sample[key] for sample in samples)
+    return result
+
+
+async def bench(
+    party: tuple[Node, ...],
+    min_signers: int,
+    repeat: int,
+    client: httpx.AsyncClient,
+    transport: PartyTransport,
+    recorder: CpuRecorder,
+    compression: ContentEncoding | None,
+) -> dict[str, Any]:
+    node_ids = [node.id for node in party]
+    runs = []
+    for _ in range(repeat):
+        transport.reset()
+        recorder.reset()
+        walls = await ceremony(party, min_signers, client, compression)
+        runs.append(
+            {
+                round: {
+                    "wall_s": walls[round],
+                    "request_bytes": transport.request_bytes[round],
+                    "response_bytes": transport.response_bytes[round],
+                    "node_cpu_s": recorder.node_cpu(node_ids, round),
+                }
+                for round in ROUNDS
+            }
+        )
+    rounds = _median_dict(runs)
+    return {
+        "party_size": len(party),
+        "min_signers": min_signers,
+        "rounds": rounds,
+        "total_wall_s": sum(rounds[round]["wall_s"] for round in ROUNDS),
+    }
+
+
+def configurations(sizes: list[int], thresholds: list[float]) -> list[tuple[int, int]]:
+    result = []
+    for size in sizes:
+        for threshold in thresholds:
+            min_signers = max(2, min(size, math.ceil(threshold * size)))
+            if (size, min_signers) not in result:
+                result.append((size, min_signers))
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    sizes = [int(size) for size in args.sizes.split(",")]
+    thresholds = [float(threshold) for threshold in args.thresholds.split(",")]
+    party, apps = build_party(max(sizes))
+    set_party(party)
+    set_dkg_repository(MemoryRepository())
+    set_key_repository(MemoryRepository())
+    set_broadcast_repository(MemoryRepository())
+    set_share_repository(MemoryRepository())
+    recorder = CpuRecorder()
+    instrument(recorder)
+    transport = PartyTransport(apps)
+    results = []
+    async with httpx.AsyncClient(transport=transport, limits=httpx.Limits(max_connections=None)) as client:
+        for size, min_signers in configurations(sizes, thresholds):
+            result = await bench(party[:size], min_signers, args.repeat, client, transport, recorder, args.compression)
+            print_result(result)
+            results.append(result)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "compression": args.compression,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def print_result(result: dict[str, Any]) -> None:
+    rounds = result["rounds"]
+    print(  # noqa: T201
+        f"n={result['party_size']:<4} t={result['min_signers']:<4}",
+        " ".join(
+            f"{round}: {rounds[round]['wall_s'] * 1e3:.1f}ms "
+            f"{(rounds[round]['request_bytes'] + rounds[round]['response_bytes']) / 1024:.1f}KiB "
+            f"cpu/node {rounds[round]['node_cpu_s']['mean']['total'] * 1e3:.1f}ms"
+            for round in ROUNDS
+        ),
+    )
+
+
+def _metrics(result: dict[str, Any]) -> dict[str, float]:
+    metrics = {"total_wall_s": result["total_wall_s"]}
+    for round, data in result["rounds"].items():
+        metrics[f"{round}.wall_s"] = data["wall_s"]
+        metrics[f"{round}.bytes"] = data["request_bytes"] + data["response_bytes"]
+        metrics[f"{round}.node_cpu_s"] = data["node_cpu_s"]["mean"]["total"]
+    return metrics
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> bool:
+    """Print the change of every metric against the baseline. Returns False on a regression."""
+    baseline_results = {(result["party_size"], result["min_signers"]): result for result in baseline["results"]}
+    ok = True
+    for result in current["results"]:
+        key = (result["party_size"], result["min_signers"])
+        if key not in baseline_results:
+            print(f"n={key[0]} t={key[1]}: not in baseline")  # noqa: T201
+            continue
+        base_metrics = _metrics(baseline_results[key])
+        for name, value in _metrics(result).items():
+            base = base_metrics.get(name)
+            if not base:
+                continue
+            change = value / base - 1
+            regressed = change > tolerance
+            ok = ok and not regressed
+            print(  # noqa: T201
+                f"n={key[0]:<4} t={key[1]:<4} {name:<20} {base:>14.6g} -> {value:<14.6g} {change:+7.1%}"
+                + ("  REGRESSION" if regressed else "")
+            )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="3,5,10,25,50,100")
+    parser.add_argument("--thresholds", default="0.5,1", help="min_signers as fractions of the party size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compression", choices=["gzip", "zstd"], default=None)
+    parser.add_argument("--output", default="dkg_benchmark.json")
+    parser.add_argument("--results", help="compare a saved result file instead of running the benchmark")
+    parser.add_argument("--baseline", help="result file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as file:
+            current = json.load(file)
+    else:
+        current = asyncio.run(run(args))
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if not compare(current, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare the size and speed of the round-2 share envelopes.
+
+    python -m benchmarks.encryption_benchmark [--count 1000]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from zexfrost.utils import decrypt, encrypt
+
+# Shaped like a secp256k1 DKGPart2Package.
+PACKAGE = {
+    "header": {"version": 0, "ciphersuite": "FROST-secp256k1-SHA256-TR-v1"},
+    "signing_share": os.urandom(32).hex(),
+}
+
+
+def bench(version: str, count: int) -> dict[str, float]:
+    key = os.urandom(32)
+    data = json.dumps(PACKAGE, sort_keys=True, separators=(",", ":"))
+    start = time.perf_counter()
+    tokens = [encrypt(data, key, version) for _ in range(count)]
+    encrypted = time.perf_counter()
+    for token in tokens:
+        decrypt(token, key)
+    decrypted = time.perf_counter()
+    return {
+        "plaintext_bytes": len(data),
+        "envelope_bytes": len(tokens[0]),
+        "encrypt_us": (encrypted - start) / count * 1e6,
+        "decrypt_us": (decrypted - encrypted) / count * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+    for version in ("v1", "v2"):
+        result = bench(version, args.count)
+        print(version, " ".join(f"{name}={value:.1f}" for name, value in result.items()))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
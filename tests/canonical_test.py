@@ -0,0 +1,13 @@
+import json
+
+from zexfrost.canonical import canonical_bytes
+
+
+def test_canonical_bytes_matches_json_dumps():
+    data = {
+        "package": {"header": {"version": 0, "ciphersuite": "FROST-secp256k1"}, "commitment": ["02ab", "03cd"]},
+        "temp_public_key": "02ef",
+        "name": "nöde",
+        "weights": (1, 2.5, None, True),
+    }
+    assert canonical_bytes(data) == json.dumps(data, sort_keys=True).encode("utf-8")
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from frost_lib import secp256k1_tr
+
+from zexfrost.client.custom_types import DKGJob
+from zexfrost.client.dkg import DKG
+from zexfrost.client.dkg_scheduler import DKGScheduler
+from zexfrost.custom_types import Node
+from zexfrost.repository import MemoryRepository
+
+nodes = tuple(
+    Node(id=f"{i:064x}", host="http://localhost", port=2020 + i, public_key="00")  # type: ignore
+    for i in range(1, 5)
+)
+
+
+class FakeDKG(DKG):
+    running: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def run(self):
+        for node in self.party:
+            self.running[node.id] = self.running.get(node.id, 0) + 1
+            self.peak[node.id] = max(self.peak.get(node.id, 0), self.running[node.id])
+        await asyncio.sleep(0.01)
+        for node in self.party:
+            self.running[node.id] -= 1
+        if self.max_signers == 0:
+            raise ValueError("bad job")
+        return None
+
+
+@pytest.mark.asyncio
+async def test_dkg_scheduler_caps_node_load():
+    scheduler = DKGScheduler(secp256k1_tr, MemoryRepository(), max_concurrency=8, max_per_node=2, dkg_class=FakeDKG)
+    jobs = [DKGJob(party=(nodes[i % 4], nodes[(i + 1) % 4]), max_signers=2, min_signers=2) for i in range(20)]
+    jobs.append(DKGJob(party=nodes[:2], max_signers=0, min_signers=0))
+    results = await scheduler.run(jobs)
+    await scheduler.aclose()
+
+    assert all(result.error is None for result in results[:-1])
+    assert results[-1].error is not None
+    assert all(result.latency > 0 for result in results)
+    assert max(FakeDKG.peak.values()) == 2
+
+
+class OrderedDKG(DKG):
+    started: list[tuple[str, ...]] = []
+
+    async def run(self):
+        self.started.append(tuple(node.id for node in self.party))
+        await asyncio.sleep(0.01)
+        return None
+
+
+@pytest.mark.asyncio
+async def test_dkg_scheduler_job_waiting_for_a_node_does_not_hold_a_global_slot():
+    OrderedDKG.started = []
+    scheduler = DKGScheduler(secp256k1_tr, MemoryRepository(), max_concurrency=2, max_per_node=1, dkg_class=OrderedDKG)
+    busy = DKGJob(party=nodes[:2], max_signers=2, min_signers=2)
+    other = DKGJob(party=nodes[2:], max_signers=2, min_signers=2)
+    # The second job waits for the nodes of the first; the third one must not wait behind it.
+    await asyncio.gather(scheduler.run_job(busy), scheduler.run_job(busy), scheduler.run_job(other))
+    await scheduler.aclose()
+
+    parties = [tuple(node.id for node in job.party) for job in (busy, other, busy)]
+    assert OrderedDKG.started == parties
+
+
+class GatedDKG(DKG):
+    other_started: asyncio.Event
+
+    async def run(self):
+        if self.party == nodes[2:]:
+            self.other_started.set()
+        else:
+            # Finishes only once the job on the idle nodes got a worker.
+            await asyncio.wait_for(self.other_started.wait(), 1)
+        return None
+
+
+@pytest.mark.asyncio
+async def test_dkg_scheduler_run_does_not_block_workers_on_busy_nodes():
+    GatedDKG.other_started = asyncio.Event()
+    scheduler = DKGScheduler(secp256k1_tr, MemoryRepository(), max_concurrency=2, max_per_node=1, dkg_class=GatedDKG)
+    busy = DKGJob(party=nodes[:2], max_signers=2, min_signers=2)
+    other = DKGJob(party=nodes[2:], max_signers=2, min_signers=2)
+    results = await scheduler.run([busy, busy, other])
+    await scheduler.aclose()
+
+    assert [result.job for result in results] == [busy, busy, other]
+    assert all(result.error is None for result in results)
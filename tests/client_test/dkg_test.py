@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from frost_lib import secp256k1_tr
+
+from zexfrost.client.dkg import DKG, BaseDKG
+from zexfrost.custom_types import DKGRound1NodeResponse, DKGRound2EncryptedPackage, NodeID
+from zexfrost.node.repository import get_key_repository
+from zexfrost.repository import MemoryRepository
+
+from ..node_test.dkg_router_test import PartyTransport, node_apps
+from ..node_test.dkg_test import Repository, party, settings
+
+
+class CrashingDKG(DKG):
+    """A coordinator that dies right after storing the round 2 results."""
+
+    async def _finish(self, round2_result: dict[NodeID, DKGRound2EncryptedPackage]):
+        raise RuntimeError("coordinator crashed")
+
+
+@pytest.mark.asyncio
+async def test_dkg_resume_after_coordinator_crash(monkeypatch):
+    share_repo = Repository()
+    transport = PartyTransport(node_apps(share_repo))
+    http_client = httpx.AsyncClient(transport=transport)
+    # The nodes push their shares to each other through the same in-process transport.
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs))
+    repository = MemoryRepository()
+    crashed = CrashingDKG(secp256k1_tr, party, 3, 2, repository, http_client=http_client, peer_delivery=True)
+    with pytest.raises(RuntimeError):
+        await crashed.run()
+
+    loaded = await DKG.load(crashed.id, repository, http_client=http_client)
+    assert loaded.peer_delivery and not loaded.broadcast_upload and loaded.compression is None
+    round1_result = await loaded._load_round_result(1, DKGRound1NodeResponse)
+    assert round1_result is not None
+
+    pubkey_package = await DKG.resume(crashed.id, repository, http_client=http_client)
+    await http_client.aclose()
+
+    key_repo = get_key_repository()
+    assert all(key_repo.get(node.ID + pubkey_package.verifying_key) is not None for node in settings)
+    assert share_repo.db == {}
+
+
+def test_incomplete_dkg_subclass_cannot_be_created():
+    class Round1Only(BaseDKG):
+        async def round1(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        Round1Only(secp256k1_tr, party, 3, 2, MemoryRepository())
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from frost_lib.custom_types import Header
+
+from zexfrost.client.nonce_pool import NoncePool
+from zexfrost.custom_types import Commitment, Node, TweakBy
+
+party = (
+    Node(id="01", host="http://localhost", port=2021, public_key="00"),  # type: ignore
+    Node(id="02", host="http://localhost", port=2022, public_key="00"),  # type: ignore
+)
+
+
+def make_commitment(binding: str) -> Commitment:
+    return Commitment(header=Header(version=1, ciphersuite="dummy"), binding=binding, hiding="hiding")
+
+
+@pytest.mark.asyncio
+async def test_nonce_pool_take_and_refill():
+    fetched = []
+
+    async def fetcher(node: Node, tweak_by: TweakBy | None, count: int) -> list[Commitment]:
+        fetched.append((node.id, tweak_by, count))
+        return [make_commitment(f"{node.id}-{i}") for i in range(count)]
+
+    pool = NoncePool(fetcher, asyncio.get_running_loop(), low_water_mark=2, refill_size=3)
+    assert pool.take(party, "vk", b"tweak") is None
+    await asyncio.sleep(0)
+    assert pool.size("01", "vk", b"tweak") == 3
+
+    taken = pool.take(party, "vk", b"tweak")
+    assert taken is not None
+    assert taken["01"].binding == "01-0"
+    assert taken["02"].binding == "02-0"
+    assert pool.size("01", "vk", b"tweak") == 2
+    assert len(fetched) == 2
+
+    pool.take(party, "vk", b"tweak")
+    await asyncio.sleep(0)
+    assert pool.size("01", "vk", b"tweak") == 4
+    assert pool.size("01", "vk", None) == 0
+
+
+@pytest.mark.asyncio
+async def test_nonce_pool_take_is_all_or_nothing():
+    async def fetcher(node: Node, tweak_by: TweakBy | None, count: int) -> list[Commitment]:
+        raise RuntimeError("node is down")
+
+    pool = NoncePool(fetcher, asyncio.get_running_loop(), low_water_mark=1, refill_size=1)
+    pool.put("01", "vk", None, [make_commitment("a")])
+    assert pool.take(party, "vk", None) is None
+    assert pool.size("01", "vk", None) == 1
+    await pool.prefill(party, "vk", None)
+    assert pool.size("02", "vk", None) == 0
+
+
+@pytest.mark.asyncio
+async def test_nonce_pool_drops_expired_commitments():
+    async def fetcher(node: Node, tweak_by: TweakBy | None, count: int) -> list[Commitment]:
+        return []
+
+    loop = asyncio.get_running_loop()
+    pool = NoncePool(fetcher, loop, low_water_mark=0, refill_size=1, max_age=10)
+    for node in party:
+        pool.put(node.id, "vk", None, [make_commitment("old")], fetched_at=loop.time() - 11)
+    assert pool.take(party, "vk", None) is None
+    assert pool.size("01", "vk", None) == 0
@@ -0,0 +1,17 @@
+import pytest
+from pydantic import ValidationError
+
+from zexfrost.client.sa import _chunk_commitment_entries
+from zexfrost.custom_types import MAX_COMMITMENT_BATCH, CommitmentBatchEntry
+
+
+def test_chunk_commitment_entries():
+    entries = [CommitmentBatchEntry(tweak_by=None, count=3), CommitmentBatchEntry(tweak_by=b"tweak", count=4)]
+    chunks = _chunk_commitment_entries(entries, 5)
+    assert [[(index, entry.count) for index, entry in chunk] for chunk in chunks] == [[(0, 3), (1, 2)], [(1, 2)]]
+    assert chunks[1][0][1].tweak_by == b"tweak"
+
+
+def test_commitment_batch_entry_is_capped():
+    with pytest.raises(ValidationError):
+        CommitmentBatchEntry(count=MAX_COMMITMENT_BATCH + 1)
@@ -0,0 +1,20 @@
+import pytest
+
+from zexfrost.compression import compress, decompress, supported_encodings
+
+
+@pytest.mark.parametrize("encoding", supported_encodings())
+def test_compress_decompress(encoding):
+    data = b'{"broadcast_data": {}}' * 100
+    compressed = compress(data, encoding)
+    assert len(compressed) < len(data)
+    assert decompress(compressed, encoding) == data
+
+
+def test_decompress_limits_size():
+    with pytest.raises(ValueError):
+        decompress(compress(bytes(1024), "gzip"), "gzip", max_size=100)
+    with pytest.raises(ValueError):
+        decompress(b"data", "gzip")
+    with pytest.raises(ValueError):
+        decompress(b"data", "br")
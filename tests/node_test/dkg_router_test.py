@@ -0,0 +1,236 @@
+import json
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from zexfrost.compression import MAX_DECOMPRESSED_SIZE, compress
+from zexfrost.custom_types import DKGBroadcast, DKGRound1NodeResponse, DKGShareDelivery, NodeID
+from zexfrost.node.party import set_party
+from zexfrost.node.repository import (
+    set_broadcast_repository,
+    set_dkg_repository,
+    set_key_repository,
+    set_share_repository,
+)
+from zexfrost.node.router import dkg_router
+from zexfrost.node.router.utils import NodeSettingsMiddleware
+from zexfrost.utils import broadcast_digest, single_sign_data
+
+from .dkg_test import Repository, party, settings
+
+
+@pytest.fixture
+def share_repo() -> Repository:
+    return Repository()
+
+
+@pytest.fixture
+def apps(share_repo) -> dict[NodeID, NodeSettingsMiddleware]:
+    return node_apps(share_repo)
+
+
+def node_apps(share_repo: Repository) -> dict[NodeID, NodeSettingsMiddleware]:
+    """The DKG router served as each node of `party`, over fresh in-memory repositories."""
+    set_party(party)
+    set_dkg_repository(Repository())
+    set_key_repository(Repository())
+    set_broadcast_repository(Repository())
+    set_share_repository(share_repo)
+    app = FastAPI()
+    app.include_router(dkg_router)
+    return {node.ID: NodeSettingsMiddleware(app, node) for node in settings}
+
+
+@pytest.fixture
+def nodes(apps) -> dict[NodeID, TestClient]:
+    return {node_id: TestClient(app) for node_id, app in apps.items()}
+
+
+class PartyTransport(httpx.AsyncBaseTransport):
+    """Routes the nodes' requests to each other to the in-process node apps, by port."""
+
+    def __init__(self, apps: dict[NodeID, NodeSettingsMiddleware]):
+        self.transports = {node.port: httpx.ASGITransport(app=apps[node.id]) for node in party}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transports[request.url.port].handle_async_request(request)
+
+
+def _round1(nodes: dict[NodeID, TestClient], id) -> dict[NodeID, DKGRound1NodeResponse]:
+    request = {"id": str(id), "max_signers": 3, "min_signers": 2, "party_ids": list(nodes), "curve": "secp256k1"}
+    responses = {}
+    for node_id, client in nodes.items():
+        res = client.post("/dkg/round1", json=request)
+        assert res.status_code == 200, res.text
+        responses[node_id] = DKGRound1NodeResponse.model_validate(res.json())
+    return responses
+
+
+def test_round1_accepts_gzip_body(nodes):
+    request = {"id": str(uuid4()), "max_signers": 3, "min_signers": 2, "party_ids": list(nodes), "curve": "secp256k1"}
+    client = next(iter(nodes.values()))
+    res = client.post(
+        "/dkg/round1",
+        content=compress(json.dumps(request).encode(), "gzip"),
+        headers={"content-type": "application/json", "content-encoding": "gzip"},
+    )
+    assert res.status_code == 200, res.text
+
+
+def test_compressed_body_errors_are_bad_requests(nodes):
+    client = next(iter(nodes.values()))
+    oversize = compress(b" " * (MAX_DECOMPRESSED_SIZE + 1), "gzip")
+    res = client.post("/dkg/round1", content=oversize, headers={"content-encoding": "gzip"})
+    assert res.status_code == 400
+
+    res = client.post("/dkg/round1", content=b"{}", headers={"content-encoding": "br"})
+    assert res.status_code == 400
+
+
+def test_round2_from_broadcast_reference(nodes):
+    id = uuid4()
+    round1 = _round1(nodes, id)
+    source_id, source = next(iter(nodes.items()))
+    broadcast = DKGBroadcast(id=id, broadcast_data=round1)
+    res = source.post("/dkg/broadcast", json=broadcast.model_dump(mode="json"))
+    assert res.status_code == 200, res.text
+    reference = res.json()
+    assert reference == {"digest": broadcast_digest(round1), "source": source_id}
+
+    for node_id, client in nodes.items():
+        res = client.post("/dkg/round2", json={"id": str(id), "broadcast": reference})
+        assert res.status_code == 200, res.text
+        assert set(res.json()["encrypted_package"]) == set(nodes) - {node_id}
+
+
+def test_upload_broadcast_requires_the_session(nodes):
+    id = uuid4()
+    round1 = _round1(nodes, id)
+    client = next(iter(nodes.values()))
+
+    unknown = DKGBroadcast(id=uuid4(), broadcast_data=round1)
+    assert client.post("/dkg/broadcast", json=unknown.model_dump(mode="json")).status_code == 404
+
+    partial = DKGBroadcast(id=id, broadcast_data=dict(list(round1.items())[:2]))
+    assert client.post("/dkg/broadcast", json=partial.model_dump(mode="json")).status_code == 400
+
+
+def test_round2_rejects_fetched_broadcast_digest_mismatch(nodes, monkeypatch):
+    id = uuid4()
+    round1 = _round1(nodes, id)
+    source_id = next(iter(nodes))
+    tampered = dict(round1)
+    tampered.pop(source_id)
+    served = DKGBroadcast(id=id, broadcast_data=tampered).model_dump(mode="json")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=served))
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs))
+
+    reference = {"digest": broadcast_digest(round1), "source": source_id}
+    res = list(nodes.values())[1].post("/dkg/round2", json={"id": str(id), "broadcast": reference})
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Broadcast digest mismatch"
+
+
+def test_round2_broadcast_fetch_failure_is_bad_gateway(nodes, monkeypatch):
+    id = uuid4()
+    round1 = _round1(nodes, id)
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    transport = httpx.MockTransport(unreachable)
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs))
+
+    reference = {"digest": broadcast_digest(round1), "source": next(iter(nodes))}
+    res = list(nodes.values())[1].post("/dkg/round2", json={"id": str(id), "broadcast": reference})
+    assert res.status_code == 502
+
+
+def test_receive_share_rejects_bad_signature_and_wrong_receiver(nodes):
+    sender, receiver = settings[0], settings[1]
+    delivery = DKGShareDelivery(id=uuid4(), sender=sender.ID, receiver=receiver.ID, encrypted_package="00")
+    delivery.signature = single_sign_data(sender.CURVE_NAME, sender.PRIVATE_KEY, delivery.signed_payload())
+
+    wrong_receiver = nodes[settings[2].ID].post("/dkg/share", json=delivery.model_dump(mode="json"))
+    assert wrong_receiver.status_code == 400
+
+    forged = delivery.model_copy(update={"signature": ""})
+    forged.signature = single_sign_data(receiver.CURVE_NAME, receiver.PRIVATE_KEY, forged.signed_payload())
+    res = nodes[receiver.ID].post("/dkg/share", json=forged.model_dump(mode="json"))
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Invalid share signature"
+
+    assert nodes[receiver.ID].post("/dkg/share", json=delivery.model_dump(mode="json")).status_code == 200
+
+
+def test_round3_from_peer_delivered_shares(apps, nodes, share_repo, monkeypatch):
+    transport = PartyTransport(apps)
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs))
+    id = uuid4()
+    round1 = _round1(nodes, id)
+
+    status = nodes[settings[0].ID].get(f"/dkg/round2/status/{id}").json()
+    assert status == {"received": [], "missing": [settings[1].ID, settings[2].ID]}
+
+    for node_id, client in nodes.items():
+        broadcast_data = {
+            sender: response.model_dump(mode="json") for sender, response in round1.items() if sender != node_id
+        }
+        request = {"id": str(id), "broadcast_data": broadcast_data, "deliver_to_peers": True}
+        res = client.post("/dkg/round2", json=request)
+        assert res.status_code == 200, res.text
+        assert res.json() == {"encrypted_package": {}}
+
+    for node_id, client in nodes.items():
+        status = client.get(f"/dkg/round2/status/{id}").json()
+        assert status["missing"] == []
+        assert sorted(status["received"]) == sorted(set(nodes) - {node_id})
+
+    pubkey_packages = []
+    for client in nodes.values():
+        res = client.post("/dkg/round3", json={"id": str(id)})
+        assert res.status_code == 200, res.text
+        pubkey_packages.append(res.json()["pubkey_package"])
+    assert all(package == pubkey_packages[0] for package in pubkey_packages)
+    assert share_repo.db == {}
+
+
+def test_round2_status_of_unknown_session(nodes):
+    assert next(iter(nodes.values())).get(f"/dkg/round2/status/{uuid4()}").status_code == 404
+
+
+def test_share_delivery_to_unknown_receiver_is_bad_gateway(apps, nodes, monkeypatch):
+    transport = PartyTransport(apps)
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs))
+    id = uuid4()
+    round1 = _round1(nodes, id)
+    sender = settings[0].ID
+    set_party(party[:2])
+
+    broadcast_data = {
+        node_id: response.model_dump(mode="json") for node_id, response in round1.items() if node_id != sender
+    }
+    res = nodes[sender].post(
+        "/dkg/round2", json={"id": str(id), "broadcast_data": broadcast_data, "deliver_to_peers": True}
+    )
+    assert res.status_code == 502
+    assert settings[2].ID in res.json()["detail"]
+
+
+def test_round_errors_map_to_client_errors(nodes):
+    id = uuid4()
+    _round1(nodes, id)
+    client = next(iter(nodes.values()))
+
+    res = client.post("/dkg/round3", json={"id": str(uuid4()), "encrypted_package": {"encrypted_package": {}}})
+    assert res.status_code == 404
+
+    conflicting = {"id": str(id), "max_signers": 3, "min_signers": 3, "party_ids": list(nodes), "curve": "secp256k1"}
+    assert client.post("/dkg/round1", json=conflicting).status_code == 409
@@ -6,11 +6,13 @@ from frost_lib import secp256k1_tr
 from frost_lib.custom_types import DKGPart2Package
 
 from zexfrost.custom_types import DKGRound2EncryptedPackage, Node, NodeID
+from zexfrost.exceptions import DKGBatchSizeError, DKGRoundConflictError
 from zexfrost.key import Key
-from zexfrost.node.dkg import DKG
+from zexfrost.node.dkg import DKG, BatchDKG, batch_session_id
+from zexfrost.node.session_cache import DKGSessionCache
 from zexfrost.node.settings import NodeSettings
 from zexfrost.node.sign import commitment, sign
-from zexfrost.utils import decrypt_with_joint_key, single_verify_data
+from zexfrost.utils import decrypt_with_joint_key, derive_joint_key, single_verify_data
 
 settings = (
     NodeSettings(
@@ -92,9 +94,11 @@ def test_store_and_load_dkg(dkg: DKG):
 
 def test_signing_and_verifying_dkg_round1(dkg: DKG):
     result = dkg.round1(3, 2)
-    data = result.model_dump(mode="python", exclude={"signature"})
+    data = result.model_dump(mode="python", exclude={"signature", "encryption_versions"})
     main_key = Key(dkg.settings.CURVE_NAME, dkg.settings.PRIVATE_KEY)
     assert single_verify_data(main_key._curve, main_key.public_key, data, result.signature)
+    assert result.signed_payload() == json.dumps(data, sort_keys=True).encode()
+    assert single_verify_data(main_key._curve, main_key.public_key, result.signed_payload(), result.signature)
 
 
 def test_encryption_dkg_round2():
@@ -172,6 +176,7 @@ def test_dkg():
     for node in party:
         data = DKGRound2EncryptedPackage(encrypted_package=peer_exchange_packages[node.id])
         round3_result = dkgs[node.id].round3(data, key_repositories[node.id])
+        assert dkgs[node.id].repository.get(node.id + dkgs[node.id].id.hex) is None
         if verifying_key is None:
             verifying_key = round3_result.pubkey_package.verifying_key
         else:
@@ -208,3 +213,173 @@ def test_dkg():
     assert secp256k1_tr.verify_group_signature(
         signature, message, secp256k1_tr.pubkey_package_tweak(tweaked_pubkey_package, None)
     )
+
+
+def test_store_dkg_object_only_dumps_changed_fields(dkg: DKG):
+    dkg.store_dkg_object()
+    stored = dkg.repository.get(dkg.settings.ID + dkg.id.hex)
+    loaded = DKG.load_dkg_object(dkg.settings, dkg.id, dkg.repository)
+    loaded.round1(3, 2)
+    updated = dkg.repository.get(dkg.settings.ID + dkg.id.hex)
+    assert updated["partners"] is stored["partners"]
+    assert updated["round1_result"] is not None
+    assert DKG.load_dkg_object(dkg.settings, dkg.id, dkg.repository) == loaded
+
+
+def test_dkg_session_cache(dkg: DKG):
+    dkg.store_dkg_object()
+    session_cache = DKGSessionCache(maxsize=1)
+    assert session_cache.load(dkg.settings, dkg.id, dkg.repository) is session_cache.load(
+        dkg.settings, dkg.id, dkg.repository
+    )
+    assert (session_cache.hits, session_cache.misses) == (1, 1)
+    session_cache.invalidate(dkg.settings, dkg.id)
+    assert session_cache.get(dkg.settings, dkg.id) is None
+
+
+def test_partners_joint_key_is_stored():
+    dkgs = {
+        setting_profile.ID: DKG(
+            settings=setting_profile, curve=secp256k1_tr, id=uuid4(), repository=Repository(), party=party
+        )
+        for setting_profile in settings
+    }
+    round1_results = {node_id: dkg.round1(3, 2) for node_id, dkg in dkgs.items()}
+    dkg = dkgs[party[0].id]
+    dkg.round2({node_id: result for node_id, result in round1_results.items() if node_id != party[0].id})
+
+    loaded = DKG.load_dkg_object(dkg.settings, dkg.id, dkg.repository)
+    for partner in loaded.partners:
+        assert loaded.partners_joint_key[partner.id] == derive_joint_key(
+            dkgs[partner.id].temp_key._private_key, dkg.temp_key.public_key
+        )
+
+
+def test_share_deliveries():
+    dkgs = {
+        setting_profile.ID: DKG(
+            settings=setting_profile, curve=secp256k1_tr, id=uuid4(), repository=Repository(), party=party
+        )
+        for setting_profile in settings
+    }
+    round1_results = {node_id: dkg.round1(3, 2) for node_id, dkg in dkgs.items()}
+    sender = dkgs[party[0].id]
+    encrypted = sender.round2({node_id: result for node_id, result in round1_results.items() if node_id != party[0].id})
+
+    deliveries = sender.share_deliveries(encrypted)
+    assert {delivery.receiver for delivery in deliveries} == {party[1].id, party[2].id}
+    for delivery in deliveries:
+        assert delivery.sender == party[0].id
+        assert delivery.encrypted_package == encrypted.encrypted_package[delivery.receiver]
+        assert single_verify_data(
+            party[0].curve_name, party[0].public_key, delivery.signed_payload(), delivery.signature
+        )
+
+
+def test_dkg_rounds_are_idempotent():
+    dkgs = {
+        setting_profile.ID: DKG(
+            settings=setting_profile, curve=secp256k1_tr, id=uuid4(), repository=Repository(), party=party
+        )
+        for setting_profile in settings
+    }
+    round1_results = {node_id: dkg.round1(3, 2) for node_id, dkg in dkgs.items()}
+    node_id, dkg = next(iter(dkgs.items()))
+    assert dkg.round1(3, 2).package == round1_results[node_id].package
+
+    broadcast_data = {other_id: result for other_id, result in round1_results.items() if other_id != node_id}
+    round2_result = dkg.round2(broadcast_data)
+    packages = dkg.round2_result.packages
+    retried = dkg.round2(broadcast_data)
+    assert dkg.round2_result.packages == packages
+    assert retried.encrypted_package.keys() == round2_result.encrypted_package.keys()
+
+    other_id = next(iter(broadcast_data))
+    conflicting = {**broadcast_data, other_id: round1_results[node_id]}
+    with pytest.raises(DKGRoundConflictError):
+        dkg.round2(conflicting)
+
+
+def test_round1_replay_with_other_parameters_conflicts():
+    repo = Repository()
+    dkg = DKG(settings[0], secp256k1_tr, uuid4(), repo, party)
+    dkg.round1(3, 2)
+    loaded = DKG.load_dkg_object(settings[0], dkg.id, repo)
+    party_ids = [node.id for node in party]
+
+    loaded.check_round1_replay(secp256k1_tr, party_ids, 3, 2)
+    with pytest.raises(DKGRoundConflictError):
+        loaded.check_round1_replay(secp256k1_tr, party_ids, 3, 3)
+    with pytest.raises(DKGRoundConflictError):
+        loaded.check_round1_replay(secp256k1_tr, party_ids[:2], 3, 2)
+
+
+def test_batch_dkg():
+    key_repositories = {setting_profile.ID: Repository() for setting_profile in settings}
+    dkg_repositories = {setting_profile.ID: Repository() for setting_profile in settings}
+    batch_id = uuid4()
+    round1_results = {
+        setting_profile.ID: BatchDKG.create(
+            setting_profile, secp256k1_tr, batch_id, dkg_repositories[setting_profile.ID], party, key_count=3
+        ).round1(3, 2)
+        for setting_profile in settings
+    }
+
+    round2_results = {}
+    for setting_profile in settings:
+        batch = BatchDKG.load(setting_profile, batch_id, 3, dkg_repositories[setting_profile.ID])
+        round2_results[setting_profile.ID] = batch.round2(
+            {node_id: result for node_id, result in round1_results.items() if node_id != setting_profile.ID}
+        )
+
+    round3_results = []
+    for setting_profile in settings:
+        batch = BatchDKG.load(setting_profile, batch_id, 3, dkg_repositories[setting_profile.ID])
+        encrypted_package = DKGRound2EncryptedPackage(
+            encrypted_package={
+                node_id: result.encrypted_package[setting_profile.ID]
+                for node_id, result in round2_results.items()
+                if node_id != setting_profile.ID
+            }
+        )
+        round3_results.append(batch.round3(encrypted_package, key_repositories[setting_profile.ID]))
+
+    verifying_keys = [[package.verifying_key for package in result.pubkey_packages] for result in round3_results]
+    assert len(set(verifying_keys[0])) == 3
+    assert verifying_keys[0] == verifying_keys[1] == verifying_keys[2]
+
+
+def test_batch_dkg_resume_keeps_stored_sessions():
+    repo = Repository()
+    batch_id = uuid4()
+    batch = BatchDKG.create(settings[0], secp256k1_tr, batch_id, repo, party, key_count=3)
+    # Round 1 stopped after storing the first key.
+    batch.sessions[0].part1(3, 2)
+
+    with pytest.raises(DKGBatchSizeError):
+        BatchDKG.load(settings[0], batch_id, 4, repo)
+
+    first = DKG.load_dkg_object(settings[0], batch_session_id(batch_id, 0), repo)
+    resumed = BatchDKG.from_first_session(
+        first,
+        batch_id,
+        3,
+        lambda session_id: DKG.load_dkg_object(settings[0], session_id, repo),
+        create_missing=True,
+    )
+    assert resumed.temp_key == batch.temp_key
+    response = resumed.round1(3, 2)
+    assert response.packages[0] == batch.sessions[0].round1_result.package
+    assert BatchDKG.load(settings[0], batch_id, 3, repo).round1(3, 2).packages == response.packages
+
+
+def test_signed_payload_memo_is_reset(dkg: DKG):
+    response = dkg.round1(3, 2)
+    first = response.signed_payload()
+    assert response.signed_payload() is first
+
+    response.temp_public_key = "02" + "bb" * 32
+    assert b"bb" * 32 in response.signed_payload()
+
+    copied = response.model_copy(update={"temp_public_key": "02" + "cc" * 32})
+    assert b"cc" * 32 in copied.signed_payload()
@@ -0,0 +1,15 @@
+import zexfrost.node.executor as executor_module
+from zexfrost.node.settings import node_settings
+
+
+def test_default_executor_follows_settings(monkeypatch):
+    settings = node_settings.model_copy(update={"CRYPTO_EXECUTOR": "process", "CRYPTO_MAX_WORKERS": 1})
+    monkeypatch.setattr(executor_module, "node_settings", settings)
+    monkeypatch.setattr(executor_module, "_crypto_executor", None)
+    crypto_executor = executor_module.get_crypto_executor()
+    try:
+        assert crypto_executor.mode == "process"
+        assert crypto_executor.max_workers == 1
+        assert crypto_executor.process_pool is not None
+    finally:
+        crypto_executor.shutdown()
@@ -0,0 +1,74 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from frost_lib import secp256k1_tr
+
+from zexfrost.node.dkg import DKG
+from zexfrost.node.key_cache import KeyPackageCache, set_key_package_cache
+from zexfrost.node.lifespan import node_lifespan, recover_dkg_sessions
+from zexfrost.node.repository import set_dkg_repository, set_hot_key_repository, set_key_repository
+from zexfrost.node.session_cache import DKGSessionCache, set_dkg_session_cache
+from zexfrost.node.session_gc import DKGSessionSweeper, set_dkg_session_sweeper
+from zexfrost.node.storage import MmapKeyRepository, SQLiteDKGRepository
+from zexfrost.repository import MemoryRepository
+
+from .dkg_test import party, settings
+from .mmap_key_repository_test import key_package
+
+
+def test_recover_dkg_sessions(tmp_path):
+    repository = SQLiteDKGRepository(tmp_path / "node.db")
+    dkg = DKG(settings=settings[0], curve=secp256k1_tr, id=uuid4(), repository=repository, party=party)
+    dkg.round1(3, 2)
+
+    session_cache = DKGSessionCache()
+    sweeper = DKGSessionSweeper(repository, ttl=60, interval=60, session_cache=session_cache)
+    set_dkg_repository(SQLiteDKGRepository(tmp_path / "node.db"))
+    set_dkg_session_cache(session_cache)
+    set_dkg_session_sweeper(sweeper)
+    try:
+        [recovered] = recover_dkg_sessions(settings[0])
+    finally:
+        set_dkg_session_cache(None)
+        set_dkg_session_sweeper(None)
+    assert recovered.id == dkg.id
+    assert session_cache.get(settings[0], dkg.id) is recovered
+    assert len(sweeper) == 1
+
+
+@pytest.mark.asyncio
+async def test_node_lifespan_keeps_hot_keys_of_mmap_key_store(tmp_path, caplog):
+    node = settings[0]
+    key_repo = MmapKeyRepository(tmp_path / "keys")
+    keys = [node.ID + key_package(i)["verifying_key"] for i in range(8)]
+    for i, key in enumerate(keys):
+        key_repo.set(key, key_package(i))
+    key_cache = KeyPackageCache()
+    for key in keys:
+        key_cache.load(key_repo, key)
+    hot_key_repo = MemoryRepository[dict]()
+    set_dkg_repository(MemoryRepository())
+    set_key_repository(key_repo)
+    set_key_package_cache(key_cache)
+    set_hot_key_repository(hot_key_repo)
+    try:
+        async with node_lifespan(None, node):
+            pass
+        assert KeyPackageCache.saved_hot_keys(hot_key_repo, node.ID) == keys[::-1]
+
+        restarted = KeyPackageCache()
+        set_key_package_cache(restarted)
+        async with node_lifespan(None, node):
+            assert len(restarted) == len(keys)
+
+        failing = MagicMock()
+        failing.get.return_value = None
+        failing.set.side_effect = OSError("disk full")
+        set_hot_key_repository(failing)
+        async with node_lifespan(None, node):
+            pass
+        assert "Saving the hot keys failed" in caplog.text
+    finally:
+        set_key_package_cache(None)
+        set_hot_key_repository(None)
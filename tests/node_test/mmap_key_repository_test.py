@@ -0,0 +1,76 @@
+import os
+from unittest.mock import MagicMock
+
+from zexfrost.node.storage import MmapKeyRepository
+
+
+def key_package(i: int) -> dict:
+    return {
+        "header": {"version": 0, "ciphersuite": "FROST-secp256k1-SHA256-TR-v1"},
+        "identifier": f"{i:064x}",
+        "signing_share": f"{i + 1:064x}",
+        "verifying_share": f"02{i + 2:064x}",
+        "verifying_key": f"03{i + 3:064x}",
+        "min_signers": 2,
+    }
+
+
+def repo_key(i: int) -> str:
+    return "01" * 32 + key_package(i)["verifying_key"]
+
+
+def test_mmap_key_repository(tmp_path):
+    repo = MmapKeyRepository(tmp_path / "keys", initial_capacity=4)
+    for i in range(100):
+        repo.set(repo_key(i), key_package(i))
+    assert len(repo) == 100
+    assert repo.get(repo_key(7)) == key_package(7)
+    assert repo.get(repo_key(100)) is None
+
+    repo.set(repo_key(7), key_package(8))
+    assert repo.get(repo_key(7)) == key_package(8)
+    assert repo.pop(repo_key(9)) == key_package(9)
+    assert repo.pop(repo_key(9)) is None
+    repo.delete(repo_key(10))
+    assert len(repo) == 98
+    repo.close()
+
+    reopened = MmapKeyRepository(tmp_path / "keys")
+    assert len(reopened) == 98
+    assert reopened.get(repo_key(7)) == key_package(8)
+    assert reopened.get(repo_key(10)) is None
+    assert reopened.get(repo_key(99)) == key_package(99)
+    reopened.close()
+
+
+def test_mmap_key_repository_rebuilds_index(tmp_path):
+    repo = MmapKeyRepository(tmp_path / "keys")
+    for i in range(10):
+        repo.set(repo_key(i), key_package(i))
+    repo.set(repo_key(3), key_package(30))
+    repo.delete(repo_key(4))
+    repo.set("not-hex", {"value": 1})
+    repo.close()
+    os.remove(tmp_path / "keys.idx")
+
+    rebuilt = MmapKeyRepository(tmp_path / "keys")
+    assert len(rebuilt) == 10
+    assert rebuilt.get(repo_key(3)) == key_package(30)
+    assert rebuilt.get(repo_key(4)) is None
+    assert rebuilt.get("not-hex") == {"value": 1}
+    rebuilt.close()
+
+
+def test_mmap_key_repository_syncs_every_write(tmp_path):
+    repo = MmapKeyRepository(tmp_path / "keys")
+    repo.flush = MagicMock(wraps=repo.flush)
+    repo.set(repo_key(1), key_package(1))
+    repo.delete(repo_key(1))
+    assert repo.flush.call_count == 2
+    repo.close()
+
+    buffered = MmapKeyRepository(tmp_path / "buffered", durable=False)
+    buffered.flush = MagicMock(wraps=buffered.flush)
+    buffered.set(repo_key(1), key_package(1))
+    assert buffered.flush.call_count == 0
+    buffered.close()
@@ -0,0 +1,45 @@
+from zexfrost.node.storage import TTLNonceRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_nonce_repository_pop_once():
+    repo = TTLNonceRepository(ttl=10)
+    repo.set("binding-hiding", {"nonce": 1})
+    assert repo.get("binding-hiding") == {"nonce": 1}
+    assert repo.pop("binding-hiding") == {"nonce": 1}
+    assert repo.pop("binding-hiding") is None
+    repo.delete("binding-hiding")
+
+
+def test_nonce_repository_expiry():
+    clock = FakeClock()
+    repo = TTLNonceRepository(ttl=10, shards=2, clock=clock)
+    repo.set("a", {"nonce": 1})
+    repo.set("b", {"nonce": 2})
+    clock.now = 5
+    repo.set("c", {"nonce": 3})
+    clock.now = 11
+    assert repo.get("a") is None
+    assert repo.pop("b") is None
+    assert repo.sweep() == 1
+    assert repo.get("c") == {"nonce": 3}
+    metrics = repo.metrics()
+    assert metrics["expired"] == 2
+    assert metrics["size"] == 1
+
+
+def test_nonce_repository_cap():
+    repo = TTLNonceRepository(ttl=10, max_entries=3, shards=1)
+    for i in range(5):
+        repo.set(str(i), {"nonce": i})
+    assert len(repo) == 3
+    assert repo.get("0") is None
+    assert repo.get("4") == {"nonce": 4}
+    assert repo.metrics()["evicted"] == 2
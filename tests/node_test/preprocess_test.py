@@ -0,0 +1,83 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from zexfrost.node.preprocess import NoncePreprocessor
+from zexfrost.repository import AsyncRepositoryAdapter, MemoryRepository
+
+from .sign_test import DummyCurve, DummyKeyRepo, DummyNonceRepo
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def test_preprocessor_fills_registered_keys():
+    curve = DummyCurve()
+    pubkey_package = MagicMock(verifying_key="vk")
+    preprocessor = NoncePreprocessor("node1", DummyKeyRepo(), DummyNonceRepo(), target=4, low_water_mark=1)
+    assert preprocessor.take(curve, pubkey_package, None) == []
+    preprocessor.start()
+    try:
+        preprocessor.register(curve, pubkey_package, None)
+        wait_for(lambda: preprocessor.size(curve, pubkey_package, None) == 4)
+        assert len(preprocessor.take(curve, pubkey_package, None, count=3)) == 3
+        wait_for(lambda: preprocessor.size(curve, pubkey_package, None) == 4)
+        assert preprocessor.size(curve, pubkey_package, b"tweak") == 0
+    finally:
+        preprocessor.stop()
+
+
+def test_preprocessor_evicts_cold_keys():
+    curve = DummyCurve()
+    nonce_repo = DummyNonceRepo()
+    nonce_repo.delete = MagicMock()
+    preprocessor = NoncePreprocessor("node1", DummyKeyRepo(), nonce_repo, target=2, low_water_mark=0, max_keys=1)
+    preprocessor.start()
+    try:
+        preprocessor.register(curve, MagicMock(verifying_key="vk1"), None)
+        wait_for(lambda: preprocessor.size(curve, MagicMock(verifying_key="vk1"), None) == 2)
+        preprocessor.register(curve, MagicMock(verifying_key="vk2"), None)
+        assert preprocessor.size(curve, MagicMock(verifying_key="vk1"), None) == 0
+        wait_for(lambda: nonce_repo.delete.call_count == 2)
+    finally:
+        preprocessor.stop()
+
+
+def test_preprocessor_drops_commitments_before_nonce_ttl():
+    curve = DummyCurve()
+    pubkey_package = MagicMock(verifying_key="vk")
+    nonce_repo = DummyNonceRepo()
+    nonce_repo.ttl = 100
+    now = [0.0]
+    preprocessor = NoncePreprocessor(
+        "node1", DummyKeyRepo(), nonce_repo, target=2, low_water_mark=0, clock=lambda: now[0]
+    )
+    assert preprocessor.max_age == 70
+    preprocessor.start()
+    try:
+        assert preprocessor.register(curve, pubkey_package, None)
+        wait_for(lambda: preprocessor.size(curve, pubkey_package, None) == 2)
+        now[0] = 71
+        nonce_repo.delete = MagicMock()
+        assert preprocessor.take(curve, pubkey_package, None) == []
+        wait_for(lambda: nonce_repo.delete.call_count == 2)
+    finally:
+        preprocessor.stop()
+
+
+def test_preprocessor_registers_only_stored_keys():
+    key_repo = DummyKeyRepo()
+    key_repo.get = MagicMock(return_value=None)
+    preprocessor = NoncePreprocessor("node1", key_repo, DummyNonceRepo(), target=2, low_water_mark=0)
+    assert not preprocessor.register(DummyCurve(), MagicMock(verifying_key="unknown"), b"tweak")
+    assert preprocessor.size(DummyCurve(), MagicMock(verifying_key="unknown"), b"tweak") == 0
+
+
+def test_preprocessor_rejects_async_nonce_repository():
+    with pytest.raises(TypeError):
+        NoncePreprocessor("node1", DummyKeyRepo(), AsyncRepositoryAdapter(MemoryRepository()))
@@ -0,0 +1,57 @@
+import time
+from uuid import uuid4
+
+from zexfrost.node.dkg import broadcast_key, share_key
+from zexfrost.node.session_gc import DKGSessionSweeper
+from zexfrost.node.settings import NodeSettings
+from zexfrost.node.storage import SQLiteDKGRepository
+from zexfrost.repository import MemoryRepository
+
+settings = NodeSettings(
+    ID="0000000000000000000000000000000000000000000000000000000000000001",
+    PRIVATE_KEY="4f68a04f9fa036e3d246cc4aad75c25f234d9ee43fd9cf657f27d75edf90f018",
+)
+
+
+def test_dkg_session_sweeper():
+    repository = MemoryRepository[dict]()
+    sweeper = DKGSessionSweeper(repository, ttl=10, interval=60)  # type: ignore[arg-type]
+    stale, active, finished = uuid4(), uuid4(), uuid4()
+    for id in (stale, active, finished):
+        repository.set(settings.ID + id.hex, {"round1_result": {}})
+        sweeper.touch(settings, id)
+    sweeper.forget(settings, finished)
+
+    now = time.monotonic()
+    sweeper.touch(settings, active)
+    sweeper._deadlines[(settings.ID, stale)] = (settings, now - 1)
+    assert sweeper.sweep(now) == 1
+    assert repository.get(settings.ID + stale.hex) is None
+    assert repository.get(settings.ID + active.hex) is not None
+    assert repository.get(settings.ID + finished.hex) is not None
+    assert len(sweeper) == 1
+
+    assert sweeper.sweep(now + 11) == 1
+    assert repository.get(settings.ID + active.hex) is None
+    assert sweeper.expired == 2
+
+
+def test_dkg_session_sweeper_expires_by_stored_write_time(tmp_path):
+    repository = SQLiteDKGRepository(tmp_path / "node.db")
+    broadcasts, shares = MemoryRepository[dict](), MemoryRepository[dict]()
+    sweeper = DKGSessionSweeper(
+        repository, ttl=10, interval=60, broadcast_repository=broadcasts, share_repository=shares
+    )
+    id, partner = uuid4(), "02" * 32
+    # Written by another worker process: this sweeper never touched it.
+    repository.set(settings.ID + id.hex, {"round1_result": {}, "round2_result": None, "partners": [{"id": partner}]})
+    broadcasts.set(broadcast_key(settings, id), {"digest": "00"})
+    shares.set(share_key(settings, id, partner), {"encrypted_package": "00"})
+
+    sweeper.seed(settings)
+    assert len(sweeper) == 1
+    assert sweeper.sweep(time.monotonic() + 5) == 0
+    assert sweeper.sweep(time.monotonic() + 11) == 1
+    assert repository.get(settings.ID + id.hex) is None
+    assert broadcasts.data == {}
+    assert shares.data == {}
@@ -0,0 +1,64 @@
+import threading
+import time
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from zexfrost.node.session_lock import DKGSessionLocks
+from zexfrost.node.settings import NodeSettings
+from zexfrost.repository import MemoryRepository
+
+settings = NodeSettings(
+    ID="0000000000000000000000000000000000000000000000000000000000000001",
+    PRIVATE_KEY="4f68a04f9fa036e3d246cc4aad75c25f234d9ee43fd9cf657f27d75edf90f018",
+)
+
+
+class Response(BaseModel):
+    value: int
+
+
+def test_dkg_session_locks_serialize_one_session():
+    locks = DKGSessionLocks()
+    id, other_id = uuid4(), uuid4()
+    running: dict[str, int] = {"same": 0, "peak": 0}
+    other_done = threading.Event()
+
+    def worker() -> None:
+        with locks.hold(settings, id):
+            running["same"] += 1
+            running["peak"] = max(running["peak"], running["same"])
+            time.sleep(0.01)
+            running["same"] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    with locks.hold(settings, id):
+        for thread in threads:
+            thread.start()
+        # Another session is not blocked by the held lock.
+        with locks.hold(settings, other_id):
+            other_done.set()
+    for thread in threads:
+        thread.join()
+
+    assert other_done.is_set()
+    assert running["peak"] == 1
+    assert len(locks) == 0
+
+
+def test_dkg_session_locks_replay_completed():
+    locks = DKGSessionLocks(max_completed=1)
+    first, second = uuid4(), uuid4()
+    locks.complete(settings, first, Response(value=1))
+    assert locks.completed(settings, first, Response) == Response(value=1)
+    locks.complete(settings, second, Response(value=2))
+    assert locks.completed(settings, first, Response) is None
+    assert locks.completed(settings, second, Response) == Response(value=2)
+
+
+def test_dkg_session_locks_persist_completed():
+    results = MemoryRepository[dict]()
+    DKGSessionLocks(results=results).complete(settings, id := uuid4(), Response(value=1))
+    # Another worker process with the same result repository replays the response.
+    assert DKGSessionLocks(results=results).completed(settings, id, Response) == Response(value=1)
+    assert DKGSessionLocks(results=results).completed(settings, uuid4(), Response) is None
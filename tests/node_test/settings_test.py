@@ -0,0 +1,34 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from zexfrost.node.executor import CryptoExecutor
+from zexfrost.node.router.utils import NodeSettingsMiddleware, run_crypto
+from zexfrost.node.settings import NodeSettings, get_node_settings, node_settings, use_node_settings
+
+other_settings = NodeSettings(
+    ID="0000000000000000000000000000000000000000000000000000000000000002",
+    PRIVATE_KEY="88c1ce8446836b17fd0bf3c6f804cb671beda62047ed4dbaeffade513f6ba5eb",
+)
+
+
+@pytest.mark.asyncio
+async def test_use_node_settings_reaches_crypto_executor():
+    executor = CryptoExecutor()
+    assert get_node_settings() is node_settings
+    with use_node_settings(other_settings):
+        assert await executor.run(get_node_settings) is other_settings
+    assert get_node_settings() is node_settings
+    executor.shutdown()
+
+
+def test_node_settings_middleware_serves_each_node():
+    app = FastAPI()
+
+    @app.get("/id")
+    async def node_id():
+        return {"handler": get_node_settings().ID, "crypto": (await run_crypto(get_node_settings)).ID}
+
+    response = TestClient(NodeSettingsMiddleware(app, other_settings)).get("/id").json()
+    assert response == {"handler": other_settings.ID, "crypto": other_settings.ID}
+    assert get_node_settings() is node_settings
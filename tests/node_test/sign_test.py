@@ -2,8 +2,11 @@ from unittest.mock import MagicMock
 
 from frost_lib.custom_types import Header
 
-from zexfrost.custom_types import BaseCryptoCurve, Commitment, NodeID, TweakBy
+from zexfrost.custom_types import BaseCryptoCurve, Commitment, NodeID, SigningData, TweakBy
 from zexfrost.node import sign
+from zexfrost.node.key_cache import KeyPackageCache
+from zexfrost.repository import MemoryRepository
+from zexfrost.tweak_cache import key_package_tweak_cache
 
 
 class DummyKeyRepo:
@@ -95,7 +98,19 @@ def test_commitment():
     result = sign.commitment(node_id, curve, pubkey_package, key_repo, nonce_repo, tweak_by=None)
     assert hasattr(result, "binding")
     assert hasattr(result, "hiding")
-    assert nonce_repo.last_set[0] == f"{result.binding}-{result.hiding}"
+    assert nonce_repo.last_set[0] == f"{node_id}{result.binding}-{result.hiding}"
+
+
+def test_batch_commitment():
+    key_package_tweak_cache.clear()
+    curve = DummyCurve()
+    key_repo = DummyKeyRepo()
+    nonce_repo = DummyNonceRepo()
+    pubkey_package = MagicMock(verifying_key="vk")
+    result = sign.batch_commitment("node1", curve, pubkey_package, key_repo, nonce_repo, [(None, 2), (b"tweak", 3)])
+    assert [len(commitments) for commitments in result] == [2, 3]
+    assert curve.tweaked
+    assert nonce_repo.last_set[0] == "node1binding-hiding"
 
 
 def make_commitment(binding, hiding):
@@ -117,3 +132,63 @@ def test_sign():
     tweak: TweakBy = b"tweak"
     result = sign.sign(curve, node_id, pubkey_package, commitments, message, key_repo, nonce_repo, tweak_by=tweak)
     assert result == "share_package"
+
+
+def test_batch_sign():
+    curve = DummyCurve()
+    key_repo = DummyKeyRepo()
+    nonce_repo = DummyNonceRepo()
+    pubkey_package = MagicMock(verifying_key="vk")
+    node_id: NodeID = "node1"
+    commitments: dict[NodeID, Commitment] = {node_id: make_commitment("binding", "hiding")}
+    signings_data = {
+        "a": SigningData(data={}, commitments=commitments),
+        "b": SigningData(data={}, commitments=commitments, tweak_by=b"tweak"),
+        "c": SigningData(data={}, commitments=commitments, tweak_by=b"tweak"),
+    }
+    assert list(sign.group_by_tweak(signings_data)) == [None, b"tweak"]
+    messages = {"a": b"a", "b": b"b", "c": b"c"}
+    result = sign.batch_sign(curve, node_id, pubkey_package, signings_data, messages, key_repo, nonce_repo)
+    assert result == {"a": "share_package", "b": "share_package", "c": "share_package"}
+
+
+def test_key_package_cache():
+    key_repo = DummyKeyRepo()
+    cache = KeyPackageCache(maxsize=1)
+    pubkey_package = MagicMock(verifying_key="vk")
+    key_package = sign.load_key_package("node1", pubkey_package, key_repo, cache)
+    assert sign.load_key_package("node1", pubkey_package, key_repo, cache) is key_package
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.load(key_repo, "other")
+    assert cache.hot_keys() == ["other"]
+    cache.invalidate("other")
+    assert len(cache) == 0
+    assert cache.warm_up(key_repo, ["node1vk"]) == 1
+    assert cache.get("node1vk") is not None
+
+
+def test_key_package_cache_persists_hot_keys():
+    store = MemoryRepository[dict]()
+    cache = KeyPackageCache()
+    cache.put("node1vk", MagicMock())
+    cache.put("node2vk", MagicMock())
+    cache.save_hot_keys(store, "node1")
+    assert KeyPackageCache.saved_hot_keys(store, "node1") == ["node1vk"]
+    assert KeyPackageCache.saved_hot_keys(store, "node2") == []
+
+    restarted = KeyPackageCache()
+    assert restarted.warm_up(DummyKeyRepo(), KeyPackageCache.saved_hot_keys(store, "node1")) == 1
+    assert restarted.get("node1vk") is not None
+
+
+def test_key_package_tweak_is_memoized():
+    key_package_tweak_cache.clear()
+    curve = DummyCurve()
+    key_repo = DummyKeyRepo()
+    nonce_repo = DummyNonceRepo()
+    pubkey_package = MagicMock(verifying_key="vk")
+    commitments: dict[NodeID, Commitment] = {"node1": make_commitment("binding", "hiding")}
+    for _ in range(3):
+        sign.sign(curve, "node1", pubkey_package, commitments, b"msg", key_repo, nonce_repo, tweak_by=b"tweak")
+    assert key_package_tweak_cache.stats()["misses"] == 1
+    assert key_package_tweak_cache.stats()["hits"] == 2
@@ -0,0 +1,111 @@
+import multiprocessing
+import sqlite3
+import time
+from uuid import uuid4
+
+from zexfrost.node.storage import SQLiteDKGRepository, SQLiteRepository
+
+
+def _pop_all(path: str, keys: list[str], queue) -> None:
+    repo = SQLiteRepository(path, "nonce")
+    queue.put([key for key in keys if repo.pop(key) is not None])
+
+
+def test_sqlite_repository(tmp_path):
+    repo = SQLiteRepository(tmp_path / "node.db", "dkg")
+    repo.set("key", {"round1_result": None, "partners": [1, 2]})
+    assert repo.get("key") == {"round1_result": None, "partners": [1, 2]}
+    repo.set("key", {"round1_result": {"a": "b"}})
+    assert repo.get("key") == {"round1_result": {"a": "b"}}
+    assert repo.pop("key") == {"round1_result": {"a": "b"}}
+    assert repo.pop("key") is None
+    repo.delete("key")
+    assert SQLiteRepository(tmp_path / "node.db", "nonce").get("key") is None
+
+
+def test_sqlite_repository_ttl(tmp_path):
+    repo = SQLiteRepository(tmp_path / "node.db", "nonce", ttl=-1)
+    repo.set("key", {"nonce": 1})
+    assert repo.get("key") is None
+    assert repo.sweep() == 1
+
+
+def test_sqlite_repository_pop_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "node.db")
+    repo = SQLiteRepository(path, "nonce")
+    keys = [f"binding-{i}" for i in range(200)]
+    for key in keys:
+        repo.set(key, {"nonce": key})
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_pop_all, args=(path, keys, queue)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    popped = [key for _ in workers for key in queue.get(timeout=30)]
+    for worker in workers:
+        worker.join()
+    assert sorted(popped) == sorted(keys)
+
+
+def test_sqlite_repository_bulk(tmp_path):
+    repo = SQLiteRepository(tmp_path / "node.db", "nonce")
+    repo.set_many({"a": {"nonce": 1}, "b": {"nonce": 2}})
+    assert repo.get_many(["a", "c", "b"]) == [{"nonce": 1}, None, {"nonce": 2}]
+    assert repo.pop_many(["a", "b", "a"]) == [{"nonce": 1}, {"nonce": 2}, None]
+
+
+def test_sqlite_dkg_repository(tmp_path):
+    node_id = "01" * 32
+    first, second = uuid4(), uuid4()
+    repo = SQLiteDKGRepository(tmp_path / "node.db")
+    repo.set(node_id + first.hex, {"round1_result": None, "round2_result": None})
+    repo.set(node_id + second.hex, {"round1_result": {}, "round2_result": None})
+    repo.set("02" * 32 + first.hex, {"round1_result": None, "round2_result": None})
+
+    reopened = SQLiteDKGRepository(tmp_path / "node.db")
+    assert reopened.in_flight(node_id) == [first.hex, second.hex]
+    assert reopened.get(node_id + second.hex) == {"round1_result": {}, "round2_result": None}
+    reopened.delete(node_id + first.hex)
+    assert reopened.in_flight(node_id) == [second.hex]
+    last_updated = reopened.last_updated(node_id)
+    assert list(last_updated) == [second.hex]
+    assert last_updated[second.hex] <= time.time()
+
+
+def test_sqlite_repository_get_many_reads_during_a_write(tmp_path):
+    repo = SQLiteRepository(tmp_path / "store.db", "store", timeout=0.1)
+    writer = SQLiteRepository(tmp_path / "store.db", "store")
+    repo.set("a", {"v": 1})
+    with writer._transaction() as connection:
+        connection.execute(writer._set_sql, writer._set_params("b", {"v": 2}, None))
+        assert repo.get_many(["a", "b"]) == [{"v": 1}, None]
+    assert repo.get_many(["a", "b"]) == [{"v": 1}, {"v": 2}]
+
+
+def test_sqlite_dkg_repository_compare_and_set(tmp_path):
+    key = "01" * 32 + uuid4().hex
+    repo = SQLiteDKGRepository(tmp_path / "node.db")
+    other = SQLiteDKGRepository(tmp_path / "node.db")
+    assert repo.compare_and_set(key, {"round1_result": {}}, 0)
+    assert not other.compare_and_set(key, {"round1_result": {"other": 1}}, 0)
+    assert other.get_versioned(key) == ({"round1_result": {}}, 1)
+
+    assert other.compare_and_set(key, {"round2_result": {}}, 1)
+    assert not repo.compare_and_set(key, {"round2_result": {"stale": 1}}, 1)
+    repo.set(key, {"round2_result": {"forced": 1}})
+    assert repo.get_versioned(key) == ({"round2_result": {"forced": 1}}, 3)
+
+
+def test_sqlite_dkg_repository_adds_version_column(tmp_path):
+    path = tmp_path / "node.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute(
+        "CREATE TABLE dkg_session (key TEXT PRIMARY KEY, node_id TEXT NOT NULL, dkg_id TEXT NOT NULL, "
+        "round INTEGER NOT NULL, value TEXT NOT NULL, expires_at REAL, updated_at REAL NOT NULL)"
+    )
+    legacy.execute("INSERT INTO dkg_session VALUES ('k', 'n', 'd', 0, '{}', NULL, 0)")
+    legacy.commit()
+    legacy.close()
+
+    repo = SQLiteDKGRepository(path)
+    assert repo.get_versioned("k") == ({}, 0)
+    assert repo.compare_and_set("k", {"round1_result": {}}, 0) is False
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from zexfrost.node.storage import WriteBehindRepository
+from zexfrost.repository import MemoryRepository
+
+
+def test_write_behind_repository():
+    backend = MemoryRepository[dict]()
+    repo = WriteBehindRepository(backend, durable=False, flush_interval=60)
+    repo.set("a", {"round": 1})
+    repo.set("a", {"round": 2})
+    repo.set("b", {"round": 1})
+    assert repo.get("a") == {"round": 2}
+    assert backend.get("a") is None
+
+    repo.flush()
+    assert backend.get("a") == {"round": 2}
+    assert repo.pop("b") == {"round": 1}
+    assert repo.get("b") is None
+    assert backend.get("b") == {"round": 1}
+    repo.close()
+    assert backend.get("b") is None
+
+
+def test_write_behind_repository_durable():
+    backend = MemoryRepository[dict]()
+    repo = WriteBehindRepository(backend, durable=True)
+    repo.set("a", {"round": 1})
+    assert backend.get("a") == {"round": 1}
+    repo.delete("a")
+    assert backend.get("a") is None
+
+
+def test_write_behind_repository_pop_is_atomic():
+    backend = MemoryRepository[dict]()
+    backend.set("nonce", {"value": 1})
+    repo = WriteBehindRepository(backend, durable=False, flush_interval=60)
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: repo.pop("nonce"), range(32)))
+    assert [result for result in results if result is not None] == [{"value": 1}]
+    repo.close()
+    assert backend.get("nonce") is None
@@ -0,0 +1,19 @@
+import pytest
+
+from zexfrost.repository import AsyncRepositoryAdapter, MemoryRepository, is_async_repository
+
+
+@pytest.mark.asyncio
+async def test_async_repository_adapter():
+    repository: MemoryRepository[dict] = MemoryRepository()
+    adapter = AsyncRepositoryAdapter(repository)
+    assert is_async_repository(adapter)
+    assert not is_async_repository(repository)
+
+    await adapter.set_many({"a": {"value": 1}, "b": {"value": 2}})
+    assert await adapter.get_many(["a", "missing", "b"]) == [{"value": 1}, None, {"value": 2}]
+    assert await adapter.pop_many(["a", "b"]) == [{"value": 1}, {"value": 2}]
+    assert repository.data == {}
+    await adapter.set("c", {"value": 3})
+    assert await adapter.pop("c") == {"value": 3}
+    assert await adapter.get("c") is None
@@ -0,0 +1,34 @@
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from zexfrost.key import Key
+from zexfrost.utils import batch_verify_data, decrypt, encrypt, get_curve, negotiate_encryption_version
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_encrypt_decrypt(version):
+    key = bytes(range(32))
+    encrypted = encrypt('{"signing_share":"00ff"}', key, version)
+    assert encrypted.startswith("v2:") == (version == "v2")
+    assert decrypt(encrypted, key) == '{"signing_share":"00ff"}'
+
+
+def test_v2_envelope_is_authenticated():
+    encrypted = encrypt("secret", bytes(32), "v2")
+    with pytest.raises(InvalidTag):
+        decrypt(encrypted, bytes(range(32)))
+
+
+def test_negotiate_encryption_version():
+    assert negotiate_encryption_version(["v1", "v2"]) == "v2"
+    assert negotiate_encryption_version(["v1"]) == "v1"
+    assert negotiate_encryption_version(["v9"]) == "v1"
+
+
+@pytest.mark.parametrize("count", [3, 10])
+def test_batch_verify_data(count):
+    curve = get_curve("secp256k1_tr")
+    keys = [Key(curve, curve.keypair_new().signing_key) for _ in range(count)]
+    items = [("secp256k1_tr", key.public_key, {"index": i}, key.sign_data({"index": i})) for i, key in enumerate(keys)]
+    items[1] = (*items[1][:2], {"index": -1}, items[1][3])
+    assert batch_verify_data(items) == [i != 1 for i in range(count)]
@@ -0,0 +1,9 @@
+import json
+
+# Built once: `json.dumps(data, sort_keys=True)` builds a new encoder on every call.
+_ENCODER = json.JSONEncoder(sort_keys=True)
+
+
+def canonical_bytes(data: dict) -> bytes:
+    """Deterministic encoding of signed payloads, byte-identical to `json.dumps(data, sort_keys=True)`."""
+    return _ENCODER.encode(data).encode("utf-8")
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+from zexfrost.custom_types import DKGID, Node, PublicKeyPackage
+
+
+class DKGJob(BaseModel):
+    party: tuple[Node, ...]
+    max_signers: int
+    min_signers: int
+
+
+class DKGJobResult(BaseModel):
+    job: DKGJob
+    id: DKGID | None = None
+    pubkey_package: PublicKeyPackage | None = None
+    error: str | None = None
+    # Seconds spent running the ceremony, without the time queued behind the concurrency caps.
+    latency: float
+    queued: float
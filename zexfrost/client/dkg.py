@@ -1,38 +1,59 @@
 import asyncio
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from typing import Self
 from uuid import uuid4
 
 import httpx
+from pydantic import BaseModel
 
+from zexfrost.compression import ContentEncoding, compress
 from zexfrost.custom_types import (
     DKGID,
+    MAX_DKG_BATCH_SIZE,
     AnnulmentData,
     BaseCryptoCurve,
+    DKGBatchRound1NodeResponse,
+    DKGBatchRound1Request,
+    DKGBatchRound2Request,
+    DKGBatchRound3NodeResponse,
+    DKGBatchRound3Request,
+    DKGBroadcast,
+    DKGBroadcastReference,
     DKGRound1NodeResponse,
     DKGRound1Request,
     DKGRound2EncryptedPackage,
     DKGRound2Request,
+    DKGRound2Status,
     DKGRound3NodeResponse,
     DKGRound3Request,
     Node,
     NodeID,
     PublicKeyPackage,
+    SignedResponse,
 )
-from zexfrost.exceptions import DKGResultIncompatibilityError
-from zexfrost.repository import RepositoryProtocol
-from zexfrost.utils import single_verify_data
+from zexfrost.exceptions import DKGNotFoundError, DKGResultIncompatibilityError, NodeTimeout
+from zexfrost.repository import AsyncRepositoryProtocol, RepositoryProtocol, is_async_repository
+from zexfrost.utils import batch_verify_data, broadcast_digest, get_curve
 
 
-class DKG:
+class BaseDKG[_Round1T: SignedResponse, _ResultT](ABC):
+    """
+    Transport, storage and resume logic shared by the DKG ceremonies. Subclasses implement the
+    three rounds; `_Round1T` is the nodes' round-1 response and `_ResultT` what `run` returns.
+    """
+
     def __init__(
         self,
         curve: BaseCryptoCurve,
         party: tuple[Node, ...],
         max_signers: int,
         min_singers: int,
-        repository: RepositoryProtocol,
+        repository: RepositoryProtocol | AsyncRepositoryProtocol,
         loop: asyncio.AbstractEventLoop | None = None,
         http_client: httpx.AsyncClient | None = None,
         timeout: int = 10,
+        compression: ContentEncoding | None = None,
     ) -> None:
         self.party = party
         self.id = self._generate_id()
@@ -43,60 +64,98 @@ class DKG:
         self.max_signers = max_signers
         self.min_singers = min_singers
         self.repository = repository
+        # Compress request bodies; every node must accept the encoding.
+        self.compression = compression
 
     def _generate_id(self) -> DKGID:
         return uuid4()
 
     async def _send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self.timeout)
         res = await self.http_client.request(method, url, **kwargs)
         res.raise_for_status()
         return res
 
-    async def round1(self) -> dict[NodeID, DKGRound1NodeResponse]:
-        tasks = {
-            node.id: self.loop.create_task(
-                self._send_request(
-                    "POST",
-                    f"{node.url}dkg/round1",
-                    json=DKGRound1Request(
-                        id=self.id,
-                        max_signers=self.max_signers,
-                        min_signers=self.min_singers,
-                        party_ids=[node.id for node in self.party],
-                        curve=self.curve.name,
-                    ).model_dump(mode="json"),
-                )
+    async def _post(self, url: str, data: BaseModel) -> httpx.Response:
+        if self.compression is None:
+            return await self._send_request("POST", url, json=data.model_dump(mode="json"))
+        return await self._send_request(
+            "POST",
+            url,
+            content=compress(data.model_dump_json().encode(), self.compression),
+            headers={"Content-Type": "application/json", "Content-Encoding": self.compression},
+        )
+
+    async def _post_party[_ModelT: BaseModel](
+        self, path: str, request: Callable[[Node], BaseModel], model: type[_ModelT]
+    ) -> dict[NodeID, _ModelT]:
+        """POST `request(node)` to `path` on every node concurrently and parse the responses as `model`."""
+        tasks = {node.id: self.loop.create_task(self._post(f"{node.url}{path}", request(node))) for node in self.party}
+        return {node_id: model.model_validate((await task).json()) for node_id, task in tasks.items()}
+
+    def validate_signature(self, party_result: Mapping[NodeID, SignedResponse]) -> None:
+        verified = batch_verify_data(
+            (
+                node.curve_name,
+                node.public_key,
+                party_result[node.id].signed_payload(),
+                party_result[node.id].signature,  # type: ignore[attr-defined]
             )
             for node in self.party
+        )
+        result = {node.id: node_verified for node, node_verified in zip(self.party, verified, strict=True)}
+
+        assert all(result.values()), result
+
+    async def _store_items(self, items: dict[str, dict]) -> None:
+        if is_async_repository(self.repository):
+            await self.repository.set_many(items)
+            return
+        for key, value in items.items():
+            self.repository.set(key, value)
+
+    async def _load_items(self, keys: list[str]) -> list[dict | None]:
+        if is_async_repository(self.repository):
+            return await self.repository.get_many(keys)
+        return [self.repository.get(key) for key in keys]
+
+    def _metadata(self) -> dict:
+        return {
+            "curve": self.curve.name,
+            "party": [node.model_dump(mode="json") for node in self.party],
+            "max_signers": self.max_signers,
+            "min_signers": self.min_singers,
+            "compression": self.compression,
         }
 
-        result = {node_id: DKGRound1NodeResponse(**(await task).json()) for node_id, task in tasks.items()}
-        self.validate_signature(result)
+    async def store_metadata(self) -> None:
+        await self._store_items({f"{self.id}-dkg": self._metadata()})
 
-        return result
+    def _round_items(self, round: int, party_result: Mapping[NodeID, BaseModel]) -> dict[str, dict]:
+        return {
+            f"{self.id}-{node.id}-round{round}": party_result[node.id].model_dump(mode="python") for node in self.party
+        }
 
-    def validate_signature[_SIGNATURE_T: (DKGRound1NodeResponse, DKGRound3NodeResponse)](
-        self, party_result: dict[NodeID, _SIGNATURE_T]
-    ) -> None:
-        result = {}
-        for node in self.party:
-            node_result = party_result[node.id]
-            data = node_result.model_dump(mode="python", exclude={"signature"})
-            result[node.id] = single_verify_data(node.curve_name, node.public_key, data, node_result.signature)
+    def _store_items_sync(self, items: dict[str, dict]) -> None:
+        if is_async_repository(self.repository):
+            raise TypeError("The repository is async; use the astore_* methods")
+        for key, value in items.items():
+            self.repository.set(key, value)
 
-        assert all(result.values()), result
+    def store_round1_result(self, party_result: Mapping[NodeID, _Round1T]) -> None:
+        self._store_items_sync(self._round_items(1, party_result))
+
+    def store_round2_result(self, party_result: Mapping[NodeID, DKGRound2EncryptedPackage]) -> None:
+        self._store_items_sync(self._round_items(2, party_result))
 
-    def store_round1_result(self, party_result: dict[NodeID, DKGRound1NodeResponse]) -> None:
-        for node in self.party:
-            self.repository.set(f"{self.id}-{node.id}-round1", party_result[node.id].model_dump(mode="python"))
+    async def astore_round1_result(self, party_result: Mapping[NodeID, _Round1T]) -> None:
+        """`store_round1_result` for sync and async repositories; an async repository gets one `set_many`."""
+        await self._store_items(self._round_items(1, party_result))
 
-    def store_round2_result(self, party_result: dict[NodeID, DKGRound2EncryptedPackage]) -> None:
-        for node in self.party:
-            self.repository.set(f"{self.id}-{node.id}-round2", party_result[node.id].model_dump(mode="python"))
+    async def astore_round2_result(self, party_result: Mapping[NodeID, DKGRound2EncryptedPackage]) -> None:
+        await self._store_items(self._round_items(2, party_result))
 
-    def _round2_data_parsing(
-        self, node: Node, round1_result: dict[NodeID, DKGRound1NodeResponse]
-    ) -> dict[NodeID, DKGRound1NodeResponse]:
+    def _round2_data_parsing(self, node: Node, round1_result: Mapping[NodeID, _Round1T]) -> dict[NodeID, _Round1T]:
         data = {}
         for other_node_id, other_node_response in round1_result.items():
             if node.id == other_node_id:
@@ -104,48 +163,182 @@ class DKG:
             data[other_node_id] = other_node_response
         return data
 
-    async def _round2_per_node(
-        self, node: Node, round1_result: dict[NodeID, DKGRound1NodeResponse]
+    def _received_packages(
+        self, node: Node, round2_result: Mapping[NodeID, DKGRound2EncryptedPackage]
     ) -> DKGRound2EncryptedPackage:
-        broadcast_data = self._round2_data_parsing(node, round1_result)
-        data = DKGRound2Request(id=self.id, broadcast_data=broadcast_data)
-        res = await self._send_request(
-            "POST",
-            f"{node.url}dkg/round2",
-            json=data.model_dump(mode="json"),
+        """The round-2 envelopes the other nodes encrypted for `node`."""
+        return DKGRound2EncryptedPackage(
+            encrypted_package={
+                other_node_id: other_node_response.encrypted_package[node.id]
+                for other_node_id, other_node_response in round2_result.items()
+                if node.id != other_node_id
+            }
         )
-        return DKGRound2EncryptedPackage.model_validate(res.json())
+
+    @abstractmethod
+    async def round1(self) -> dict[NodeID, _Round1T]: ...
+
+    @abstractmethod
+    async def round2(self, round1_result: dict[NodeID, _Round1T]) -> dict[NodeID, DKGRound2EncryptedPackage]: ...
+
+    @abstractmethod
+    async def _finish(self, round2_result: dict[NodeID, DKGRound2EncryptedPackage]) -> _ResultT:
+        """Run round 3 and return the ceremony result."""
+
+    @abstractmethod
+    def _round1_model(self) -> type[_Round1T]: ...
+
+    async def _load_round_result[_ModelT: BaseModel](
+        self, round: int, model: type[_ModelT]
+    ) -> dict[NodeID, _ModelT] | None:
+        values = await self._load_items([f"{self.id}-{node.id}-round{round}" for node in self.party])
+        if any(value is None for value in values):
+            return None
+        return {node.id: model.model_validate(value) for node, value in zip(self.party, values, strict=True)}
+
+    @classmethod
+    async def load(cls, id: DKGID, repository: RepositoryProtocol | AsyncRepositoryProtocol, **kwargs) -> Self:
+        """Rebuild a ceremony from the metadata `run` stored; `kwargs` are the non-stored options."""
+        if is_async_repository(repository):
+            [metadata] = await repository.get_many([f"{id}-dkg"])
+        else:
+            metadata = repository.get(f"{id}-dkg")
+        if metadata is None:
+            raise DKGNotFoundError(f"DKG {id} not found")
+        metadata = dict(metadata)
+        dkg = cls(
+            curve=get_curve(metadata.pop("curve")),
+            party=tuple(Node.model_validate(node) for node in metadata.pop("party")),
+            max_signers=metadata.pop("max_signers"),
+            min_singers=metadata.pop("min_signers"),
+            repository=repository,
+            **metadata,
+            **kwargs,
+        )
+        dkg.id = id
+        return dkg
+
+    @classmethod
+    async def resume(cls, id: DKGID, repository: RepositoryProtocol | AsyncRepositoryProtocol, **kwargs) -> _ResultT:
+        """
+        Continue a ceremony interrupted after `run` stored its metadata, starting from the last
+        round whose results are stored for every node. Nodes answer repeated rounds idempotently.
+        """
+        dkg = await cls.load(id, repository, **kwargs)
+        return await dkg._run_from(
+            await dkg._load_round_result(1, dkg._round1_model()),
+            await dkg._load_round_result(2, DKGRound2EncryptedPackage),
+        )
+
+    async def _run_from(
+        self,
+        round1_result: dict[NodeID, _Round1T] | None = None,
+        round2_result: dict[NodeID, DKGRound2EncryptedPackage] | None = None,
+    ) -> _ResultT:
+        if round1_result is None:
+            round1_result = await self.round1()
+            await self.astore_round1_result(round1_result)
+            round2_result = None
+        if round2_result is None:
+            round2_result = await self.round2(round1_result)
+            await self.astore_round2_result(round2_result)
+        return await self._finish(round2_result)
+
+    async def run(self) -> _ResultT:
+        await self.store_metadata()
+        return await self._run_from()
+
+
+class DKG(BaseDKG[DKGRound1NodeResponse, PublicKeyPackage]):
+    def __init__(
+        self,
+        curve: BaseCryptoCurve,
+        party: tuple[Node, ...],
+        max_signers: int,
+        min_singers: int,
+        repository: RepositoryProtocol | AsyncRepositoryProtocol,
+        loop: asyncio.AbstractEventLoop | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: int = 10,
+        compression: ContentEncoding | None = None,
+        broadcast_upload: bool = False,
+        peer_delivery: bool = False,
+    ) -> None:
+        super().__init__(curve, party, max_signers, min_singers, repository, loop, http_client, timeout, compression)
+        # Upload the round-1 broadcast once to the first node and let the others fetch it by digest.
+        self.broadcast_upload = broadcast_upload
+        # Nodes push their round-2 shares to each other; round 3 starts once every node has them.
+        self.peer_delivery = peer_delivery
+
+    async def round1(self) -> dict[NodeID, DKGRound1NodeResponse]:
+        request = DKGRound1Request(
+            id=self.id,
+            max_signers=self.max_signers,
+            min_signers=self.min_singers,
+            party_ids=[node.id for node in self.party],
+            curve=self.curve.name,
+        )
+        result = await self._post_party("dkg/round1", lambda node: request, DKGRound1NodeResponse)
+        self.validate_signature(result)
+
+        return result
+
+    async def upload_broadcast(self, round1_result: dict[NodeID, DKGRound1NodeResponse]) -> DKGBroadcastReference:
+        source = self.party[0]
+        res = await self._post(f"{source.url}dkg/broadcast", DKGBroadcast(id=self.id, broadcast_data=round1_result))
+        reference = DKGBroadcastReference.model_validate(res.json())
+        assert reference.digest == broadcast_digest(round1_result), "Broadcast digest mismatch"
+        return reference
+
+    def _round2_data(
+        self,
+        node: Node,
+        round1_result: dict[NodeID, DKGRound1NodeResponse],
+        broadcast: DKGBroadcastReference | None = None,
+    ) -> DKGRound2Request:
+        if broadcast is None:
+            return DKGRound2Request(
+                id=self.id,
+                broadcast_data=self._round2_data_parsing(node, round1_result),
+                deliver_to_peers=self.peer_delivery,
+            )
+        return DKGRound2Request(id=self.id, broadcast=broadcast, deliver_to_peers=self.peer_delivery)
 
     async def round2(
         self, round1_result: dict[NodeID, DKGRound1NodeResponse]
     ) -> dict[NodeID, DKGRound2EncryptedPackage]:
-        tasks = {node.id: asyncio.create_task(self._round2_per_node(node, round1_result)) for node in self.party}
-        return {node_id: (await task) for node_id, task in tasks.items()}
+        broadcast = await self.upload_broadcast(round1_result) if self.broadcast_upload else None
+        return await self._post_party(
+            "dkg/round2", lambda node: self._round2_data(node, round1_result, broadcast), DKGRound2EncryptedPackage
+        )
+
+    async def wait_for_shares(self) -> None:
+        """Poll the nodes until each one holds the round-2 shares of all its partners."""
+        deadline = self.loop.time() + self.timeout
+        pending = list(self.party)
+        delay = 0.01
+        while True:
+            responses = await asyncio.gather(
+                *(self._send_request("GET", f"{node.url}dkg/round2/status/{self.id}") for node in pending)
+            )
+            pending = [
+                node
+                for node, res in zip(pending, responses, strict=True)
+                if DKGRound2Status.model_validate(res.json()).missing
+            ]
+            if not pending:
+                return
+            if self.loop.time() >= deadline:
+                raise NodeTimeout(f"Round 2 shares not delivered to nodes: {[node.id for node in pending]}")
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, 1)
 
     def _round3_data_parsing(
         self, node: Node, round2_result: dict[NodeID, DKGRound2EncryptedPackage]
     ) -> DKGRound3Request:
-        return DKGRound3Request(
-            encrypted_package=DKGRound2EncryptedPackage(
-                encrypted_package={
-                    other_node_id: other_node_response.encrypted_package[node.id]
-                    for other_node_id, other_node_response in round2_result.items()
-                    if node.id != other_node_id
-                }
-            ),
-            id=self.id,
-        )
-
-    async def _round3_per_node(
-        self, node: Node, round2_result: dict[NodeID, DKGRound2EncryptedPackage]
-    ) -> DKGRound3NodeResponse:
-        data = self._round3_data_parsing(node, round2_result).model_dump(mode="json")
-        res = await self._send_request(
-            "POST",
-            f"{node.url}dkg/round3",
-            json=data,
-        )
-        return DKGRound3NodeResponse.model_validate(res.json())
+        if self.peer_delivery:
+            return DKGRound3Request(id=self.id)
+        return DKGRound3Request(encrypted_package=self._received_packages(node, round2_result), id=self.id)
 
     def _check_round3_result(self, round3_result: dict[NodeID, DKGRound3NodeResponse]) -> None:
         if len({result.pubkey_package.verifying_key for result in round3_result.values()}) == 1:
@@ -156,8 +349,11 @@ class DKG:
         )
 
     async def round3(self, round2_result: dict[NodeID, DKGRound2EncryptedPackage]) -> DKGRound3NodeResponse:
-        tasks = {node.id: asyncio.create_task(self._round3_per_node(node, round2_result)) for node in self.party}
-        result = {node_id: (await task) for node_id, task in tasks.items()}
+        if self.peer_delivery:
+            await self.wait_for_shares()
+        result = await self._post_party(
+            "dkg/round3", lambda node: self._round3_data_parsing(node, round2_result), DKGRound3NodeResponse
+        )
         self.validate_signature(result)
         self._check_round3_result(result)
         return list(result.values())[0]
@@ -166,10 +362,83 @@ class DKG:
 
     def dispute(self) -> list[Node]: ...
 
-    async def run(self) -> PublicKeyPackage:
-        round1_result = await self.round1()
-        self.store_round1_result(round1_result)
-        round2_result = await self.round2(round1_result)
-        self.store_round2_result(round2_result)
+    def _metadata(self) -> dict:
+        return {**super()._metadata(), "broadcast_upload": self.broadcast_upload, "peer_delivery": self.peer_delivery}
+
+    def _round1_model(self) -> type[DKGRound1NodeResponse]:
+        return DKGRound1NodeResponse
+
+    async def _finish(self, round2_result: dict[NodeID, DKGRound2EncryptedPackage]) -> PublicKeyPackage:
         result = await self.round3(round2_result)
         return result.pubkey_package
+
+
+class BatchDKG(BaseDKG[DKGBatchRound1NodeResponse, list[PublicKeyPackage]]):
+    """
+    Generates `key_count` independent keys in one ceremony. Each round is one request per node
+    carrying the packages of every key, covered by one signature.
+    """
+
+    def __init__(self, *args, key_count: int, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if not 0 < key_count <= MAX_DKG_BATCH_SIZE:
+            raise ValueError(f"key_count must be between 1 and {MAX_DKG_BATCH_SIZE}")
+        self.key_count = key_count
+
+    async def round1(self) -> dict[NodeID, DKGBatchRound1NodeResponse]:
+        request = DKGBatchRound1Request(
+            id=self.id,
+            max_signers=self.max_signers,
+            min_signers=self.min_singers,
+            party_ids=[node.id for node in self.party],
+            curve=self.curve.name,
+            key_count=self.key_count,
+        )
+        result = await self._post_party("dkg/batch/round1", lambda node: request, DKGBatchRound1NodeResponse)
+        self.validate_signature(result)
+        return result
+
+    async def round2(
+        self, round1_result: dict[NodeID, DKGBatchRound1NodeResponse]
+    ) -> dict[NodeID, DKGRound2EncryptedPackage]:
+        return await self._post_party(
+            "dkg/batch/round2",
+            lambda node: DKGBatchRound2Request(
+                id=self.id, key_count=self.key_count, broadcast_data=self._round2_data_parsing(node, round1_result)
+            ),
+            DKGRound2EncryptedPackage,
+        )
+
+    def _round3_data_parsing(
+        self, node: Node, round2_result: dict[NodeID, DKGRound2EncryptedPackage]
+    ) -> DKGBatchRound3Request:
+        return DKGBatchRound3Request(
+            id=self.id, key_count=self.key_count, encrypted_package=self._received_packages(node, round2_result)
+        )
+
+    async def round3(self, round2_result: dict[NodeID, DKGRound2EncryptedPackage]) -> list[PublicKeyPackage]:
+        result = await self._post_party(
+            "dkg/batch/round3", lambda node: self._round3_data_parsing(node, round2_result), DKGBatchRound3NodeResponse
+        )
+        self.validate_signature(result)
+        if any(len(response.pubkey_packages) != self.key_count for response in result.values()):
+            raise DKGResultIncompatibilityError(f"Batch DKG round 3 failed: expected {self.key_count} public keys.")
+        pubkey_packages = list(result.values())[0].pubkey_packages
+        for index, pubkey_package in enumerate(pubkey_packages):
+            if any(
+                response.pubkey_packages[index].verifying_key != pubkey_package.verifying_key
+                for response in result.values()
+            ):
+                raise DKGResultIncompatibilityError(
+                    f"Batch DKG round 3 failed: Public keys from nodes do not match for key {index}."
+                )
+        return pubkey_packages
+
+    def _metadata(self) -> dict:
+        return {**super()._metadata(), "key_count": self.key_count}
+
+    def _round1_model(self) -> type[DKGBatchRound1NodeResponse]:
+        return DKGBatchRound1NodeResponse
+
+    async def _finish(self, round2_result: dict[NodeID, DKGRound2EncryptedPackage]) -> list[PublicKeyPackage]:
+        return await self.round3(round2_result)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterable
+from contextlib import AsyncExitStack
+from typing import Any, cast
+
+import httpx
+
+from zexfrost.custom_types import BaseCryptoCurve, NodeID
+from zexfrost.repository import AsyncRepositoryProtocol, RepositoryProtocol
+
+from .custom_types import DKGJob, DKGJobResult
+from .dkg import DKG
+
+logger = logging.getLogger(__name__)
+
+
+class DKGScheduler:
+    """
+    Runs many DKG ceremonies concurrently, e.g. to provision keys in bulk.
+
+    At most `max_concurrency` ceremonies run at once and every node takes part in at most
+    `max_per_node` of them, so node load stays bounded whatever the queue length. Node slots are
+    acquired in node id order, so jobs with overlapping parties cannot deadlock, and before the
+    global slot, so a job waiting for a busy node does not keep other jobs from running; `run`
+    only hands a worker a job whose nodes all have a free slot. All ceremonies share one HTTP
+    connection pool. Failed jobs are reported in their result instead of cancelling the others.
+    """
+
+    def __init__(
+        self,
+        curve: BaseCryptoCurve,
+        repository: RepositoryProtocol | AsyncRepositoryProtocol,
+        max_concurrency: int = 32,
+        max_per_node: int = 8,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: int = 10,
+        dkg_class: type[DKG] = DKG,
+        **dkg_options: Any,
+    ):
+        if max_concurrency <= 0 or max_per_node <= 0:
+            raise ValueError("max_concurrency and max_per_node must be positive")
+        self.curve = curve
+        self.repository = repository
+        self.max_concurrency = max_concurrency
+        self.max_per_node = max_per_node
+        self.timeout = timeout
+        self.dkg_class = dkg_class
+        self.dkg_options = dkg_options
+        self._own_http_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=max_concurrency)
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._node_slots: defaultdict[NodeID, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(max_per_node))
+
+    @staticmethod
+    def _node_ids(job: DKGJob) -> list[NodeID]:
+        return sorted({node.id for node in job.party})
+
+    async def run_job(self, job: DKGJob) -> DKGJobResult:
+        queued_at = time.perf_counter()
+        async with AsyncExitStack() as stack:
+            for node_id in self._node_ids(job):
+                await stack.enter_async_context(self._node_slots[node_id])
+            return await self._run_reserved(job, queued_at)
+
+    async def _try_reserve(self, job: DKGJob) -> bool:
+        """Take the node slots of the job if all of them are free, without waiting."""
+        node_ids = self._node_ids(job)
+        if any(self._node_slots[node_id].locked() for node_id in node_ids):
+            return False
+        for node_id in node_ids:
+            # An unlocked semaphore is acquired without suspending, so no other task takes the slot first.
+            await self._node_slots[node_id].acquire()
+        return True
+
+    async def _run_reserved(self, job: DKGJob, queued_at: float) -> DKGJobResult:
+        """Run a job whose node slots are held by the caller."""
+        async with self._slots:
+            started_at = time.perf_counter()
+            dkg = self.dkg_class(
+                self.curve,
+                job.party,
+                job.max_signers,
+                job.min_signers,
+                self.repository,
+                http_client=self.http_client,
+                timeout=self.timeout,
+                **self.dkg_options,
+            )
+            try:
+                pubkey_package = await dkg.run()
+            except Exception as e:
+                logger.exception("DKG %s failed", dkg.id)
+                return DKGJobResult(
+                    job=job,
+                    id=dkg.id,
+                    error=repr(e),
+                    latency=time.perf_counter() - started_at,
+                    queued=started_at - queued_at,
+                )
+            return DKGJobResult(
+                job=job,
+                id=dkg.id,
+                pubkey_package=pubkey_package,
+                latency=time.perf_counter() - started_at,
+                queued=started_at - queued_at,
+            )
+
+    async def run(self, jobs: Iterable[DKGJob]) -> list[DKGJobResult]:
+        """
+        Run every job and return their results in order. `max_concurrency` workers take the first
+        queued job whose nodes all have a free slot, so only that many tasks exist however many jobs
+        are queued, and jobs waiting for busy nodes do not hold workers that jobs on idle nodes could use.
+        """
+        queued_at = time.perf_counter()
+        pending = deque(enumerate(jobs))
+        results: list[DKGJobResult | None] = [None] * len(pending)
+        released = asyncio.Condition()
+
+        async def take() -> tuple[int, DKGJob] | None:
+            for item in pending:
+                if await self._try_reserve(item[1]):
+                    pending.remove(item)
+                    return item
+            return None
+
+        async def worker() -> None:
+            while True:
+                async with released:
+                    item = await take()
+                    while item is None and pending:
+                        await released.wait()
+                        item = await take()
+                if item is None:
+                    return
+                index, job = item
+                try:
+                    results[index] = await self._run_reserved(job, queued_at)
+                finally:
+                    for node_id in self._node_ids(job):
+                        self._node_slots[node_id].release()
+                    async with released:
+                        released.notify_all()
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_concurrency, len(results)))))
+        return cast(list[DKGJobResult], results)
+
+    async def aclose(self) -> None:
+        if self._own_http_client:
+            await self.http_client.aclose()
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from zexfrost.custom_types import Commitment, HexStr, Node, NodeID, TweakBy
+
+logger = logging.getLogger(__name__)
+
+type PoolKey = tuple[NodeID, HexStr, TweakBy | None]
+type CommitmentFetcher = Callable[[Node, TweakBy | None, int], Awaitable[list[Commitment]]]
+
+
+class NoncePool:
+    """
+    Reserve of node commitments fetched ahead of signing.
+
+    Commitments are kept per node and per (verifying key, tweak) so that a signing
+    round can skip the commitment fan-out. Each commitment is handed out once; a
+    background refill is scheduled whenever a reserve drops below the low-water mark.
+    Commitments older than `max_age` seconds are dropped, since the nodes expire their
+    nonces; keep it below the nodes' nonce TTL.
+    """
+
+    def __init__(
+        self,
+        fetcher: CommitmentFetcher,
+        loop: asyncio.AbstractEventLoop,
+        low_water_mark: int = 16,
+        refill_size: int = 64,
+        max_age: float | None = 240,
+    ):
+        if refill_size <= 0:
+            raise ValueError("refill_size must be positive")
+        self._fetcher = fetcher
+        self._loop = loop
+        self.low_water_mark = low_water_mark
+        self.refill_size = refill_size
+        self.max_age = max_age
+        # (fetch time, commitment), oldest first.
+        self._reserves: dict[PoolKey, deque[tuple[float, Commitment]]] = {}
+        self._refills: dict[PoolKey, asyncio.Task[None]] = {}
+
+    def _key(self, node_id: NodeID, verifying_key: HexStr, tweak_by: TweakBy | None) -> PoolKey:
+        return (node_id, verifying_key, tweak_by)
+
+    def size(self, node_id: NodeID, verifying_key: HexStr, tweak_by: TweakBy | None) -> int:
+        reserve = self._reserves.get(self._key(node_id, verifying_key, tweak_by))
+        if reserve is None:
+            return 0
+        self._prune(reserve)
+        return len(reserve)
+
+    def _prune(self, reserve: deque[tuple[float, Commitment]]) -> None:
+        if self.max_age is None:
+            return
+        oldest = self._loop.time() - self.max_age
+        while reserve and reserve[0][0] <= oldest:
+            reserve.popleft()
+
+    def put(
+        self,
+        node_id: NodeID,
+        verifying_key: HexStr,
+        tweak_by: TweakBy | None,
+        commitments: list[Commitment],
+        fetched_at: float | None = None,
+    ) -> None:
+        fetched_at = self._loop.time() if fetched_at is None else fetched_at
+        self._reserves.setdefault(self._key(node_id, verifying_key, tweak_by), deque()).extend(
+            (fetched_at, commitment) for commitment in commitments
+        )
+
+    def take(
+        self, party: tuple[Node, ...], verifying_key: HexStr, tweak_by: TweakBy | None
+    ) -> dict[NodeID, Commitment] | None:
+        """
+        Take one commitment from every node of the party.
+        Returns None without consuming anything if any node's reserve is empty.
+        """
+        keys = {node.id: self._key(node.id, verifying_key, tweak_by) for node in party}
+        if not all(self.size(*key) for key in keys.values()):
+            self.refill(party, verifying_key, tweak_by)
+            return None
+        result = {node_id: self._reserves[key].popleft()[1] for node_id, key in keys.items()}
+        self.refill(party, verifying_key, tweak_by)
+        return result
+
+    def refill(self, party: tuple[Node, ...], verifying_key: HexStr, tweak_by: TweakBy | None) -> None:
+        """Schedule a background refill for every node whose reserve is below the low-water mark."""
+        for node in party:
+            key = self._key(node.id, verifying_key, tweak_by)
+            if self.size(*key) >= self.low_water_mark or key in self._refills:
+                continue
+            self._refills[key] = self._loop.create_task(self._refill(node, key))
+
+    async def prefill(self, party: tuple[Node, ...], verifying_key: HexStr, tweak_by: TweakBy | None) -> None:
+        """Fill the reserves of the party and wait until the refills are done."""
+        self.refill(party, verifying_key, tweak_by)
+        tasks = [
+            task
+            for node in party
+            if (task := self._refills.get(self._key(node.id, verifying_key, tweak_by))) is not None
+        ]
+        await asyncio.gather(*tasks)
+
+    async def _refill(self, node: Node, key: PoolKey) -> None:
+        try:
+            fetched_at = self._loop.time()
+            commitments = await self._fetcher(node, key[2], self.refill_size)
+            self.put(*key, commitments, fetched_at)
+        except Exception:
+            logger.exception("Failed to refill nonce pool of node %s", node.id)
+        finally:
+            if self._refills.get(key) is asyncio.current_task():
+                del self._refills[key]
+
+    def clear(self) -> None:
+        """Drop every reserved commitment and cancel running refills."""
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
+        self._reserves.clear()
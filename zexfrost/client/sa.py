@@ -4,9 +4,12 @@ from collections import defaultdict
 import httpx
 
 from zexfrost.custom_types import (
+    MAX_COMMITMENT_BATCH,
     BaseCryptoCurve,
     BaseCurveWithTweakedSign,
+    BatchCommitmentRequest,
     Commitment,
+    CommitmentBatchEntry,
     CommitmentRequest,
     HexStr,
     Node,
@@ -19,8 +22,11 @@ from zexfrost.custom_types import (
     TweakBy,
     UserSigningData,
 )
+from zexfrost.tweak_cache import tweak_pubkey_package
 from zexfrost.utils import get_random_party
 
+from .nonce_pool import NoncePool
+
 
 class CommitmentGroupError(ExceptionGroup): ...
 
@@ -28,6 +34,25 @@ class CommitmentGroupError(ExceptionGroup): ...
 class SignatureGroupError(ExceptionGroup): ...
 
 
+def _chunk_commitment_entries(
+    entries: list[CommitmentBatchEntry], limit: int
+) -> list[list[tuple[int, CommitmentBatchEntry]]]:
+    """Split entries into chunks of at most `limit` commitments, tagged with their entry index."""
+    chunks: list[list[tuple[int, CommitmentBatchEntry]]] = [[]]
+    room = limit
+    for index, entry in enumerate(entries):
+        count = entry.count
+        while count > 0:
+            if room == 0:
+                chunks.append([])
+                room = limit
+            take = min(count, room)
+            chunks[-1].append((index, CommitmentBatchEntry(tweak_by=entry.tweak_by, count=take)))
+            count -= take
+            room -= take
+    return [chunk for chunk in chunks if chunk]
+
+
 class SA:
     def __init__(
         self,
@@ -38,6 +63,9 @@ class SA:
         http_client: httpx.AsyncClient | None = None,
         timeout: int = 20,
         loop: asyncio.AbstractEventLoop | None = None,
+        nonce_pool: bool = False,
+        nonce_pool_low_water_mark: int = 16,
+        nonce_pool_refill_size: int = 64,
     ):
         self.curve = curve
         self._party = party
@@ -46,6 +74,16 @@ class SA:
         self.http_client = http_client or httpx.AsyncClient()
         self.loop = loop or asyncio.get_running_loop()
         self.min_signer = min_signer
+        self.nonce_pool = (
+            NoncePool(
+                self._fetch_commitments,
+                self.loop,
+                low_water_mark=nonce_pool_low_water_mark,
+                refill_size=nonce_pool_refill_size,
+            )
+            if nonce_pool
+            else None
+        )
 
     def update_party(self, new_party: tuple[Node, ...]) -> None:
         self._party = new_party
@@ -56,11 +94,11 @@ class SA:
         pubkey_package = self.pubkey_package
         match self.curve:
             case BaseCurveWithTweakedSign():
-                pubkey_package = self.curve.pubkey_package_tweak(pubkey_package, tweak_by)
+                pubkey_package = tweak_pubkey_package(self.curve, pubkey_package, tweak_by)
                 return self.curve.aggregate_with_tweak(signing_package, shares, pubkey_package, None)
             case BaseCryptoCurve():
                 if tweak_by is not None:
-                    pubkey_package = self.curve.pubkey_package_tweak(pubkey_package, tweak_by)
+                    pubkey_package = tweak_pubkey_package(self.curve, pubkey_package, tweak_by)
                 return self.curve.aggregate(signing_package, shares, pubkey_package)
         raise NotImplementedError("Curve type is unknown")
 
@@ -68,36 +106,63 @@ class SA:
         pubkey_package = self.pubkey_package
         match self.curve:
             case BaseCurveWithTweakedSign():
-                pubkey_package = self.curve.pubkey_package_tweak(
-                    self.curve.pubkey_package_tweak(self.pubkey_package, tweak_by)
+                pubkey_package = tweak_pubkey_package(
+                    self.curve, tweak_pubkey_package(self.curve, self.pubkey_package, tweak_by)
                 )
             case BaseCryptoCurve():
                 if tweak_by is not None:
-                    pubkey_package = self.curve.pubkey_package_tweak(self.pubkey_package, tweak_by)
+                    pubkey_package = tweak_pubkey_package(self.curve, self.pubkey_package, tweak_by)
 
         return self.curve.verify_group_signature(signature=signature, msg=msg, pubkey_package=pubkey_package)
 
+    async def _node_commitment(self, node: Node, tweak_by: TweakBy | None) -> Commitment:
+        res = await node.send_request(
+            self.http_client,
+            "POST",
+            "sign/commitment",
+            json=CommitmentRequest(
+                pubkey_package=self.pubkey_package, tweak_by=tweak_by, curve=self.curve.name
+            ).model_dump(mode="json"),
+        )
+        res.raise_for_status()
+        return Commitment.model_validate(res.json())
+
+    async def _node_batch_commitment(self, node: Node, entries: list[CommitmentBatchEntry]) -> list[list[Commitment]]:
+        """Request the commitments in as many batch requests as the per-request cap needs."""
+        result: list[list[Commitment]] = [[] for _ in entries]
+        for chunk in _chunk_commitment_entries(entries, MAX_COMMITMENT_BATCH):
+            res = await node.send_request(
+                self.http_client,
+                "POST",
+                "sign/commitment/batch",
+                json=BatchCommitmentRequest(
+                    pubkey_package=self.pubkey_package, entries=[entry for _, entry in chunk], curve=self.curve.name
+                ).model_dump(mode="json"),
+            )
+            res.raise_for_status()
+            for (index, _), commitments in zip(chunk, res.json(), strict=True):
+                result[index].extend(Commitment.model_validate(item) for item in commitments)
+        return result
+
+    async def _fetch_commitments(self, node: Node, tweak_by: TweakBy | None, count: int) -> list[Commitment]:
+        result = await self._node_batch_commitment(node, [CommitmentBatchEntry(tweak_by=tweak_by, count=count)])
+        return result[0]
+
+    async def prefill_nonce_pool(self, tweaks: list[TweakBy | None]) -> None:
+        """Fill the nonce pool of every party node for the given tweaks ahead of signing."""
+        if self.nonce_pool is None:
+            raise ValueError("Nonce pool is not enabled")
+        await asyncio.gather(
+            *(self.nonce_pool.prefill(self._party, self.pubkey_package.verifying_key, tweak_by) for tweak_by in tweaks)
+        )
+
     async def commitment(self, random_party: tuple[Node, ...], tweak_by: TweakBy | None) -> dict[NodeID, Commitment]:
         exceptions = []
-        tasks = {
-            node.id: self.loop.create_task(
-                node.send_request(
-                    self.http_client,
-                    "POST",
-                    "sign/commitment",
-                    json=CommitmentRequest(
-                        pubkey_package=self.pubkey_package, tweak_by=tweak_by, curve=self.curve.name
-                    ).model_dump(mode="json"),
-                )
-            )
-            for node in random_party
-        }
+        tasks = {node.id: self.loop.create_task(self._node_commitment(node, tweak_by)) for node in random_party}
         result = {}
         for node_id, task in tasks.items():
             try:
-                res = await task
-                res.raise_for_status()
-                result[node_id] = Commitment.model_validate(res.json())
+                result[node_id] = await task
             except Exception as e:
                 exceptions.append(e)
 
@@ -106,13 +171,52 @@ class SA:
 
         return result
 
+    async def batch_commitment(
+        self, random_party: tuple[Node, ...], counts: dict[TweakBy | None, int]
+    ) -> dict[TweakBy | None, list[dict[NodeID, Commitment]]]:
+        """
+        Get `count` commitment sets per tweak with a single request per node.
+        """
+        entries = [CommitmentBatchEntry(tweak_by=tweak_by, count=count) for tweak_by, count in counts.items()]
+        exceptions = []
+        tasks = {node.id: self.loop.create_task(self._node_batch_commitment(node, entries)) for node in random_party}
+        nodes_result: dict[NodeID, list[list[Commitment]]] = {}
+        for node_id, task in tasks.items():
+            try:
+                nodes_result[node_id] = await task
+            except Exception as e:
+                exceptions.append(e)
+
+        if exceptions:
+            raise CommitmentGroupError("Error while trying to get commitment", exceptions)
+
+        return {
+            entry.tweak_by: [
+                {node_id: node_result[index][i] for node_id, node_result in nodes_result.items()}
+                for i in range(entry.count)
+            ]
+            for index, entry in enumerate(entries)
+        }
+
     async def _get_commitments_for_sign(
         self, random_party: tuple[Node, ...], data: dict[SignatureID, UserSigningData]
     ) -> dict[SignatureID, dict[NodeID, Commitment]]:
-        tasks: dict[HexStr, asyncio.tasks.Task[dict[NodeID, Commitment]]] = {}
+        result: dict[SignatureID, dict[NodeID, Commitment]] = {}
+        pending: dict[TweakBy | None, list[SignatureID]] = defaultdict(list)
         for sig_id, _data in data.items():
-            tasks[sig_id] = self.loop.create_task(self.commitment(random_party, _data.tweak_by))
-        return {sig_id: await task for sig_id, task in tasks.items()}
+            if self.nonce_pool is not None:
+                pooled = self.nonce_pool.take(random_party, self.pubkey_package.verifying_key, _data.tweak_by)
+                if pooled is not None:
+                    result[sig_id] = pooled
+                    continue
+            pending[_data.tweak_by].append(sig_id)
+        if pending:
+            commitments = await self.batch_commitment(
+                random_party, {tweak_by: len(sig_ids) for tweak_by, sig_ids in pending.items()}
+            )
+            for tweak_by, sig_ids in pending.items():
+                result.update(zip(sig_ids, commitments[tweak_by], strict=True))
+        return result
 
     async def sign(
         self, route: str, user_signing_data: dict[SignatureID, UserSigningData], metadata: dict | None = None
@@ -0,0 +1,52 @@
+import zlib
+from typing import Literal
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional
+    zstandard = None
+
+type ContentEncoding = Literal["gzip", "zstd"]
+
+MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024
+
+
+def supported_encodings() -> tuple[ContentEncoding, ...]:
+    return ("gzip", "zstd") if zstandard is not None else ("gzip",)
+
+
+def compress(data: bytes, encoding: ContentEncoding) -> bytes:
+    match encoding:
+        case "gzip":
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            return compressor.compress(data) + compressor.flush()
+        case "zstd" if zstandard is not None:
+            return zstandard.ZstdCompressor().compress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str, max_size: int = MAX_DECOMPRESSED_SIZE) -> bytes:
+    """Decompress a request body, refusing to inflate it beyond `max_size` bytes."""
+    match encoding:
+        case "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                result = decompressor.decompress(data, max_size)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip body: {e}") from e
+            if decompressor.unconsumed_tail or not decompressor.eof:
+                raise ValueError("Compressed body is truncated or too large")
+            return result
+        case "zstd" if zstandard is not None:
+            chunks, size = [], 0
+            try:
+                with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+                    while chunk := reader.read(max_size + 1 - size):
+                        chunks.append(chunk)
+                        size += len(chunk)
+            except zstandard.ZstdError as e:
+                raise ValueError(f"Invalid zstd body: {e}") from e
+            if size > max_size:
+                raise ValueError("Compressed body is too large")
+            return b"".join(chunks)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
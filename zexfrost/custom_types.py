@@ -1,4 +1,5 @@
-from typing import Annotated, ClassVar, Literal
+from collections.abc import Mapping
+from typing import Annotated, Any, ClassVar, Literal, Self
 from uuid import UUID
 
 import httpx
@@ -17,7 +18,9 @@ from frost_lib.custom_types import (
     SharePackage,
     SigningPackage,
 )
-from pydantic import BaseModel, BeforeValidator, HttpUrl, PlainSerializer
+from pydantic import BaseModel, BeforeValidator, Field, HttpUrl, PlainSerializer, PrivateAttr, model_validator
+
+from zexfrost.canonical import canonical_bytes
 
 
 def bytes_to_hex(value: bytes) -> HexStr:
@@ -39,6 +42,7 @@ type TweakBy = Annotated[
     PlainSerializer(bytes_to_hex, return_type=str, when_used="json"),
 ]
 type CurveName = Literal["secp256k1_tr", "secp256k1", "ed25519", "secp256k1_evm"]
+type EncryptionVersion = Literal["v1", "v2"]
 
 __all__ = [
     "Node",
@@ -105,31 +109,130 @@ class DKGRound1Request(BaseModel):
     curve: CurveName
 
 
-class DKGRound1NodeResponse(BaseModel):
+class SignedResponse(BaseModel):
+    UNSIGNED_FIELDS: ClassVar[set[str]] = {"signature"}
+    SIGNED_DUMP_MODE: ClassVar[Literal["python", "json"]] = "python"
+    _signed_payload: bytes | None = PrivateAttr(default=None)
+
+    def signed_payload(self) -> bytes:
+        """
+        Canonical bytes covered by `signature`, memoized until a field is assigned or the model is
+        copied. Mutating a nested model in place does not reset the memo.
+        """
+        if self._signed_payload is None:
+            self._signed_payload = canonical_bytes(
+                self.model_dump(mode=self.SIGNED_DUMP_MODE, exclude=self.UNSIGNED_FIELDS)
+            )
+        return self._signed_payload
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith("_"):
+            self._signed_payload = None
+        super().__setattr__(name, value)
+
+    def model_copy(self, *, update: Mapping[str, Any] | None = None, deep: bool = False) -> Self:
+        copy = super().model_copy(update=update, deep=deep)
+        copy._signed_payload = None
+        return copy
+
+
+class DKGRound1NodeResponse(SignedResponse):
+    # Not signed, so nodes that predate `encryption_versions` still verify.
+    UNSIGNED_FIELDS: ClassVar[set[str]] = {"signature", "encryption_versions"}
+
     package: DKGPart1Package
     temp_public_key: HexStr
     signature: HexStr
+    # Round-2 envelopes the node can decrypt.
+    encryption_versions: list[str] = ["v1"]
 
 
-class DKGRound2Request(BaseModel):
+class DKGBroadcast(BaseModel):
     id: DKGID
     broadcast_data: dict[NodeID, DKGRound1NodeResponse]
 
 
+class DKGBroadcastReference(BaseModel):
+    digest: HexStr
+    source: NodeID
+
+
+class DKGRound2Request(BaseModel):
+    id: DKGID
+    broadcast_data: dict[NodeID, DKGRound1NodeResponse] = {}
+    # Instead of `broadcast_data`: a broadcast uploaded to `source`, holding every node's round-1 response.
+    broadcast: DKGBroadcastReference | None = None
+    # Push the encrypted shares straight to the partners instead of returning them.
+    deliver_to_peers: bool = False
+
+
 class DKGRound2EncryptedPackage(BaseModel):
     encrypted_package: dict[NodeID, str]
 
 
+class DKGShareDelivery(SignedResponse):
+    """A round-2 share pushed by its sender straight to the receiving node."""
+
+    SIGNED_DUMP_MODE: ClassVar[Literal["python", "json"]] = "json"
+
+    id: DKGID
+    sender: NodeID
+    receiver: NodeID
+    encrypted_package: str
+    signature: HexStr = ""
+
+
+class DKGRound2Status(BaseModel):
+    received: list[NodeID]
+    missing: list[NodeID]
+
+
 class DKGRound3Request(BaseModel):
     id: DKGID
-    encrypted_package: DKGRound2EncryptedPackage
+    # None when the shares were delivered peer to peer.
+    encrypted_package: DKGRound2EncryptedPackage | None = None
 
 
-class DKGRound3NodeResponse(BaseModel):
+class DKGRound3NodeResponse(SignedResponse):
     pubkey_package: PublicKeyPackage
     signature: HexStr
 
 
+# Hard cap on the keys of one batch DKG; nodes may configure a lower one.
+MAX_DKG_BATCH_SIZE = 256
+
+
+class DKGBatchRound1Request(DKGRound1Request):
+    key_count: int = Field(gt=0, le=MAX_DKG_BATCH_SIZE)
+
+
+class DKGBatchRound1NodeResponse(SignedResponse):
+    UNSIGNED_FIELDS: ClassVar[set[str]] = {"signature", "encryption_versions"}
+
+    packages: list[DKGPart1Package]
+    temp_public_key: HexStr
+    signature: HexStr
+    encryption_versions: list[str] = ["v1"]
+
+
+class DKGBatchRound2Request(BaseModel):
+    id: DKGID
+    key_count: int = Field(gt=0, le=MAX_DKG_BATCH_SIZE)
+    broadcast_data: dict[NodeID, DKGBatchRound1NodeResponse]
+
+
+class DKGBatchRound3Request(BaseModel):
+    id: DKGID
+    key_count: int = Field(gt=0, le=MAX_DKG_BATCH_SIZE)
+    # One envelope per sender holding the JSON list of its `key_count` packages for the receiver.
+    encrypted_package: DKGRound2EncryptedPackage
+
+
+class DKGBatchRound3NodeResponse(SignedResponse):
+    pubkey_packages: list[PublicKeyPackage]
+    signature: HexStr
+
+
 class AnnulmentData(BaseModel): ...
 
 
@@ -139,6 +242,32 @@ class CommitmentRequest(BaseModel):
     tweak_by: TweakBy | None = None
 
 
+# Hard cap on the commitments of one batch request; nodes may configure a lower one.
+MAX_COMMITMENT_BATCH = 1024
+
+
+class CommitmentBatchEntry(BaseModel):
+    tweak_by: TweakBy | None = None
+    count: int = Field(gt=0, le=MAX_COMMITMENT_BATCH)
+
+
+class BatchCommitmentRequest(BaseModel):
+    pubkey_package: PublicKeyPackage
+    curve: CurveName
+    entries: list[CommitmentBatchEntry] = Field(max_length=MAX_COMMITMENT_BATCH)
+
+    @model_validator(mode="after")
+    def _check_total(self) -> "BatchCommitmentRequest":
+        if self.total > MAX_COMMITMENT_BATCH:
+            raise ValueError(f"A batch may request at most {MAX_COMMITMENT_BATCH} commitments")
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(entry.count for entry in self.entries)
+
+
+type BatchCommitmentResponse = list[list[Commitment]]
 type SignatureID = str
 type SigningMessage = dict[SignatureID, bytes]
 type SigningsData = dict[SignatureID, SigningData]
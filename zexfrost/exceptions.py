@@ -52,3 +52,21 @@ class DKGResultIncompatibilityError(ZexFrostBaseException):
     This indicates a critical issue with the distributed key generation process,
     as all nodes must rich to the same public key.
     """
+
+
+class CryptoExecutorBusyError(ZexFrostBaseException):
+    """
+    Raised when the crypto executor queue is full and a new job is rejected.
+    """
+
+
+class DKGBatchSizeError(ZexFrostBaseException):
+    """
+    Raised when a batch DKG message does not carry one package per key of the batch.
+    """
+
+
+class DKGRoundConflictError(ZexFrostBaseException):
+    """
+    Raised when a retried DKG round request carries different data than the one already processed.
+    """
@@ -1,4 +1,4 @@
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 from zexfrost.custom_types import CurveName, HexStr, NodeID
 
@@ -11,3 +11,8 @@ class DKGRepositoryValue(TypedDict):
     round2_result: dict | None
     partners_temp_public_key: dict[NodeID, HexStr] | None
     partners_round1_packages: dict[NodeID, dict] | None
+    partners_joint_key: NotRequired[dict[NodeID, HexStr] | None]
+    max_signers: NotRequired[int | None]
+    min_signers: NotRequired[int | None]
+    # Number of keys of the batch DKG the session belongs to, None for a standalone DKG.
+    batch_size: NotRequired[int | None]
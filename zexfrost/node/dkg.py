@@ -1,21 +1,33 @@
 import json
+import logging
+from collections.abc import Callable, Iterable
+from typing import cast
+from uuid import UUID, uuid5
 
+from zexfrost.canonical import canonical_bytes
 from zexfrost.custom_types import (
     DKGID,
     BaseCryptoCurve,
+    DKGBatchRound1NodeResponse,
+    DKGBatchRound3NodeResponse,
     DKGPart1Package,
     DKGPart1Result,
     DKGPart2Package,
     DKGPart2Result,
+    DKGPart3Result,
     DKGRound1NodeResponse,
     DKGRound2EncryptedPackage,
     DKGRound3NodeResponse,
+    DKGShareDelivery,
+    EncryptionVersion,
     HexStr,
     Node,
     NodeID,
 )
 from zexfrost.exceptions import (
+    DKGBatchSizeError,
     DKGNotFoundError,
+    DKGRoundConflictError,
     PartnersRound1PackagesMissingError,
     PartnersTempPublicKeyMissingError,
     Round1NotCompletedError,
@@ -25,15 +37,21 @@ from zexfrost.exceptions import (
 from zexfrost.key import Key
 from zexfrost.node.settings import NodeSettings
 from zexfrost.utils import (
-    decrypt_with_joint_key,
-    encrypt_with_joint_key,
+    ENCRYPTION_VERSIONS,
+    decrypt,
+    derive_joint_key,
+    encrypt,
     get_curve,
+    negotiate_encryption_version,
     single_sign_data,
-    single_verify_data,
 )
 
 from .custom_types import DKGRepositoryValue
-from .repository import DKGRepository, KeyRepository
+from .executor import batch_verify, call_curve, map_call
+from .key_cache import KeyPackageCache
+from .repository import DKGRepository, DKGSessionIndex, KeyRepository, VersionedDKGRepository
+
+logger = logging.getLogger(__name__)
 
 
 class DKG:
@@ -49,6 +67,10 @@ class DKG:
         round2_result: DKGPart2Result | None = None,
         partners_temp_public_key: dict[NodeID, HexStr] | None = None,
         partners_round1_packages: dict[NodeID, DKGPart1Package] | None = None,
+        partners_joint_key: dict[NodeID, HexStr] | None = None,
+        batch_size: int | None = None,
+        max_signers: int | None = None,
+        min_signers: int | None = None,
     ):
         self.settings = settings
         self.curve = curve
@@ -60,6 +82,14 @@ class DKG:
         self._round2_result = round2_result
         self._partners_round1_packages = partners_round1_packages
         self._partners_temp_public_key = partners_temp_public_key
+        self._partners_joint_key = partners_joint_key
+        self.batch_size = batch_size
+        self.max_signers = max_signers
+        self.min_signers = min_signers
+        self._stored: DKGRepositoryValue | None = None
+        # Version of the stored session in a `VersionedDKGRepository`, 0 while it is not stored.
+        self._version = 0
+        self._dirty: set[str] = set(DKGRepositoryValue.__annotations__)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, DKG):
@@ -75,6 +105,10 @@ class DKG:
             and self._round2_result == other._round2_result
             and self._partners_temp_public_key == other._partners_temp_public_key
             and self._partners_round1_packages == other._partners_round1_packages
+            and self._partners_joint_key == other._partners_joint_key
+            and self.batch_size == other.batch_size
+            and self.max_signers == other.max_signers
+            and self.min_signers == other.min_signers
         )
 
     @property
@@ -86,6 +120,7 @@ class DKG:
     @round1_result.setter
     def round1_result(self, value: DKGPart1Result | None):
         self._round1_result = value
+        self._dirty.add("round1_result")
 
     @property
     def round2_result(self) -> DKGPart2Result:
@@ -96,6 +131,11 @@ class DKG:
     @round2_result.setter
     def round2_result(self, value: DKGPart2Result | None):
         self._round2_result = value
+        self._dirty.add("round2_result")
+
+    @property
+    def round2_completed(self) -> bool:
+        return self._round2_result is not None
 
     @property
     def partners_round1_packages(self) -> dict[NodeID, DKGPart1Package]:
@@ -106,6 +146,7 @@ class DKG:
     @partners_round1_packages.setter
     def partners_round1_packages(self, value: dict[NodeID, DKGPart1Package] | None):
         self._partners_round1_packages = value
+        self._dirty.add("partners_round1_packages")
 
     @property
     def partners_temp_public_key(self) -> dict[NodeID, HexStr]:
@@ -116,10 +157,37 @@ class DKG:
     @partners_temp_public_key.setter
     def partners_temp_public_key(self, value: dict[NodeID, HexStr] | None):
         self._partners_temp_public_key = value
+        self._dirty.add("partners_temp_public_key")
+
+    def derive_partners_joint_key(self) -> dict[NodeID, HexStr]:
+        """The partners' joint keys as stored with the session, hex encoded."""
+        if self._partners_joint_key is None:
+            partners_temp_public_key = self.partners_temp_public_key
+            node_ids = [node.id for node in self.partners]
+            joint_keys = map_call(
+                derive_joint_key,
+                [(self.temp_key._private_key, partners_temp_public_key[node_id]) for node_id in node_ids],
+            )
+            self._partners_joint_key = {node_id: key.hex() for node_id, key in zip(node_ids, joint_keys, strict=True)}
+            self._dirty.add("partners_joint_key")
+        return self._partners_joint_key
+
+    @property
+    def partners_joint_key(self) -> dict[NodeID, bytes]:
+        """
+        Symmetric keys shared with each partner, derived from the temporary keys on first use.
+        They are stored with the session so round 3 decrypts without repeating the ECDH.
+        """
+        return {node_id: bytes.fromhex(key) for node_id, key in self.derive_partners_joint_key().items()}
 
     @classmethod
     def load_dkg_object(cls, settings: NodeSettings, id: DKGID, repository: DKGRepository) -> "DKG":
-        dkg_data = repository.get(settings.ID + id.hex)
+        version = 0
+        if isinstance(repository, VersionedDKGRepository):
+            stored = repository.get_versioned(settings.ID + id.hex)
+            dkg_data, version = (None, 0) if stored is None else stored
+        else:
+            dkg_data = repository.get(settings.ID + id.hex)
         if dkg_data is None:
             raise DKGNotFoundError(f"DKG with dkg_id: {id.hex} is not found")
         load_data = {
@@ -127,7 +195,7 @@ class DKG:
             "round2_result": dkg_data["round2_result"],
         }
         curve = get_curve(dkg_data["curve"])
-        return cls(
+        dkg = cls(
             settings=settings,
             id=id,
             curve=curve,
@@ -146,44 +214,138 @@ class DKG:
             else {
                 node_id: DKGPart1Package(**package) for node_id, package in dkg_data["partners_round1_packages"].items()
             },
+            partners_joint_key=dkg_data.get("partners_joint_key"),
+            batch_size=dkg_data.get("batch_size"),
+            max_signers=dkg_data.get("max_signers"),
+            min_signers=dkg_data.get("min_signers"),
         )
+        dkg._stored = dkg_data
+        dkg._version = version
+        dkg._dirty.clear()
+        return dkg
+
+    @classmethod
+    def recover(cls, settings: NodeSettings, repository: DKGRepository, index: DKGSessionIndex) -> list["DKG"]:
+        """
+        Load every session stored for this node, e.g. at startup after a crash.
+        Sessions that cannot be loaded are logged and skipped.
+        """
+        result = []
+        for dkg_id in index.in_flight(settings.ID):
+            try:
+                result.append(cls.load_dkg_object(settings, UUID(hex=dkg_id), repository))
+            except Exception:
+                logger.exception("Failed to recover DKG session %s", dkg_id)
+        return result
+
+    def _dump_field(self, field: str):
+        match field:
+            case "curve":
+                return self.curve.name
+            case "temp_private_key":
+                return self.temp_key._private_key
+            case "partners":
+                return tuple(node.model_dump(mode="python") for node in self.partners)
+            case "round1_result":
+                return self._round1_result and self.round1_result.model_dump(mode="python")
+            case "round2_result":
+                return self._round2_result and self.round2_result.model_dump(mode="python")
+            case "partners_temp_public_key":
+                return self._partners_temp_public_key
+            case "partners_joint_key":
+                return self._partners_joint_key
+            case "batch_size":
+                return self.batch_size
+            case "max_signers":
+                return self.max_signers
+            case "min_signers":
+                return self.min_signers
+            case "partners_round1_packages":
+                return (
+                    None
+                    if self._partners_round1_packages is None
+                    else {
+                        node_id: package.model_dump(mode="python")
+                        for node_id, package in self.partners_round1_packages.items()
+                    }
+                )
+        raise KeyError(field)
 
     def store_dkg_object(self):
-        store_data: DKGRepositoryValue = {
-            "curve": self.curve.name,
-            "temp_private_key": self.temp_key._private_key,
-            "partners": tuple(node.model_dump(mode="python") for node in self.partners),
-            "round1_result": self._round1_result and self.round1_result.model_dump(mode="python"),
-            "round2_result": self._round2_result and self.round2_result.model_dump(mode="python"),
-            "partners_temp_public_key": self._partners_temp_public_key,
-            "partners_round1_packages": None
-            if self._partners_round1_packages is None
-            else {
-                node_id: package.model_dump(mode="python") for node_id, package in self.partners_round1_packages.items()
-            },
-        }
-        self.repository.set(self.settings.ID + self.id.hex, store_data)
+        """Store the session, serializing only the fields changed since it was last stored or loaded."""
+        store_data = cast(
+            DKGRepositoryValue, {**(self._stored or {}), **{field: self._dump_field(field) for field in self._dirty}}
+        )
+        key = self.settings.ID + self.id.hex
+        if isinstance(self.repository, VersionedDKGRepository):
+            # Another worker process stored the session since this one loaded it.
+            if not self.repository.compare_and_set(key, store_data, self._version):
+                raise DKGRoundConflictError(f"DKG {self.id.hex} was changed by a concurrent request")
+            self._version += 1
+        else:
+            self.repository.set(key, store_data)
+        self._stored = store_data
+        self._dirty.clear()
 
-    def round1(self, max_signers: int, min_signers: int) -> DKGRound1NodeResponse:
-        result = self.curve.dkg_part1(self.settings.ID, max_signers=max_signers, min_signers=min_signers)
+    def delete_dkg_object(self) -> None:
+        """Delete the stored session; it holds the temporary private key and is useless after round 3."""
+        self.repository.delete(self.settings.ID + self.id.hex)
+        self._stored = None
+        self._version = 0
+        self._dirty = set(DKGRepositoryValue.__annotations__)
+
+    def part1(self, max_signers: int, min_signers: int) -> DKGPart1Result:
+        result = call_curve(self.curve, "dkg_part1", self.settings.ID, max_signers=max_signers, min_signers=min_signers)
         self.round1_result = result
+        self.max_signers = max_signers
+        self.min_signers = min_signers
+        self._dirty.update(("max_signers", "min_signers"))
         self.store_dkg_object()
-        data = {"package": result.package.model_dump(mode="python"), "temp_public_key": self.temp_key.public_key}
+        return result
+
+    def check_round1_replay(
+        self, curve: BaseCryptoCurve, party_ids: Iterable[NodeID], max_signers: int, min_signers: int
+    ) -> None:
+        """Refuse a retried round 1 request whose parameters differ from the ones the session was created with."""
+        if (
+            curve.name != self.curve.name
+            or set(party_ids) != {self.settings.ID, *(node.id for node in self.partners)}
+            or (self.max_signers is not None and max_signers != self.max_signers)
+            or (self.min_signers is not None and min_signers != self.min_signers)
+        ):
+            raise DKGRoundConflictError(f"DKG {self.id.hex} round 1 was already run with different parameters")
+
+    def ensure_part1(self, max_signers: int, min_signers: int) -> DKGPart1Result:
+        """The round 1 result, running `part1` only if the session has none yet."""
+        return self._round1_result or self.part1(max_signers, min_signers)
+
+    def round1(self, max_signers: int, min_signers: int) -> DKGRound1NodeResponse:
+        """Idempotent: once round 1 ran, a retried request gets the stored package again."""
+        result = self.ensure_part1(max_signers, min_signers)
+        data = canonical_bytes(
+            {"package": result.package.model_dump(mode="python"), "temp_public_key": self.temp_key.public_key}
+        )
         signature = single_sign_data(self.settings.CURVE_NAME, self.settings.PRIVATE_KEY, data)
         return DKGRound1NodeResponse(
             package=result.package,
             temp_public_key=self.temp_key.public_key,
             signature=signature,
+            encryption_versions=list(ENCRYPTION_VERSIONS),
         )
 
-    def validate_broadcast_data(self, data: dict[NodeID, DKGRound1NodeResponse]):
-        result = {}
-        for node in self.partners:
-            node_result = data[node.id]
-            verifying_data = node_result.model_dump(mode="python", exclude={"signature"})
-            result[node.id] = single_verify_data(
-                node.curve_name, node.public_key, verifying_data, node_result.signature
+    def validate_broadcast_data(
+        self, data: dict[NodeID, DKGRound1NodeResponse] | dict[NodeID, DKGBatchRound1NodeResponse]
+    ):
+        verified = batch_verify(
+            (
+                node.curve_name,
+                node.public_key,
+                data[node.id].signed_payload(),
+                data[node.id].signature,
             )
+            for node in self.partners
+        )
+        result = {node.id: node_verified for node, node_verified in zip(self.partners, verified, strict=True)}
 
         if not all(result.values()):
             failed_nodes = [node_id for node_id, verified in result.items() if not verified]
@@ -200,52 +362,320 @@ class DKG:
         }
 
     def _preparing_round2_response(
-        self, partners_temp_public_key: dict[NodeID, HexStr], round2_package: dict[NodeID, DKGPart2Package]
+        self,
+        partners_joint_key: dict[NodeID, bytes],
+        round2_package: dict[NodeID, DKGPart2Package],
+        partners_encryption_version: dict[NodeID, EncryptionVersion] | None = None,
     ) -> DKGRound2EncryptedPackage:
-        result = {}
-        for node in self.partners:
-            data_to_encrypt = json.dumps(round2_package[node.id].model_dump(mode="python"), sort_keys=True)
-            result[node.id] = encrypt_with_joint_key(
-                data_to_encrypt,
-                self.temp_key._private_key,
-                partners_temp_public_key[node.id],
-            )
-        return DKGRound2EncryptedPackage(encrypted_package=result)
+        partners_encryption_version = partners_encryption_version or {}
+        node_ids = [node.id for node in self.partners]
+        args_list = []
+        for node_id in node_ids:
+            data = json.dumps(round2_package[node_id].model_dump(mode="python"), sort_keys=True, separators=(",", ":"))
+            args_list.append((data, partners_joint_key[node_id], partners_encryption_version.get(node_id, "v1")))
+        encrypted = map_call(encrypt, args_list)
+        return DKGRound2EncryptedPackage(encrypted_package=dict(zip(node_ids, encrypted, strict=True)))
 
-    def round2(self, broadcast_data: dict[NodeID, DKGRound1NodeResponse]) -> DKGRound2EncryptedPackage:
-        self.validate_broadcast_data(broadcast_data)
-        self.partners_temp_public_key = self._parse_partners_temp_public_key(broadcast_data)
-        self.partners_round1_packages = {node_id: node_resp.package for node_id, node_resp in broadcast_data.items()}
-        result = self.curve.dkg_part2(
-            self.round1_result.secret_package,
-            {node_id: other_node_round1_result.package for node_id, other_node_round1_result in broadcast_data.items()},
-        )
+    def part2(
+        self,
+        partners_temp_public_key: dict[NodeID, HexStr],
+        partners_round1_packages: dict[NodeID, DKGPart1Package],
+        partners_joint_key: dict[NodeID, HexStr] | None = None,
+    ) -> DKGPart2Result:
+        """
+        Run `dkg_part2` on verified round-1 data and store the session with the partners' joint keys,
+        derived here unless already known from a session with the same temporary key.
+        """
+        self.partners_temp_public_key = partners_temp_public_key
+        self.partners_round1_packages = partners_round1_packages
+        result = call_curve(self.curve, "dkg_part2", self.round1_result.secret_package, partners_round1_packages)
         self.round2_result = result
+        if partners_joint_key is not None:
+            self._partners_joint_key = partners_joint_key
+            self._dirty.add("partners_joint_key")
+        self.derive_partners_joint_key()
         self.store_dkg_object()
-        return self._preparing_round2_response(self.partners_temp_public_key, self.round2_result.packages)
+        return result
+
+    def check_round2_replay(
+        self, partners_temp_public_key: dict[NodeID, HexStr], partners_round1_packages: dict[NodeID, DKGPart1Package]
+    ) -> None:
+        if (
+            partners_temp_public_key != self.partners_temp_public_key
+            or partners_round1_packages != self.partners_round1_packages
+        ):
+            raise DKGRoundConflictError(f"DKG {self.id.hex} round 2 was already run with different round 1 data")
+
+    def round2(self, broadcast_data: dict[NodeID, DKGRound1NodeResponse]) -> DKGRound2EncryptedPackage:
+        """
+        Idempotent: once round 2 ran, a retried request with the same broadcast re-encrypts the
+        stored shares instead of running `dkg_part2` again.
+        """
+        partners_temp_public_key = self._parse_partners_temp_public_key(broadcast_data)
+        partners_round1_packages = {node_id: node_resp.package for node_id, node_resp in broadcast_data.items()}
+        if not self.round2_completed:
+            self.validate_broadcast_data(broadcast_data)
+            self.part2(partners_temp_public_key, partners_round1_packages)
+        else:
+            self.check_round2_replay(partners_temp_public_key, partners_round1_packages)
+        partners_joint_key = self.partners_joint_key
+        partners_encryption_version = {
+            node_id: negotiate_encryption_version(node_resp.encryption_versions)
+            for node_id, node_resp in broadcast_data.items()
+        }
+        return self._preparing_round2_response(
+            partners_joint_key, self.round2_result.packages, partners_encryption_version
+        )
+
+    def share_deliveries(self, encrypted_package: DKGRound2EncryptedPackage) -> list[DKGShareDelivery]:
+        """Signed deliveries of the encrypted round-2 shares, to be pushed to each partner directly."""
+        deliveries = []
+        for node in self.partners:
+            delivery = DKGShareDelivery(
+                id=self.id,
+                sender=self.settings.ID,
+                receiver=node.id,
+                encrypted_package=encrypted_package.encrypted_package[node.id],
+            )
+            delivery.signature = single_sign_data(
+                self.settings.CURVE_NAME, self.settings.PRIVATE_KEY, delivery.signed_payload()
+            )
+            deliveries.append(delivery)
+        return deliveries
 
     def _decrypt_round2_package(
-        self, partner_temp_public_key: dict[NodeID, HexStr], encrypted_package: DKGRound2EncryptedPackage
+        self, partners_joint_key: dict[NodeID, bytes], encrypted_package: DKGRound2EncryptedPackage
     ) -> dict[NodeID, DKGPart2Package]:
-        result = {}
-        for node_id, encrypted_data in encrypted_package.encrypted_package.items():
-            decrypted_package = decrypt_with_joint_key(
-                encrypted_data, self.temp_key._private_key, partner_temp_public_key[node_id]
-            )
-            decrypted_package = json.loads(decrypted_package)
-            decrypted_package = DKGPart2Package(**decrypted_package)
-            result[node_id] = decrypted_package
-        return result
+        node_ids = list(encrypted_package.encrypted_package)
+        decrypted = map_call(
+            decrypt,
+            [(encrypted_package.encrypted_package[node_id], partners_joint_key[node_id]) for node_id in node_ids],
+        )
+        return {
+            node_id: DKGPart2Package(**json.loads(package))
+            for node_id, package in zip(node_ids, decrypted, strict=True)
+        }
 
-    def round3(self, round3_data: DKGRound2EncryptedPackage, key_repository: KeyRepository) -> DKGRound3NodeResponse:
-        round2_package = self._decrypt_round2_package(self.partners_temp_public_key, round3_data)
-        result = self.curve.dkg_part3(self.round2_result.secret_package, self.partners_round1_packages, round2_package)
-        key_repository.set(
-            self.settings.ID + result.pubkey_package.verifying_key, result.key_package.model_dump(mode="python")
+    def part3(
+        self,
+        round2_package: dict[NodeID, DKGPart2Package],
+        key_repository: KeyRepository,
+        key_cache: KeyPackageCache | None = None,
+    ) -> DKGPart3Result:
+        """Run `dkg_part3` on the decrypted shares and store the resulting key package."""
+        result = call_curve(
+            self.curve, "dkg_part3", self.round2_result.secret_package, self.partners_round1_packages, round2_package
         )
+        key = self.settings.ID + result.pubkey_package.verifying_key
+        key_repository.set(key, result.key_package.model_dump(mode="python"))
+        if key_cache is not None:
+            key_cache.invalidate(key)
+        return result
+
+    def round3(
+        self,
+        round3_data: DKGRound2EncryptedPackage,
+        key_repository: KeyRepository,
+        key_cache: KeyPackageCache | None = None,
+    ) -> DKGRound3NodeResponse:
+        round2_package = self._decrypt_round2_package(self.partners_joint_key, round3_data)
+        result = self.part3(round2_package, key_repository, key_cache)
         signature = single_sign_data(
             self.settings.CURVE_NAME,
             self.settings.PRIVATE_KEY,
             {"pubkey_package": result.pubkey_package.model_dump(mode="python")},
         )
+        self.delete_dkg_object()
         return DKGRound3NodeResponse(pubkey_package=result.pubkey_package, signature=signature)
+
+
+def broadcast_key(settings: NodeSettings, id: DKGID) -> str:
+    """Key of the round-1 broadcast of a session in the broadcast repository."""
+    return settings.ID + id.hex
+
+
+def share_key(settings: NodeSettings, id: DKGID, sender: NodeID) -> str:
+    """Key of the round-2 share `sender` delivered for a session in the share repository."""
+    return f"{settings.ID}{id.hex}-{sender}"
+
+
+def batch_session_id(id: DKGID, index: int) -> DKGID:
+    """Id of the session of the `index`-th key of a batch DKG."""
+    return uuid5(id, str(index))
+
+
+class BatchDKG:
+    """
+    `key_count` independent key generations run as one session.
+
+    Every key is an ordinary `DKG` session stored under `batch_session_id(id, index)`. All of them
+    share one temporary key, so a batch round needs one signature, one joint key per partner and
+    one envelope per partner instead of one per key.
+    """
+
+    def __init__(self, settings: NodeSettings, id: DKGID, sessions: list[DKG]):
+        if not sessions:
+            raise DKGBatchSizeError("A batch DKG needs at least one key")
+        if any(session.batch_size != len(sessions) for session in sessions):
+            raise DKGBatchSizeError(f"Sessions of batch DKG {id.hex} do not belong to a batch of {len(sessions)} keys")
+        self.settings = settings
+        self.id = id
+        self.sessions = sessions
+
+    @classmethod
+    def create(
+        cls,
+        settings: NodeSettings,
+        curve: BaseCryptoCurve,
+        id: DKGID,
+        repository: DKGRepository,
+        party: tuple[Node, ...],
+        key_count: int,
+    ) -> "BatchDKG":
+        temp_key = Key(curve=settings.CURVE_NAME, private_key=curve.keypair_new().signing_key)
+        return cls(
+            settings,
+            id,
+            [
+                DKG(
+                    settings,
+                    curve,
+                    batch_session_id(id, index),
+                    repository,
+                    party,
+                    temp_key=temp_key,
+                    batch_size=key_count,
+                )
+                for index in range(key_count)
+            ],
+        )
+
+    @classmethod
+    def load(cls, settings: NodeSettings, id: DKGID, key_count: int, repository: DKGRepository) -> "BatchDKG":
+        return cls.from_first_session(
+            DKG.load_dkg_object(settings, batch_session_id(id, 0), repository),
+            id,
+            key_count,
+            lambda session_id: DKG.load_dkg_object(settings, session_id, repository),
+        )
+
+    @classmethod
+    def from_first_session(
+        cls, first: DKG, id: DKGID, key_count: int, load: Callable[[DKGID], DKG], create_missing: bool = False
+    ) -> "BatchDKG":
+        """
+        Load the batch from its first session, which is stored first and records the batch size.
+        With `create_missing`, keys whose session was not stored yet, e.g. by a round 1 that
+        crashed half way, get a new session; the stored ones are never replaced.
+        """
+        if first.batch_size != key_count:
+            raise DKGBatchSizeError(f"Batch DKG {id.hex} has {first.batch_size} keys, not {key_count}")
+        sessions = [first]
+        for index in range(1, key_count):
+            session_id = batch_session_id(id, index)
+            try:
+                sessions.append(load(session_id))
+            except DKGNotFoundError:
+                if not create_missing:
+                    raise
+                sessions.append(
+                    DKG(
+                        first.settings,
+                        first.curve,
+                        session_id,
+                        first.repository,
+                        first.partners,
+                        temp_key=first.temp_key,
+                        batch_size=key_count,
+                    )
+                )
+        return cls(first.settings, id, sessions)
+
+    @property
+    def temp_key(self) -> Key:
+        return self.sessions[0].temp_key
+
+    @property
+    def partners(self) -> tuple[Node, ...]:
+        return self.sessions[0].partners
+
+    def _check_size(self, sizes: dict[NodeID, int]) -> None:
+        wrong = [node_id for node_id, size in sizes.items() if size != len(self.sessions)]
+        if wrong:
+            raise DKGBatchSizeError(f"Expected {len(self.sessions)} packages from nodes: {wrong}")
+
+    def round1(self, max_signers: int, min_signers: int) -> DKGBatchRound1NodeResponse:
+        """Idempotent like `DKG.round1`."""
+        packages = [session.ensure_part1(max_signers, min_signers).package for session in self.sessions]
+        data = canonical_bytes(
+            {
+                "packages": [package.model_dump(mode="python") for package in packages],
+                "temp_public_key": self.temp_key.public_key,
+            }
+        )
+        return DKGBatchRound1NodeResponse(
+            packages=packages,
+            temp_public_key=self.temp_key.public_key,
+            signature=single_sign_data(self.settings.CURVE_NAME, self.settings.PRIVATE_KEY, data),
+            encryption_versions=list(ENCRYPTION_VERSIONS),
+        )
+
+    def round2(self, broadcast_data: dict[NodeID, DKGBatchRound1NodeResponse]) -> DKGRound2EncryptedPackage:
+        """Idempotent like `DKG.round2`."""
+        self._check_size({node_id: len(node_resp.packages) for node_id, node_resp in broadcast_data.items()})
+        partners_temp_public_key = {node_id: node_resp.temp_public_key for node_id, node_resp in broadcast_data.items()}
+        partners_round1_packages = [
+            {node_id: node_resp.packages[index] for node_id, node_resp in broadcast_data.items()}
+            for index in range(len(self.sessions))
+        ]
+        if all(session.round2_completed for session in self.sessions):
+            for session, packages in zip(self.sessions, partners_round1_packages, strict=True):
+                session.check_round2_replay(partners_temp_public_key, packages)
+        else:
+            self.sessions[0].validate_broadcast_data(broadcast_data)
+            partners_joint_key = None
+            for session, packages in zip(self.sessions, partners_round1_packages, strict=True):
+                session.part2(partners_temp_public_key, packages, partners_joint_key)
+                partners_joint_key = session.derive_partners_joint_key()
+
+        joint_keys = self.sessions[0].partners_joint_key
+        node_ids = [node.id for node in self.partners]
+        args_list = []
+        for node_id in node_ids:
+            packages = [session.round2_result.packages[node_id].model_dump(mode="python") for session in self.sessions]
+            version = negotiate_encryption_version(broadcast_data[node_id].encryption_versions)
+            args_list.append(
+                (json.dumps(packages, sort_keys=True, separators=(",", ":")), joint_keys[node_id], version)
+            )
+        encrypted = map_call(encrypt, args_list)
+        return DKGRound2EncryptedPackage(encrypted_package=dict(zip(node_ids, encrypted, strict=True)))
+
+    def round3(
+        self,
+        round3_data: DKGRound2EncryptedPackage,
+        key_repository: KeyRepository,
+        key_cache: KeyPackageCache | None = None,
+    ) -> DKGBatchRound3NodeResponse:
+        joint_keys = self.sessions[0].partners_joint_key
+        node_ids = list(round3_data.encrypted_package)
+        decrypted = map_call(
+            decrypt, [(round3_data.encrypted_package[node_id], joint_keys[node_id]) for node_id in node_ids]
+        )
+        packages = {node_id: json.loads(data) for node_id, data in zip(node_ids, decrypted, strict=True)}
+        self._check_size({node_id: len(node_packages) for node_id, node_packages in packages.items()})
+        pubkey_packages = [
+            session.part3(
+                {node_id: DKGPart2Package(**node_packages[index]) for node_id, node_packages in packages.items()},
+                key_repository,
+                key_cache,
+            ).pubkey_package
+            for index, session in enumerate(self.sessions)
+        ]
+        signature = single_sign_data(
+            self.settings.CURVE_NAME,
+            self.settings.PRIVATE_KEY,
+            {"pubkey_packages": [pubkey_package.model_dump(mode="python") for pubkey_package in pubkey_packages]},
+        )
+        for session in self.sessions:
+            session.delete_dkg_object()
+        return DKGBatchRound3NodeResponse(pubkey_packages=pubkey_packages, signature=signature)
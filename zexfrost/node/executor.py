@@ -0,0 +1,201 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Literal
+
+from zexfrost.custom_types import BaseCryptoCurve
+from zexfrost.exceptions import CryptoExecutorBusyError
+from zexfrost.utils import VerifyItem, batch_verify_data, get_curve
+
+from .settings import NodeSettings, node_settings
+
+type ExecutorMode = Literal["thread", "process"]
+
+
+def _curve_call(curve_name: str, method: str, args: tuple, kwargs: dict | None = None) -> Any:
+    return getattr(get_curve(curve_name), method)(*args, **(kwargs or {}))  # type: ignore
+
+
+class CryptoExecutor:
+    """
+    Worker pool for the node's FROST crypto.
+
+    Route handlers are offloaded with `run` to a thread pool sized for the machine instead of
+    running on the event loop or in Starlette's small default threadpool. At most
+    `max_queue_size` jobs may wait or run at once; further jobs are rejected with
+    `CryptoExecutorBusyError`.
+
+    In "process" mode the curve operations issued through `call_curve`/`map_curve` are
+    additionally dispatched to a process pool so they scale across cores. Only the curve name
+    and the (picklable) pydantic arguments cross the process boundary; repository access stays
+    in the handler thread.
+    """
+
+    def __init__(self, mode: ExecutorMode = "thread", max_workers: int | None = None, max_queue_size: int = 1024):
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be positive")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+        thread_workers = self.max_workers if mode == "thread" else 2 * self.max_workers
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="crypto")
+        self._processes = ProcessPoolExecutor(max_workers=self.max_workers) if mode == "process" else None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._process_jobs = 0
+
+    @classmethod
+    def from_settings(cls, settings: NodeSettings) -> "CryptoExecutor":
+        return cls(
+            mode=settings.CRYPTO_EXECUTOR,
+            max_workers=settings.CRYPTO_MAX_WORKERS,
+            max_queue_size=settings.CRYPTO_MAX_QUEUE_SIZE,
+        )
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor | None:
+        """The process pool of process mode, None in thread mode."""
+        return self._processes
+
+    def _track[**_P, _T](self, fn: Callable[_P, _T], *args: _P.args, **kwargs: _P.kwargs) -> _T:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run[**_P, _T](self, fn: Callable[_P, _T], /, *args: _P.args, **kwargs: _P.kwargs) -> _T:
+        with self._lock:
+            if self._queued + self._running >= self.max_queue_size:
+                self._rejected += 1
+                raise CryptoExecutorBusyError(f"Crypto executor queue is full ({self.max_queue_size} jobs)")
+            self._queued += 1
+        loop = asyncio.get_running_loop()
+        # Run in the caller's context so context variables such as the current node settings carry over.
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._threads, functools.partial(context.run, self._track, fn, *args, **kwargs)
+        )
+
+    def call_curve(self, curve: BaseCryptoCurve, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Call `curve.<method>(*args, **kwargs)`, in the process pool when running in process mode."""
+        if self._processes is None:
+            return getattr(curve, method)(*args, **kwargs)
+        with self._lock:
+            self._process_jobs += 1
+        try:
+            return self._processes.submit(_curve_call, curve.name, method, args, kwargs).result()
+        finally:
+            with self._lock:
+                self._process_jobs -= 1
+
+    def map_curve(self, curve: BaseCryptoCurve, method: str, args_list: Iterable[tuple]) -> list[Any]:
+        """Call `curve.<method>` once per argument tuple, spreading the calls over the process pool."""
+        if self._processes is None:
+            return [getattr(curve, method)(*args) for args in args_list]
+        args_list = list(args_list)
+        if not args_list:
+            return []
+        chunksize = max(1, len(args_list) // self.max_workers)
+        with self._lock:
+            self._process_jobs += len(args_list)
+        try:
+            return list(
+                self._processes.map(
+                    _curve_call,
+                    [curve.name] * len(args_list),
+                    [method] * len(args_list),
+                    args_list,
+                    chunksize=chunksize,
+                )
+            )
+        finally:
+            with self._lock:
+                self._process_jobs -= len(args_list)
+
+    def map_call[_T](self, fn: Callable[..., _T], args_list: Iterable[tuple]) -> list[_T]:
+        """Call the module-level `fn` once per argument tuple, spreading the calls over the process pool."""
+        if self._processes is None:
+            return [fn(*args) for args in args_list]
+        args_list = list(args_list)
+        if not args_list:
+            return []
+        chunksize = max(1, len(args_list) // self.max_workers)
+        with self._lock:
+            self._process_jobs += len(args_list)
+        try:
+            return list(self._processes.map(fn, *zip(*args_list, strict=True), chunksize=chunksize))
+        finally:
+            with self._lock:
+                self._process_jobs -= len(args_list)
+
+    def metrics(self) -> dict[str, int | str]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "process_queue_depth": self._process_jobs,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._threads.shutdown(wait=wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+
+
+_crypto_executor: CryptoExecutor | None = None
+_crypto_executor_lock = threading.Lock()
+
+
+def set_crypto_executor(crypto_executor: CryptoExecutor | None) -> None:
+    global _crypto_executor
+    _crypto_executor = crypto_executor
+
+
+def get_crypto_executor() -> CryptoExecutor:
+    """Get the configured executor, creating one from the node settings (`NODE__CRYPTO_*`) on first use."""
+    global _crypto_executor
+    with _crypto_executor_lock:
+        if _crypto_executor is None:
+            _crypto_executor = CryptoExecutor.from_settings(node_settings)
+    return _crypto_executor
+
+
+def call_curve(curve: BaseCryptoCurve, method: str, *args: Any, **kwargs: Any) -> Any:
+    """Run a curve operation through the configured executor, or inline when none is configured."""
+    if _crypto_executor is None:
+        return getattr(curve, method)(*args, **kwargs)
+    return _crypto_executor.call_curve(curve, method, *args, **kwargs)
+
+
+def map_curve(curve: BaseCryptoCurve, method: str, args_list: Iterable[tuple]) -> list[Any]:
+    if _crypto_executor is None:
+        return [getattr(curve, method)(*args) for args in args_list]
+    return _crypto_executor.map_curve(curve, method, args_list)
+
+
+def map_call[_T](fn: Callable[..., _T], args_list: Iterable[tuple]) -> list[_T]:
+    if _crypto_executor is None:
+        return [fn(*args) for args in args_list]
+    return _crypto_executor.map_call(fn, args_list)
+
+
+def batch_verify(items: Iterable[VerifyItem]) -> list[bool]:
+    """`batch_verify_data` on the process pool in process mode, on the shared verification threads otherwise."""
+    return batch_verify_data(items, None if _crypto_executor is None else _crypto_executor.process_pool)
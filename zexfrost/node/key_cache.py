@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from zexfrost.custom_types import PrivateKeyPackage
+
+from .repository import HotKeyRepository, KeyRepository
+
+
+def hot_keys_key(node_id: str) -> str:
+    """Hot key repository entry holding the hot keys of the node saved by `KeyPackageCache.save_hot_keys`."""
+    return node_id + "-hot-keys"
+
+
+class KeyPackageCache:
+    """
+    Bounded LRU cache of validated `PrivateKeyPackage` objects.
+
+    Entries are keyed like the key repository (`node_id + verifying_key`), so a hit skips both
+    the repository read and the pydantic validation. Misses are not cached.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, PrivateKeyPackage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> PrivateKeyPackage | None:
+        with self._lock:
+            key_package = self._data.get(key)
+            if key_package is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return key_package
+
+    def put(self, key: str, key_package: PrivateKeyPackage) -> None:
+        with self._lock:
+            self._data[key] = key_package
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def load(self, key_repo: KeyRepository, key: str) -> PrivateKeyPackage | None:
+        """Get the key package from the cache, reading and validating it from the repository on a miss."""
+        key_package = self.get(key)
+        if key_package is not None:
+            return key_package
+        value = key_repo.get(key)
+        if value is None:
+            return None
+        key_package = PrivateKeyPackage.model_validate(value)
+        self.put(key, key_package)
+        return key_package
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def save_hot_keys(self, hot_key_repo: HotKeyRepository, node_id: str, limit: int | None = None) -> None:
+        """
+        Store the node's `hot_keys()`, e.g. on shutdown, for `warm_up` of the next run. They go to their
+        own repository: the list does not fit the fixed-size records of `MmapKeyRepository`.
+        """
+        keys = [key for key in self.hot_keys() if key.startswith(node_id)]
+        hot_key_repo.set(hot_keys_key(node_id), {"keys": keys if limit is None else keys[:limit]})
+
+    @staticmethod
+    def saved_hot_keys(hot_key_repo: HotKeyRepository, node_id: str) -> list[str]:
+        """The hot keys `save_hot_keys` stored for the node in the previous run."""
+        saved = hot_key_repo.get(hot_keys_key(node_id))
+        return [] if saved is None else saved["keys"]
+
+    def warm_up(self, key_repo: KeyRepository, keys: Iterable[str]) -> int:
+        """Preload keys, e.g. the `saved_hot_keys`. Returns the number of loaded keys."""
+        loaded = 0
+        for key in keys:
+            value = key_repo.get(key)
+            if value is None:
+                continue
+            self.put(key, PrivateKeyPackage.model_validate(value))
+            loaded += 1
+        return loaded
+
+    def hot_keys(self, limit: int | None = None) -> list[str]:
+        """Most recently used keys first."""
+        with self._lock:
+            keys = list(reversed(self._data))
+        return keys if limit is None else keys[:limit]
+
+
+_key_package_cache: KeyPackageCache | None = None
+
+
+def set_key_package_cache(key_package_cache: KeyPackageCache | None) -> None:
+    global _key_package_cache
+    _key_package_cache = key_package_cache
+
+
+def get_key_package_cache() -> KeyPackageCache | None:
+    return _key_package_cache
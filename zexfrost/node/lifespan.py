@@ -0,0 +1,69 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from .dkg import DKG
+from .key_cache import get_key_package_cache
+from .preprocess import get_nonce_preprocessor
+from .repository import DKGSessionIndex, get_dkg_repository, get_hot_key_repository, get_key_repository
+from .session_cache import get_dkg_session_cache
+from .session_gc import get_dkg_session_sweeper
+from .settings import NodeSettings, node_settings
+
+logger = logging.getLogger(__name__)
+
+
+def recover_dkg_sessions(settings: NodeSettings = node_settings) -> list[DKG]:
+    """
+    Reload the DKG sessions a restarted node still has in flight.
+
+    Needs a DKG repository that can list its sessions (`DKGSessionIndex`, e.g. `SQLiteDKGRepository`).
+    The sessions are put into the session cache, and the sweeper tracks them by their stored write times.
+    """
+    repository = get_dkg_repository()
+    if not isinstance(repository, DKGSessionIndex):
+        return []
+    sessions = DKG.recover(settings, repository, repository)
+    session_cache = get_dkg_session_cache()
+    sweeper = get_dkg_session_sweeper()
+    if session_cache is not None:
+        for dkg in sessions:
+            session_cache.put(dkg)
+    if sweeper is not None:
+        sweeper.seed(settings)
+    logger.info("Recovered %d DKG sessions", len(sessions))
+    return sessions
+
+
+@asynccontextmanager
+async def node_lifespan(app: object, settings: NodeSettings = node_settings) -> AsyncIterator[None]:
+    """
+    FastAPI lifespan of a node, to be set up after the repositories and optional components.
+
+    On startup it recovers the in-flight DKG sessions, warms up the key package cache with the keys
+    saved by the previous run and starts the configured background workers; on shutdown it stops
+    them and saves the hot keys. Hot keys are only kept when a hot key repository is configured.
+    """
+    key_cache = get_key_package_cache()
+    hot_key_repo = get_hot_key_repository()
+    if key_cache is not None and hot_key_repo is not None:
+        key_cache.warm_up(get_key_repository(), key_cache.saved_hot_keys(hot_key_repo, settings.ID))
+    recover_dkg_sessions(settings)
+    preprocessor = get_nonce_preprocessor()
+    sweeper = get_dkg_session_sweeper()
+    if preprocessor is not None:
+        preprocessor.start()
+    if sweeper is not None:
+        sweeper.start()
+    try:
+        yield
+    finally:
+        if sweeper is not None:
+            sweeper.stop()
+        if preprocessor is not None:
+            preprocessor.stop()
+        if key_cache is not None and hot_key_repo is not None:
+            try:
+                key_cache.save_hot_keys(hot_key_repo, settings.ID)
+            except Exception:
+                logger.exception("Saving the hot keys failed")
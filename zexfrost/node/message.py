@@ -0,0 +1,21 @@
+from collections.abc import Callable
+
+from zexfrost.custom_types import SigningData
+
+type MessageBuilder = Callable[[SigningData, dict | None], bytes]
+
+_message_builder: MessageBuilder | None = None
+
+
+def set_message_builder(message_builder: MessageBuilder) -> None:
+    """
+    Set the application hook that turns a signing entry and the request metadata into the message to sign.
+    The hook is also the place to reject entries the node must not sign, by raising.
+    """
+    global _message_builder
+    _message_builder = message_builder
+
+
+def get_message_builder() -> MessageBuilder:
+    assert _message_builder is not None, "Message builder not set"
+    return _message_builder
@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+
+from zexfrost.custom_types import BaseCryptoCurve, Commitment, HexStr, NodeID, PublicKeyPackage, TweakBy
+from zexfrost.repository import is_async_repository
+
+from .key_cache import KeyPackageCache
+from .repository import KeyRepository, NonceRepository
+from .sign import batch_commitment, nonce_key
+
+logger = logging.getLogger(__name__)
+
+type PreprocessKey = tuple[str, HexStr, TweakBy | None]
+
+# Seconds a reserved commitment must still have before its nonce expires in the nonce repository.
+NONCE_TTL_MARGIN = 30
+
+
+class _HotKey:
+    def __init__(self, curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None):
+        self.curve = curve
+        self.pubkey_package = pubkey_package
+        self.tweak_by = tweak_by
+        # (generation time, commitment), oldest first.
+        self.commitments: deque[tuple[float, Commitment]] = deque()
+
+
+class NoncePreprocessor:
+    """
+    Background FROST preprocessing for hot keys.
+
+    A worker thread generates commitments ahead of time for every (curve, verifying key, tweak)
+    that has been requested recently. The matching nonces are written to the nonce repository
+    as soon as they are generated, so handing out a precomputed commitment is only a pop.
+    The least recently used keys are dropped once `max_keys` is reached, and their unused
+    nonces are deleted from the nonce repository.
+
+    Commitments older than `max_age` seconds are dropped before their nonces expire. It defaults
+    to the `ttl` of the nonce repository minus `NONCE_TTL_MARGIN`. Only keys stored in the key
+    repository can be registered.
+
+    The nonce repository must be synchronous, as the worker thread writes to it. Nonces of dropped
+    commitments are deleted by the worker thread too, so `take` and `size` never touch the repository.
+    """
+
+    def __init__(
+        self,
+        node_id: NodeID,
+        key_repo: KeyRepository,
+        nonce_repo: NonceRepository,
+        target: int = 64,
+        low_water_mark: int = 16,
+        max_keys: int = 1024,
+        key_cache: KeyPackageCache | None = None,
+        max_age: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 <= low_water_mark < target:
+            raise ValueError("low_water_mark must be in [0, target)")
+        if is_async_repository(nonce_repo):
+            raise TypeError("NoncePreprocessor needs a synchronous nonce repository")
+        nonce_ttl = getattr(nonce_repo, "ttl", None)
+        if max_age is None and nonce_ttl is not None:
+            max_age = max(nonce_ttl - NONCE_TTL_MARGIN, nonce_ttl / 2)
+        self.max_age = max_age
+        self._clock = clock
+        self.node_id = node_id
+        self.key_repo = key_repo
+        self.nonce_repo = nonce_repo
+        self.target = target
+        self.low_water_mark = low_water_mark
+        self.max_keys = max_keys
+        self.key_cache = key_cache
+        self._hot_keys: OrderedDict[PreprocessKey, _HotKey] = OrderedDict()
+        self._pending: OrderedDict[PreprocessKey, None] = OrderedDict()
+        # Dropped commitments whose nonces the worker thread still has to delete.
+        self._discarded: list[Commitment] = []
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def _key(self, curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None) -> PreprocessKey:
+        return (curve.name, pubkey_package.verifying_key, tweak_by)
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="nonce-preprocessor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _key_exists(self, pubkey_package: PublicKeyPackage) -> bool:
+        key = self.node_id + pubkey_package.verifying_key
+        if self.key_cache is not None and self.key_cache.get(key) is not None:
+            return True
+        return self.key_repo.get(key) is not None
+
+    def register(self, curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None) -> bool:
+        """
+        Mark a key as hot so its commitments are generated in the background.
+        Returns False, registering nothing, when the node holds no key package for it.
+        """
+        key = self._key(curve, pubkey_package, tweak_by)
+        with self._condition:
+            if key in self._hot_keys:
+                self._touch(key, curve, pubkey_package, tweak_by)
+                return True
+        if not self._key_exists(pubkey_package):
+            return False
+        with self._condition:
+            self._touch(key, curve, pubkey_package, tweak_by)
+        return True
+
+    def take(
+        self, curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None, count: int = 1
+    ) -> list[Commitment]:
+        """
+        Take up to `count` precomputed commitments. The caller has to generate the missing ones.
+        Unregistered keys return nothing; register them once a live commitment succeeded.
+        """
+        key = self._key(curve, pubkey_package, tweak_by)
+        with self._condition:
+            if key not in self._hot_keys:
+                return []
+            hot_key = self._hot_keys[key]
+            self._prune(hot_key)
+            result = [hot_key.commitments.popleft()[1] for _ in range(min(count, len(hot_key.commitments)))]
+            self._touch(key, curve, pubkey_package, tweak_by)
+            return result
+
+    def size(self, curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None) -> int:
+        with self._condition:
+            hot_key = self._hot_keys.get(self._key(curve, pubkey_package, tweak_by))
+            if hot_key is None:
+                return 0
+            self._prune(hot_key)
+            return len(hot_key.commitments)
+
+    def _prune(self, hot_key: _HotKey) -> None:
+        """Drop the commitments whose nonces are about to expire."""
+        if self.max_age is None:
+            return
+        oldest = self._clock() - self.max_age
+        while hot_key.commitments and hot_key.commitments[0][0] <= oldest:
+            self._discard(hot_key.commitments.popleft()[1])
+
+    def _discard(self, commitment: Commitment) -> None:
+        self._discarded.append(commitment)
+        self._condition.notify()
+
+    def _delete_nonces(self, commitments: list[Commitment]) -> None:
+        for commitment in commitments:
+            self.nonce_repo.delete(nonce_key(self.node_id, commitment))
+
+    def _touch(
+        self, key: PreprocessKey, curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None
+    ) -> _HotKey:
+        hot_key = self._hot_keys.get(key)
+        if hot_key is None:
+            hot_key = self._hot_keys[key] = _HotKey(curve, pubkey_package, tweak_by)
+            while len(self._hot_keys) > self.max_keys:
+                self._evict(*self._hot_keys.popitem(last=False))
+        else:
+            self._hot_keys.move_to_end(key)
+        self._schedule(key, hot_key)
+        return hot_key
+
+    def _schedule(self, key: PreprocessKey, hot_key: _HotKey) -> None:
+        if len(hot_key.commitments) <= self.low_water_mark and key not in self._pending:
+            self._pending[key] = None
+            self._condition.notify()
+
+    def _evict(self, key: PreprocessKey, hot_key: _HotKey) -> None:
+        self._pending.pop(key, None)
+        for _, commitment in hot_key.commitments:
+            self._discard(commitment)
+        hot_key.commitments.clear()
+
+    def _pop_pending(self) -> tuple[PreprocessKey, _HotKey, int] | None:
+        while self._pending:
+            key, _ = self._pending.popitem(last=False)
+            hot_key = self._hot_keys.get(key)
+            if hot_key is None:
+                continue
+            self._prune(hot_key)
+            if len(hot_key.commitments) < self.target:
+                return key, hot_key, self.target - len(hot_key.commitments)
+        return None
+
+    def _next_job(self) -> tuple[list[Commitment], tuple[PreprocessKey, _HotKey, int] | None] | None:
+        """The commitments to delete and the next key to fill; None once stopped."""
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None
+                job = self._pop_pending()
+                discarded, self._discarded = self._discarded, []
+                if job is not None or discarded:
+                    return discarded, job
+                self._condition.wait()
+
+    def _run(self) -> None:
+        while (work := self._next_job()) is not None:
+            discarded, job = work
+            self._delete_nonces(discarded)
+            if job is None:
+                continue
+            key, hot_key, count = job
+            generated_at = self._clock()
+            try:
+                [commitments] = batch_commitment(
+                    node_id=self.node_id,
+                    curve=hot_key.curve,
+                    pubkey_package=hot_key.pubkey_package,
+                    key_repo=self.key_repo,
+                    nonce_repo=self.nonce_repo,
+                    entries=[(hot_key.tweak_by, count)],
+                    key_cache=self.key_cache,
+                )
+            except Exception:
+                logger.exception("Nonce preprocessing failed for key %s", key[1])
+                continue
+            with self._condition:
+                if self._hot_keys.get(key) is hot_key:
+                    hot_key.commitments.extend((generated_at, commitment) for commitment in commitments)
+                    continue
+            self._delete_nonces(commitments)
+        with self._condition:
+            discarded, self._discarded = self._discarded, []
+        self._delete_nonces(discarded)
+
+
+_nonce_preprocessor: NoncePreprocessor | None = None
+
+
+def set_nonce_preprocessor(preprocessor: NoncePreprocessor | None) -> None:
+    global _nonce_preprocessor
+    _nonce_preprocessor = preprocessor
+
+
+def get_nonce_preprocessor() -> NoncePreprocessor | None:
+    return _nonce_preprocessor
@@ -1,22 +1,58 @@
-from zexfrost.repository import RepositoryProtocol
+import os
+from typing import Protocol, runtime_checkable
+
+from zexfrost.repository import AsyncRepositoryProtocol, RepositoryProtocol
 
 from .custom_types import DKGRepositoryValue
+from .storage import SQLiteDKGRepository, SQLiteRepository
 
 type DKGRepository = RepositoryProtocol[DKGRepositoryValue]
 type KeyRepository = RepositoryProtocol[dict]
 type NonceRepository = RepositoryProtocol[dict]
+type AsyncNonceRepository = AsyncRepositoryProtocol[dict]
+type BroadcastRepository = RepositoryProtocol[dict]
+type ShareRepository = RepositoryProtocol[dict]
+type DKGResultRepository = RepositoryProtocol[dict]
+type HotKeyRepository = RepositoryProtocol[dict]
+
+
+@runtime_checkable
+class DKGSessionIndex(Protocol):
+    def in_flight(self, node_id: str) -> list[str]:
+        """DKG ids (hex) of the sessions stored for the node"""
+        ...
+
+    def last_updated(self, node_id: str) -> dict[str, float]:
+        """Wall-clock time of the last write of each session stored for the node, by DKG id (hex)"""
+        ...
+
+
+@runtime_checkable
+class VersionedDKGRepository(Protocol):
+    def get_versioned(self, key: str) -> tuple[DKGRepositoryValue, int] | None:
+        """The stored session and its version"""
+        ...
+
+    def compare_and_set(self, key: str, value: DKGRepositoryValue, version: int) -> bool:
+        """Store the session only if its version is still `version` (0: not stored yet); returns whether it was"""
+        ...
+
 
 _dkg_repository: DKGRepository | None = None
-_nonce_repository: NonceRepository | None = None
+_nonce_repository: NonceRepository | AsyncNonceRepository | None = None
 _key_repository: KeyRepository | None = None
+_broadcast_repository: BroadcastRepository | None = None
+_share_repository: ShareRepository | None = None
+_dkg_result_repository: DKGResultRepository | None = None
+_hot_key_repository: HotKeyRepository | None = None
 
 
-def set_nonce_repository(nonce: NonceRepository) -> None:
+def set_nonce_repository(nonce: NonceRepository | AsyncNonceRepository) -> None:
     global _nonce_repository
     _nonce_repository = nonce
 
 
-def get_nonce_repository() -> NonceRepository:
+def get_nonce_repository() -> NonceRepository | AsyncNonceRepository:
     assert _nonce_repository is not None, "Nonce repository not set"
     return _nonce_repository
 
@@ -39,3 +75,61 @@ def set_dkg_repository(dkg: DKGRepository) -> None:
 def get_dkg_repository() -> DKGRepository:
     assert _dkg_repository is not None, "DKG repository not set"
     return _dkg_repository
+
+
+def set_broadcast_repository(broadcast: BroadcastRepository) -> None:
+    global _broadcast_repository
+    _broadcast_repository = broadcast
+
+
+def get_broadcast_repository() -> BroadcastRepository:
+    assert _broadcast_repository is not None, "Broadcast repository not set"
+    return _broadcast_repository
+
+
+def set_share_repository(share: ShareRepository) -> None:
+    global _share_repository
+    _share_repository = share
+
+
+def get_share_repository() -> ShareRepository:
+    assert _share_repository is not None, "Share repository not set"
+    return _share_repository
+
+
+def set_dkg_result_repository(result: DKGResultRepository | None) -> None:
+    global _dkg_result_repository
+    _dkg_result_repository = result
+
+
+def get_dkg_result_repository() -> DKGResultRepository | None:
+    """Repository of the round 3 responses replayed to retried requests, if configured."""
+    return _dkg_result_repository
+
+
+def set_hot_key_repository(hot_key: HotKeyRepository | None) -> None:
+    global _hot_key_repository
+    _hot_key_repository = hot_key
+
+
+def get_hot_key_repository() -> HotKeyRepository | None:
+    """Repository of the key package cache's hot keys kept across restarts, if configured."""
+    return _hot_key_repository
+
+
+def configure_shared_repositories(
+    path: str | os.PathLike, nonce_ttl: float | None = 300, broadcast_ttl: float | None = 3600
+) -> None:
+    """
+    Point the node's repositories at one SQLite file shared by every worker process.
+    Call it at startup in each worker to run the node under several workers. DKG sessions are
+    versioned, so a round that races a round of another worker fails with `DKGRoundConflictError`,
+    and round 3 responses are kept for retries in the shared `dkg_result` table.
+    """
+    set_dkg_repository(SQLiteDKGRepository(path))
+    set_key_repository(SQLiteRepository(path, "key"))
+    set_nonce_repository(SQLiteRepository(path, "nonce", ttl=nonce_ttl))
+    set_broadcast_repository(SQLiteRepository(path, "dkg_broadcast", ttl=broadcast_ttl))
+    set_share_repository(SQLiteRepository(path, "dkg_share", ttl=broadcast_ttl))
+    set_dkg_result_repository(SQLiteRepository(path, "dkg_result", ttl=broadcast_ttl))
+    set_hot_key_repository(SQLiteRepository(path, "hot_keys"))
@@ -1,44 +1,394 @@
-from fastapi import APIRouter
+import asyncio
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+import httpx
+from fastapi import APIRouter, HTTPException, status
 
 from zexfrost.custom_types import (
+    DKGID,
+    DKGBatchRound1NodeResponse,
+    DKGBatchRound1Request,
+    DKGBatchRound2Request,
+    DKGBatchRound3NodeResponse,
+    DKGBatchRound3Request,
+    DKGBroadcast,
+    DKGBroadcastReference,
     DKGRound1NodeResponse,
     DKGRound1Request,
     DKGRound2EncryptedPackage,
     DKGRound2Request,
+    DKGRound2Status,
     DKGRound3NodeResponse,
     DKGRound3Request,
+    DKGShareDelivery,
+    HexStr,
+    NodeID,
 )
-from zexfrost.utils import get_curve
+from zexfrost.exceptions import DKGNotFoundError, DKGRoundConflictError
+from zexfrost.utils import broadcast_digest, get_curve, single_verify_data
 
-from ..dkg import DKG
+from ..dkg import DKG, BatchDKG, batch_session_id, broadcast_key, share_key
+from ..key_cache import get_key_package_cache
 from ..party import get_party
-from ..repository import get_dkg_repository, get_key_repository
-from ..settings import node_settings as settings
+from ..repository import get_broadcast_repository, get_dkg_repository, get_key_repository, get_share_repository
+from ..session_cache import get_dkg_session_cache
+from ..session_gc import get_dkg_session_sweeper
+from ..session_lock import get_dkg_session_locks
+from ..settings import get_node_settings
+from .utils import DecompressingRoute, run_crypto
 
-router = APIRouter(prefix="/dkg", tags=["DKG"])
+router = APIRouter(prefix="/dkg", tags=["DKG"], route_class=DecompressingRoute)
 
 
-@router.post("/round1", response_model=DKGRound1NodeResponse)
-def round1(round1_request: DKGRound1Request):
-    party = get_party(round1_request.party_ids)
-    dkg = DKG(
-        settings=settings,
-        curve=get_curve(round1_request.curve),
-        id=round1_request.id,
-        party=party,
-        repository=get_dkg_repository(),
+@contextmanager
+def _hold(id: DKGID, session_ids: Iterable[DKGID] = ()) -> Iterator[None]:
+    """
+    Run the block as the only request of the DKG in this process. When another worker process
+    changed the session meanwhile, drop its cached copies so the retried request reloads it.
+    """
+    settings = get_node_settings()
+    with get_dkg_session_locks().hold(settings, id):
+        try:
+            yield
+        except DKGRoundConflictError:
+            session_cache = get_dkg_session_cache()
+            if session_cache is not None:
+                for session_id in session_ids or (id,):
+                    session_cache.invalidate(settings, session_id)
+            raise
+
+
+def _round1(round1_request: DKGRound1Request) -> DKGRound1NodeResponse:
+    with _hold(round1_request.id):
+        return _locked_round1(round1_request)
+
+
+def _locked_round1(round1_request: DKGRound1Request) -> DKGRound1NodeResponse:
+    settings = get_node_settings()
+    try:
+        # A retried request gets the stored round 1 instead of a new one.
+        dkg = _load_dkg(round1_request.id)
+        dkg.check_round1_replay(
+            get_curve(round1_request.curve),
+            round1_request.party_ids,
+            round1_request.max_signers,
+            round1_request.min_signers,
+        )
+    except DKGNotFoundError:
+        dkg = DKG(
+            settings=settings,
+            curve=get_curve(round1_request.curve),
+            id=round1_request.id,
+            party=get_party(round1_request.party_ids),
+            repository=get_dkg_repository(),
+        )
+    response = dkg.round1(max_signers=round1_request.max_signers, min_signers=round1_request.min_signers)
+    session_cache = get_dkg_session_cache()
+    if session_cache is not None:
+        session_cache.put(dkg)
+    _touch(dkg)
+    return response
+
+
+def _touch(dkg: DKG) -> None:
+    sweeper = get_dkg_session_sweeper()
+    if sweeper is not None:
+        sweeper.touch(dkg.settings, dkg.id)
+
+
+def _forget(dkg: DKG) -> None:
+    """Drop a session whose round 3 finished; `DKG.round3` already deleted it from the repository."""
+    session_cache = get_dkg_session_cache()
+    if session_cache is not None:
+        session_cache.invalidate(dkg.settings, dkg.id)
+    sweeper = get_dkg_session_sweeper()
+    if sweeper is not None:
+        sweeper.forget(dkg.settings, dkg.id)
+
+
+def _load_dkg(id: DKGID) -> DKG:
+    settings = get_node_settings()
+    session_cache = get_dkg_session_cache()
+    if session_cache is None:
+        return DKG.load_dkg_object(settings=settings, id=id, repository=get_dkg_repository())
+    return session_cache.load(settings, id, get_dkg_repository())
+
+
+def _round2(
+    round2_request: DKGRound2Request, broadcast_data: dict[NodeID, DKGRound1NodeResponse]
+) -> tuple[DKGRound2EncryptedPackage, list[DKGShareDelivery]]:
+    with _hold(round2_request.id):
+        dkg = _load_dkg(round2_request.id)
+        result = dkg.round2(broadcast_data=broadcast_data)
+        _touch(dkg)
+    return result, dkg.share_deliveries(result) if round2_request.deliver_to_peers else []
+
+
+def _delivered_shares(dkg: DKG) -> DKGRound2EncryptedPackage:
+    share_repo = get_share_repository()
+    shares = {node.id: share_repo.get(share_key(dkg.settings, dkg.id, node.id)) for node in dkg.partners}
+    missing = [node_id for node_id, share in shares.items() if share is None]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Shares missing from nodes: {missing}")
+    return DKGRound2EncryptedPackage(
+        encrypted_package={node_id: share["encrypted_package"] for node_id, share in shares.items()}  # type: ignore[index]
     )
-    return dkg.round1(max_signers=round1_request.max_signers, min_signers=round1_request.min_signers)
+
+
+def _round3(round3_request: DKGRound3Request) -> DKGRound3NodeResponse:
+    settings = get_node_settings()
+    session_locks = get_dkg_session_locks()
+    with _hold(round3_request.id):
+        # Round 3 deleted the session; a retry gets the response it already produced.
+        result = session_locks.completed(settings, round3_request.id, DKGRound3NodeResponse)
+        if result is None:
+            result = _locked_round3(round3_request)
+            session_locks.complete(settings, round3_request.id, result)
+        return result
+
+
+def _locked_round3(round3_request: DKGRound3Request) -> DKGRound3NodeResponse:
+    dkg = _load_dkg(round3_request.id)
+    key_repo = get_key_repository()
+    if round3_request.encrypted_package is not None:
+        result = dkg.round3(round3_request.encrypted_package, key_repo, get_key_package_cache())
+    else:
+        result = dkg.round3(_delivered_shares(dkg), key_repo, get_key_package_cache())
+        share_repo = get_share_repository()
+        for node in dkg.partners:
+            share_repo.delete(share_key(dkg.settings, dkg.id, node.id))
+    _forget(dkg)
+    return result
+
+
+@router.post("/round1", response_model=DKGRound1NodeResponse)
+async def round1(round1_request: DKGRound1Request):
+    return await run_crypto(_round1, round1_request)
+
+
+def _store_broadcast(broadcast: DKGBroadcast, digest: HexStr) -> None:
+    """Keep the round-1 broadcast of a session; a session has one broadcast, so a different one conflicts."""
+    repository = get_broadcast_repository()
+    key = broadcast_key(get_node_settings(), broadcast.id)
+    stored = repository.get(key)
+    if stored is not None and stored["digest"] != digest:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Another broadcast is stored for the DKG")
+    repository.set(key, {"digest": digest, "broadcast": broadcast.model_dump(mode="json")})
+
+
+def _load_broadcast(id: DKGID, digest: HexStr) -> DKGBroadcast | None:
+    stored = get_broadcast_repository().get(broadcast_key(get_node_settings(), id))
+    if stored is None or stored["digest"] != digest:
+        return None
+    return DKGBroadcast.model_validate(stored["broadcast"])
+
+
+async def _fetch_broadcast(id: DKGID, reference: DKGBroadcastReference) -> DKGBroadcast:
+    sources = get_party([reference.source])
+    if not sources:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown broadcast source {reference.source}"
+        )
+    try:
+        async with httpx.AsyncClient(timeout=get_node_settings().PEER_TIMEOUT) as client:
+            res = await client.get(f"{sources[0].url}dkg/broadcast/{id}/{reference.digest}")
+            res.raise_for_status()
+        broadcast = DKGBroadcast.model_validate(res.json())
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Broadcast fetch from {reference.source} failed: {e}"
+        ) from e
+    if broadcast.id != id or broadcast_digest(broadcast.broadcast_data) != reference.digest:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Broadcast digest mismatch")
+    _store_broadcast(broadcast, reference.digest)
+    return broadcast
+
+
+async def _resolve_broadcast_data(round2_request: DKGRound2Request) -> dict[NodeID, DKGRound1NodeResponse]:
+    """The partners' round-1 responses, read from the referenced broadcast when the request carries one."""
+    settings = get_node_settings()
+    reference = round2_request.broadcast
+    if reference is None:
+        return round2_request.broadcast_data
+    broadcast = _load_broadcast(round2_request.id, reference.digest)
+    if broadcast is None:
+        broadcast = await _fetch_broadcast(round2_request.id, reference)
+    return {node_id: response for node_id, response in broadcast.broadcast_data.items() if node_id != settings.ID}
+
+
+@router.post("/broadcast", response_model=DKGBroadcastReference)
+async def upload_broadcast(broadcast: DKGBroadcast):
+    """Store a round-1 broadcast of a session this node is part of, holding one response per party member."""
+    settings = get_node_settings()
+    try:
+        dkg = _load_dkg(broadcast.id)
+    except DKGNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    party_ids = {settings.ID, *(node.id for node in dkg.partners)}
+    if set(broadcast.broadcast_data) != party_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Broadcast does not match the DKG party")
+    digest = broadcast_digest(broadcast.broadcast_data)
+    _store_broadcast(broadcast, digest)
+    return DKGBroadcastReference(digest=digest, source=settings.ID)
+
+
+@router.get("/broadcast/{id}/{digest}", response_model=DKGBroadcast)
+async def get_broadcast(id: DKGID, digest: HexStr):
+    broadcast = _load_broadcast(id, digest)
+    if broadcast is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+    return broadcast
+
+
+async def _deliver_shares(deliveries: list[DKGShareDelivery]) -> None:
+    receivers = {node.id: node for node in get_party([delivery.receiver for delivery in deliveries])}
+    # A receiver missing from the configured party counts as a failed delivery.
+    failed = [delivery.receiver for delivery in deliveries if delivery.receiver not in receivers]
+    known = [delivery for delivery in deliveries if delivery.receiver in receivers]
+    async with httpx.AsyncClient(timeout=get_node_settings().PEER_TIMEOUT) as client:
+        responses = await asyncio.gather(
+            *(
+                client.post(f"{receivers[delivery.receiver].url}dkg/share", json=delivery.model_dump(mode="json"))
+                for delivery in known
+            ),
+            return_exceptions=True,
+        )
+    failed += [
+        delivery.receiver
+        for delivery, response in zip(known, responses, strict=True)
+        if isinstance(response, BaseException) or response.is_error
+    ]
+    if failed:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Share delivery failed to nodes: {failed}")
 
 
 @router.post("/round2", response_model=DKGRound2EncryptedPackage)
-def round2(round2_request: DKGRound2Request):
-    dkg = DKG.load_dkg_object(settings=settings, id=round2_request.id, repository=get_dkg_repository())
-    return dkg.round2(broadcast_data=round2_request.broadcast_data)
+async def round2(round2_request: DKGRound2Request):
+    broadcast_data = await _resolve_broadcast_data(round2_request)
+    result, deliveries = await run_crypto(_round2, round2_request, broadcast_data)
+    if not round2_request.deliver_to_peers:
+        return result
+    await _deliver_shares(deliveries)
+    return DKGRound2EncryptedPackage(encrypted_package={})
+
+
+def _receive_share(delivery: DKGShareDelivery) -> None:
+    settings = get_node_settings()
+    senders = get_party([delivery.sender])
+    if delivery.receiver != settings.ID or not senders:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown share sender or receiver")
+    sender = senders[0]
+    if not single_verify_data(sender.curve_name, sender.public_key, delivery.signed_payload(), delivery.signature):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid share signature")
+    get_share_repository().set(share_key(settings, delivery.id, delivery.sender), delivery.model_dump(mode="json"))
+
+
+@router.post("/share")
+async def receive_share(delivery: DKGShareDelivery):
+    await run_crypto(_receive_share, delivery)
+
+
+@router.get("/round2/status/{id}", response_model=DKGRound2Status)
+async def round2_status(id: DKGID):
+    try:
+        dkg = _load_dkg(id)
+    except DKGNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    share_repo = get_share_repository()
+    received = [node.id for node in dkg.partners if share_repo.get(share_key(dkg.settings, id, node.id)) is not None]
+    return DKGRound2Status(received=received, missing=[node.id for node in dkg.partners if node.id not in received])
 
 
 @router.post("/round3", response_model=DKGRound3NodeResponse)
-def round3(round3_request: DKGRound3Request):
-    dkg = DKG.load_dkg_object(settings=settings, id=round3_request.id, repository=get_dkg_repository())
-    key_repo = get_key_repository()
-    return dkg.round3(round3_request.encrypted_package, key_repo)
+async def round3(round3_request: DKGRound3Request):
+    return await run_crypto(_round3, round3_request)
+
+
+def _batch_session_ids(id: DKGID, key_count: int) -> list[DKGID]:
+    return [batch_session_id(id, index) for index in range(key_count)]
+
+
+def _load_batch_dkg(id: DKGID, key_count: int, create_missing: bool = False) -> BatchDKG:
+    return BatchDKG.from_first_session(
+        _load_dkg(batch_session_id(id, 0)), id, key_count, _load_dkg, create_missing=create_missing
+    )
+
+
+def _batch_round1(round1_request: DKGBatchRound1Request) -> DKGBatchRound1NodeResponse:
+    settings = get_node_settings()
+    if round1_request.key_count > settings.MAX_DKG_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.MAX_DKG_BATCH_SIZE} keys per batch DKG",
+        )
+    with _hold(round1_request.id, _batch_session_ids(round1_request.id, round1_request.key_count)):
+        return _locked_batch_round1(round1_request)
+
+
+def _locked_batch_round1(round1_request: DKGBatchRound1Request) -> DKGBatchRound1NodeResponse:
+    settings = get_node_settings()
+    try:
+        # A retry reuses every session stored so far, even if the previous round 1 stopped half way.
+        batch = _load_batch_dkg(round1_request.id, round1_request.key_count, create_missing=True)
+        batch.sessions[0].check_round1_replay(
+            get_curve(round1_request.curve),
+            round1_request.party_ids,
+            round1_request.max_signers,
+            round1_request.min_signers,
+        )
+    except DKGNotFoundError:
+        batch = BatchDKG.create(
+            settings=settings,
+            curve=get_curve(round1_request.curve),
+            id=round1_request.id,
+            repository=get_dkg_repository(),
+            party=get_party(round1_request.party_ids),
+            key_count=round1_request.key_count,
+        )
+    response = batch.round1(max_signers=round1_request.max_signers, min_signers=round1_request.min_signers)
+    session_cache = get_dkg_session_cache()
+    if session_cache is not None:
+        for session in batch.sessions:
+            session_cache.put(session)
+    for session in batch.sessions:
+        _touch(session)
+    return response
+
+
+def _batch_round2(round2_request: DKGBatchRound2Request) -> DKGRound2EncryptedPackage:
+    with _hold(round2_request.id, _batch_session_ids(round2_request.id, round2_request.key_count)):
+        batch = _load_batch_dkg(round2_request.id, round2_request.key_count)
+        result = batch.round2(broadcast_data=round2_request.broadcast_data)
+        for session in batch.sessions:
+            _touch(session)
+    return result
+
+
+def _batch_round3(round3_request: DKGBatchRound3Request) -> DKGBatchRound3NodeResponse:
+    settings = get_node_settings()
+    session_locks = get_dkg_session_locks()
+    with _hold(round3_request.id, _batch_session_ids(round3_request.id, round3_request.key_count)):
+        result = session_locks.completed(settings, round3_request.id, DKGBatchRound3NodeResponse)
+        if result is None:
+            batch = _load_batch_dkg(round3_request.id, round3_request.key_count)
+            result = batch.round3(round3_request.encrypted_package, get_key_repository(), get_key_package_cache())
+            for session in batch.sessions:
+                _forget(session)
+            session_locks.complete(settings, round3_request.id, result)
+        return result
+
+
+@router.post("/batch/round1", response_model=DKGBatchRound1NodeResponse)
+async def batch_round1(round1_request: DKGBatchRound1Request):
+    return await run_crypto(_batch_round1, round1_request)
+
+
+@router.post("/batch/round2", response_model=DKGRound2EncryptedPackage)
+async def batch_round2(round2_request: DKGBatchRound2Request):
+    return await run_crypto(_batch_round2, round2_request)
+
+
+@router.post("/batch/round3", response_model=DKGBatchRound3NodeResponse)
+async def batch_round3(round3_request: DKGBatchRound3Request):
+    return await run_crypto(_batch_round3, round3_request)
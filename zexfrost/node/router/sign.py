@@ -1,22 +1,152 @@
-from fastapi import APIRouter
+import asyncio
+from collections.abc import Callable
+from typing import Any
 
-from zexfrost.custom_types import Commitment, CommitmentRequest
+from fastapi import APIRouter, HTTPException, status
+
+from zexfrost.custom_types import (
+    BatchCommitmentRequest,
+    BatchCommitmentResponse,
+    Commitment,
+    CommitmentRequest,
+    NodeID,
+    PrivateKeyPackage,
+    SignatureID,
+    SigningRequest,
+    SigningResponse,
+)
+from zexfrost.repository import MemoryRepository, is_async_repository
 from zexfrost.utils import get_curve
 
-from ..repository import get_key_repository, get_nonce_repository
-from ..settings import node_settings as settings
+from ..key_cache import KeyPackageCache, get_key_package_cache
+from ..message import MessageBuilder, get_message_builder
+from ..preprocess import get_nonce_preprocessor
+from ..repository import KeyRepository, get_key_repository, get_nonce_repository
+from ..settings import get_node_settings
+from ..sign import batch_commitment as signature_batch_commitment
 from ..sign import commitment as signature_commitment
+from ..sign import group_by_tweak, load_key_package, nonce_key, sign_group
+from .utils import run_crypto
 
 router = APIRouter(prefix="/sign")
 
 
+async def _run_commitment(fn: Callable[..., Any], **kwargs: Any) -> Any:
+    """Run a commitment handler; with an async nonce repository the nonces are buffered and stored in one call."""
+    nonce_repo = get_nonce_repository()
+    if not is_async_repository(nonce_repo):
+        return await run_crypto(fn, nonce_repo=nonce_repo, **kwargs)
+    buffer: MemoryRepository[dict] = MemoryRepository()
+    result = await run_crypto(fn, nonce_repo=buffer, **kwargs)
+    await nonce_repo.set_many(buffer.data)
+    return result
+
+
 @router.post("/commitment", response_model=Commitment)
 async def commitment(commitment_request: CommitmentRequest):
-    return signature_commitment(
+    settings = get_node_settings()
+    curve = get_curve(commitment_request.curve)
+    preprocessor = get_nonce_preprocessor()
+    if preprocessor is not None:
+        precomputed = preprocessor.take(curve, commitment_request.pubkey_package, commitment_request.tweak_by)
+        if precomputed:
+            return precomputed[0]
+    result = await _run_commitment(
+        signature_commitment,
         node_id=settings.ID,
-        curve=get_curve(commitment_request.curve),
+        curve=curve,
         key_repo=get_key_repository(),
-        nonce_repo=get_nonce_repository(),
         pubkey_package=commitment_request.pubkey_package,
         tweak_by=commitment_request.tweak_by,
+        key_cache=get_key_package_cache(),
+    )
+    if preprocessor is not None:
+        preprocessor.register(curve, commitment_request.pubkey_package, commitment_request.tweak_by)
+    return result
+
+
+@router.post("/commitment/batch", response_model=BatchCommitmentResponse)
+async def batch_commitment(batch_commitment_request: BatchCommitmentRequest):
+    settings = get_node_settings()
+    if batch_commitment_request.total > settings.MAX_COMMITMENTS_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.MAX_COMMITMENTS_PER_REQUEST} commitments per request",
+        )
+    curve = get_curve(batch_commitment_request.curve)
+    pubkey_package = batch_commitment_request.pubkey_package
+    preprocessor = get_nonce_preprocessor()
+    precomputed = [
+        [] if preprocessor is None else preprocessor.take(curve, pubkey_package, entry.tweak_by, entry.count)
+        for entry in batch_commitment_request.entries
+    ]
+    missing = [
+        (entry.tweak_by, entry.count - len(commitments))
+        for entry, commitments in zip(batch_commitment_request.entries, precomputed, strict=True)
+    ]
+    generated = await _run_commitment(
+        signature_batch_commitment,
+        node_id=settings.ID,
+        curve=curve,
+        key_repo=get_key_repository(),
+        pubkey_package=pubkey_package,
+        entries=[(tweak_by, count) for tweak_by, count in missing if count > 0],
+        key_cache=get_key_package_cache(),
+    )
+    if preprocessor is not None:
+        for tweak_by, _ in missing:
+            preprocessor.register(curve, pubkey_package, tweak_by)
+    generated_iter = iter(generated)
+    return [
+        commitments + (next(generated_iter) if count > 0 else [])
+        for commitments, (_, count) in zip(precomputed, missing, strict=True)
+    ]
+
+
+def _prepare_batch_sign(
+    node_id: NodeID,
+    signing_request: SigningRequest,
+    build_message: MessageBuilder,
+    key_repo: KeyRepository,
+    key_cache: KeyPackageCache | None,
+) -> tuple[dict[SignatureID, bytes], PrivateKeyPackage]:
+    """Build the messages and load the key package, off the event loop."""
+    messages = {
+        sig_id: build_message(signing_data, signing_request.metadata)
+        for sig_id, signing_data in signing_request.signings_data.items()
+    }
+    return messages, load_key_package(node_id, signing_request.pubkey_package, key_repo, key_cache)
+
+
+@router.post("/batch", response_model=SigningResponse)
+async def batch_sign(signing_request: SigningRequest):
+    settings = get_node_settings()
+    curve = get_curve(signing_request.curve)
+    messages, key_package = await run_crypto(
+        _prepare_batch_sign,
+        settings.ID,
+        signing_request,
+        get_message_builder(),
+        get_key_repository(),
+        get_key_package_cache(),
+    )
+    nonce_repo = get_nonce_repository()
+    if is_async_repository(nonce_repo):
+        keys = [
+            nonce_key(settings.ID, signing_data.commitments[settings.ID])
+            for signing_data in signing_request.signings_data.values()
+        ]
+        nonces = await nonce_repo.pop_many(keys)
+        nonce_repo = MemoryRepository(
+            {key: nonce for key, nonce in zip(keys, nonces, strict=True) if nonce is not None}
+        )
+    groups_result = await asyncio.gather(
+        *(
+            run_crypto(sign_group, curve, settings.ID, key_package, tweak_by, group, messages, nonce_repo)
+            for tweak_by, group in group_by_tweak(signing_request.signings_data).items()
+        )
     )
+    result: SigningResponse = {}
+    for group_result in groups_result:
+        result.update(group_result)
+    return result
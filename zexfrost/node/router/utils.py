@@ -0,0 +1,78 @@
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from zexfrost.compression import decompress
+from zexfrost.exceptions import (
+    CryptoExecutorBusyError,
+    DKGBatchSizeError,
+    DKGNotFoundError,
+    DKGRoundConflictError,
+    ZexFrostBaseException,
+)
+
+from ..executor import get_crypto_executor
+from ..settings import NodeSettings, use_node_settings
+
+_ERROR_STATUS: dict[type[ZexFrostBaseException], int] = {
+    CryptoExecutorBusyError: status.HTTP_503_SERVICE_UNAVAILABLE,
+    DKGNotFoundError: status.HTTP_404_NOT_FOUND,
+    DKGRoundConflictError: status.HTTP_409_CONFLICT,
+    DKGBatchSizeError: status.HTTP_409_CONFLICT,
+}
+
+
+async def run_crypto[**_P, _T](fn: Callable[_P, _T], /, *args: _P.args, **kwargs: _P.kwargs) -> _T:
+    """
+    Run a handler on the crypto executor, answering 503 when its queue is full, 404 for an unknown
+    DKG session and 409 for a retried round that conflicts with the stored session.
+    """
+    try:
+        return await get_crypto_executor().run(fn, *args, **kwargs)
+    except tuple(_ERROR_STATUS) as e:
+        status_code = next(code for error, code in _ERROR_STATUS.items() if isinstance(e, error))
+        raise HTTPException(status_code=status_code, detail=str(e)) from e
+
+
+class _DecompressedRequest(Request):
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            encoding = self.headers.get("content-encoding")
+            if encoding:
+                try:
+                    body = decompress(body, encoding)
+                except ValueError as e:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+            self._body = body
+        return self._body
+
+
+class DecompressingRoute(APIRoute):
+    """Route accepting request bodies compressed with a `Content-Encoding` of gzip or zstd."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(_DecompressedRequest(request.scope, request.receive))
+
+        return route_handler
+
+
+class NodeSettingsMiddleware:
+    """
+    ASGI middleware serving the wrapped app as the node with `settings`, so one process can host several nodes.
+    The nodes share the configured repositories, which keep them apart by the node ID prefix of every key.
+    """
+
+    def __init__(self, app: ASGIApp, settings: NodeSettings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        with use_node_settings(self.settings):
+            await self.app(scope, receive, send)
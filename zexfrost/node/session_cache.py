@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+from zexfrost.custom_types import DKGID
+
+from .dkg import DKG
+from .repository import DKGRepository
+from .settings import NodeSettings
+
+
+class DKGSessionCache:
+    """
+    Bounded LRU cache of live node `DKG` sessions.
+
+    Round handlers reuse the cached object instead of rebuilding it from the repository on
+    every request, and `DKG.store_dkg_object` only re-serializes the fields a round changed.
+    Pair it with a `WriteBehindRepository(durable=False)` to persist the changes off the request path.
+    Under several worker processes a cached session may be stale: with a versioned DKG repository
+    its next write fails with `DKGRoundConflictError` and the round handlers drop it from the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, DKG] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @staticmethod
+    def _key(settings: NodeSettings, id: DKGID) -> str:
+        return settings.ID + id.hex
+
+    def get(self, settings: NodeSettings, id: DKGID) -> DKG | None:
+        with self._lock:
+            dkg = self._data.get(self._key(settings, id))
+            if dkg is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(self._key(settings, id))
+            return dkg
+
+    def put(self, dkg: DKG) -> None:
+        key = self._key(dkg.settings, dkg.id)
+        with self._lock:
+            self._data[key] = dkg
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def load(self, settings: NodeSettings, id: DKGID, repository: DKGRepository) -> DKG:
+        """Get the live session, loading it from the repository on a miss."""
+        dkg = self.get(settings, id)
+        if dkg is None:
+            dkg = DKG.load_dkg_object(settings, id, repository)
+            self.put(dkg)
+        return dkg
+
+    def invalidate(self, settings: NodeSettings, id: DKGID) -> None:
+        with self._lock:
+            self._data.pop(self._key(settings, id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_dkg_session_cache: DKGSessionCache | None = None
+
+
+def set_dkg_session_cache(dkg_session_cache: DKGSessionCache | None) -> None:
+    global _dkg_session_cache
+    _dkg_session_cache = dkg_session_cache
+
+
+def get_dkg_session_cache() -> DKGSessionCache | None:
+    return _dkg_session_cache
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from zexfrost.custom_types import DKGID
+
+from .dkg import broadcast_key, share_key
+from .repository import BroadcastRepository, DKGRepository, DKGSessionIndex, ShareRepository
+from .session_cache import DKGSessionCache
+from .settings import NodeSettings
+
+logger = logging.getLogger(__name__)
+
+
+class DKGSessionSweeper:
+    """
+    Expires DKG sessions that never reach round 3.
+
+    Round handlers `touch` a session whenever a round runs on it and `forget` it once round 3
+    stored the key and deleted the session. A background thread deletes every session that was
+    not touched for `ttl` seconds from the DKG repository and the session cache, together with
+    its round-1 broadcast and delivered round-2 shares, so abandoned ceremonies do not keep their
+    temporary private key and round packages forever.
+
+    When the DKG repository is a `DKGSessionIndex`, every sweep takes the deadlines from the
+    sessions' stored write times, so sessions written by other worker processes or before a
+    restart expire too and a session another worker advanced is not deleted early.
+    """
+
+    def __init__(
+        self,
+        repository: DKGRepository,
+        ttl: float = 600,
+        interval: float = 30,
+        session_cache: DKGSessionCache | None = None,
+        broadcast_repository: BroadcastRepository | None = None,
+        share_repository: ShareRepository | None = None,
+    ):
+        if ttl <= 0 or interval <= 0:
+            raise ValueError("ttl and interval must be positive")
+        self.repository = repository
+        self.ttl = ttl
+        self.interval = interval
+        self.session_cache = session_cache
+        self.broadcast_repository = broadcast_repository
+        self.share_repository = share_repository
+        self.expired = 0
+        self._deadlines: OrderedDict[tuple[str, DKGID], tuple[NodeSettings, float]] = OrderedDict()
+        self._nodes: dict[str, NodeSettings] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: NodeSettings,
+        repository: DKGRepository,
+        session_cache: DKGSessionCache | None = None,
+        broadcast_repository: BroadcastRepository | None = None,
+        share_repository: ShareRepository | None = None,
+    ) -> "DKGSessionSweeper":
+        return cls(
+            repository,
+            ttl=settings.DKG_SESSION_TTL,
+            interval=settings.DKG_SESSION_SWEEP_INTERVAL,
+            session_cache=session_cache,
+            broadcast_repository=broadcast_repository,
+            share_repository=share_repository,
+        )
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def touch(self, settings: NodeSettings, id: DKGID) -> None:
+        key = (settings.ID, id)
+        with self._lock:
+            self._nodes[settings.ID] = settings
+            self._deadlines[key] = (settings, time.monotonic() + self.ttl)
+            self._deadlines.move_to_end(key)
+
+    def forget(self, settings: NodeSettings, id: DKGID) -> None:
+        with self._lock:
+            self._deadlines.pop((settings.ID, id), None)
+        if self.broadcast_repository is not None:
+            self.broadcast_repository.delete(broadcast_key(settings, id))
+
+    def seed(self, settings: NodeSettings) -> None:
+        """Track every session stored for the node, e.g. at startup, by the time it was last written."""
+        with self._lock:
+            self._nodes[settings.ID] = settings
+        self._refresh()
+
+    def _refresh(self) -> None:
+        if not isinstance(self.repository, DKGSessionIndex):
+            return
+        with self._lock:
+            nodes = list(self._nodes.values())
+        offset = time.monotonic() - time.time()
+        stored: dict[tuple[str, DKGID], tuple[NodeSettings, float]] = {}
+        for settings in nodes:
+            for dkg_id, updated_at in self.repository.last_updated(settings.ID).items():
+                stored[(settings.ID, UUID(hex=dkg_id))] = (settings, updated_at + offset + self.ttl)
+        gone = []
+        with self._lock:
+            for key, (settings, deadline) in self._deadlines.items():
+                if key not in stored and key[0] in self._nodes:
+                    gone.append((settings, key[1]))
+                elif key in stored and deadline > stored[key][1]:
+                    stored[key] = (settings, deadline)
+            self._deadlines = OrderedDict(sorted(stored.items(), key=lambda item: item[1][1]))
+        # Deleted by another worker; drop the stale cached copies.
+        if self.session_cache is not None:
+            for settings, id in gone:
+                self.session_cache.invalidate(settings, id)
+
+    def sweep(self, now: float | None = None) -> int:
+        """Delete the sessions whose TTL elapsed. Returns the number of deleted sessions."""
+        self._refresh()
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            # Deadlines only grow, so the oldest entries come first.
+            while self._deadlines:
+                key, (settings, deadline) = next(iter(self._deadlines.items()))
+                if deadline > now:
+                    break
+                del self._deadlines[key]
+                expired.append((settings, key[1]))
+        for settings, id in expired:
+            self._delete(settings, id)
+        self.expired += len(expired)
+        return len(expired)
+
+    def _delete(self, settings: NodeSettings, id: DKGID) -> None:
+        if self.session_cache is not None:
+            self.session_cache.invalidate(settings, id)
+        key = settings.ID + id.hex
+        session = self.repository.get(key)
+        self.repository.delete(key)
+        if self.broadcast_repository is not None:
+            self.broadcast_repository.delete(broadcast_key(settings, id))
+        if self.share_repository is not None and session is not None:
+            for partner in session["partners"]:
+                self.share_repository.delete(share_key(settings, id, partner["id"]))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="dkg-session-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("DKG session sweep failed")
+
+
+_dkg_session_sweeper: DKGSessionSweeper | None = None
+
+
+def set_dkg_session_sweeper(sweeper: DKGSessionSweeper | None) -> None:
+    global _dkg_session_sweeper
+    _dkg_session_sweeper = sweeper
+
+
+def get_dkg_session_sweeper() -> DKGSessionSweeper | None:
+    return _dkg_session_sweeper
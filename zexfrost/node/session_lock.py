@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from pydantic import BaseModel
+
+from zexfrost.custom_types import DKGID
+
+from .repository import DKGResultRepository, get_dkg_result_repository
+from .settings import NodeSettings
+
+
+class _KeyLock:
+    __slots__ = ("lock", "holders")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.holders = 0
+
+
+class DKGSessionLocks:
+    """
+    Per-session locks for the DKG round handlers.
+
+    Requests for one DKG id run one at a time, so a retried or duplicated round cannot interleave
+    its load -> mutate -> store with another one, while different DKGs run in parallel. A lock only
+    exists while some request holds or waits for it. The locks are per process; across worker
+    processes a versioned DKG repository (`SQLiteDKGRepository`) rejects the losing write of two
+    racing rounds with `DKGRoundConflictError`.
+
+    Round 3 deletes the session, so its responses are replayed to a retried round 3 request. They
+    are stored in `results` when given, which `configure_shared_repositories` shares between the
+    workers, and otherwise kept in a bounded LRU of this process.
+    """
+
+    def __init__(self, max_completed: int = 1024, results: DKGResultRepository | None = None):
+        if max_completed <= 0:
+            raise ValueError("max_completed must be positive")
+        self.max_completed = max_completed
+        self.results = results
+        self._locks: dict[str, _KeyLock] = {}
+        self._completed: OrderedDict[str, BaseModel] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @staticmethod
+    def _key(settings: NodeSettings, id: DKGID) -> str:
+        return settings.ID + id.hex
+
+    @contextmanager
+    def hold(self, settings: NodeSettings, id: DKGID) -> Iterator[None]:
+        key = self._key(settings, id)
+        with self._lock:
+            key_lock = self._locks.get(key)
+            if key_lock is None:
+                key_lock = self._locks[key] = _KeyLock()
+            key_lock.holders += 1
+        try:
+            with key_lock.lock:
+                yield
+        finally:
+            with self._lock:
+                key_lock.holders -= 1
+                if key_lock.holders == 0:
+                    del self._locks[key]
+
+    def completed[_ModelT: BaseModel](self, settings: NodeSettings, id: DKGID, model: type[_ModelT]) -> _ModelT | None:
+        """The recorded round 3 response of the session, if it is still kept."""
+        if self.results is not None:
+            stored = self.results.get(self._key(settings, id))
+            return None if stored is None else model.model_validate(stored)
+        with self._lock:
+            response = self._completed.get(self._key(settings, id))
+        return response if isinstance(response, model) else None
+
+    def complete(self, settings: NodeSettings, id: DKGID, response: BaseModel) -> None:
+        key = self._key(settings, id)
+        if self.results is not None:
+            self.results.set(key, response.model_dump(mode="json"))
+            return
+        with self._lock:
+            self._completed[key] = response
+            self._completed.move_to_end(key)
+            while len(self._completed) > self.max_completed:
+                self._completed.popitem(last=False)
+
+
+_dkg_session_locks: DKGSessionLocks | None = None
+_dkg_session_locks_lock = threading.Lock()
+
+
+def set_dkg_session_locks(session_locks: DKGSessionLocks | None) -> None:
+    global _dkg_session_locks
+    _dkg_session_locks = session_locks
+
+
+def get_dkg_session_locks() -> DKGSessionLocks:
+    """Get the configured session locks, creating the default ones on first use."""
+    global _dkg_session_locks
+    if _dkg_session_locks is None:
+        with _dkg_session_locks_lock:
+            if _dkg_session_locks is None:
+                _dkg_session_locks = DKGSessionLocks(results=get_dkg_result_repository())
+    return _dkg_session_locks
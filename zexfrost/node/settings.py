@@ -1,8 +1,11 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Literal
 
 from pydantic import Field
 
-from zexfrost.custom_types import HexStr
+from zexfrost.custom_types import MAX_COMMITMENT_BATCH, MAX_DKG_BATCH_SIZE, HexStr
 from zexfrost.settings import BaseApplicationSettings
 
 
@@ -14,6 +17,38 @@ class NodeSettings(BaseApplicationSettings):
     ID: HexStr
     CURVE_NAME: Literal["secp256k1"] = Field(default="secp256k1", frozen=True)
     PRIVATE_KEY: HexStr
+    CRYPTO_EXECUTOR: Literal["thread", "process"] = "thread"
+    CRYPTO_MAX_WORKERS: int | None = None
+    CRYPTO_MAX_QUEUE_SIZE: int = 1024
+    # Commitments one /sign/commitment/batch request may ask for, at most MAX_COMMITMENT_BATCH.
+    MAX_COMMITMENTS_PER_REQUEST: int = MAX_COMMITMENT_BATCH
+    # Keys one batch DKG may generate, at most MAX_DKG_BATCH_SIZE.
+    MAX_DKG_BATCH_SIZE: int = MAX_DKG_BATCH_SIZE
+    # Timeout in seconds of requests to other nodes: broadcast fetches and share deliveries.
+    PEER_TIMEOUT: float = 10
+    DKG_SESSION_TTL: float = 600
+    DKG_SESSION_SWEEP_INTERVAL: float = 30
 
 
 node_settings = NodeSettings.model_validate({})
+
+# Node code reads the serving node through `get_node_settings()` rather than `node_settings`, so one
+# process can host several nodes (`NodeSettingsMiddleware`, the DKG benchmark). Those nodes share the
+# configured repositories: every key a node writes must start with its `ID`, as the DKG session,
+# broadcast, share, result, key and nonce keys do.
+_current_node_settings: ContextVar[NodeSettings | None] = ContextVar("node_settings", default=None)
+
+
+def get_node_settings() -> NodeSettings:
+    """Settings of the node serving the current request: `node_settings` unless overridden by `use_node_settings`."""
+    return _current_node_settings.get() or node_settings
+
+
+@contextmanager
+def use_node_settings(settings: NodeSettings) -> Iterator[None]:
+    """Serve the code in the block as the node with `settings`, e.g. to run several nodes in one process."""
+    token = _current_node_settings.set(settings)
+    try:
+        yield
+    finally:
+        _current_node_settings.reset(token)
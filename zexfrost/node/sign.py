@@ -7,57 +7,174 @@ from zexfrost.custom_types import (
     PrivateKeyPackage,
     PublicKeyPackage,
     SharePackage,
+    SignatureID,
+    SigningData,
+    SigningResponse,
     TweakBy,
 )
+from zexfrost.tweak_cache import tweak_key_package
 
+from .executor import call_curve, map_curve
+from .key_cache import KeyPackageCache
 from .repository import KeyRepository, NonceRepository
 
 
-def commitment(
+def load_key_package(
     node_id: NodeID,
-    curve: BaseCryptoCurve,
     pubkey_package: PublicKeyPackage,
     key_repo: KeyRepository,
-    nonce_repo: NonceRepository,
-    tweak_by: TweakBy | None = None,
-) -> Commitment:
-    key_package = PrivateKeyPackage.model_validate(key_repo.get(node_id + pubkey_package.verifying_key))
+    key_cache: KeyPackageCache | None = None,
+) -> PrivateKeyPackage:
+    key = node_id + pubkey_package.verifying_key
+    if key_cache is not None:
+        key_package = key_cache.load(key_repo, key)
+        assert key_package is not None, "Key not found"
+        return key_package
+    key_package = key_repo.get(key)
     assert key_package is not None, "Key not found"
+    return PrivateKeyPackage.model_validate(key_package)
+
+
+def _tweak_key_package(
+    curve: BaseCryptoCurve, key_package: PrivateKeyPackage, tweak_by: TweakBy | None
+) -> PrivateKeyPackage:
     match curve:
         case BaseCurveWithTweakedSign():
-            key_package = curve.key_package_tweak(key_package, tweak_by)
+            return tweak_key_package(curve, key_package, tweak_by)
         case BaseCryptoCurve():
             if tweak_by is not None:
-                key_package = curve.key_package_tweak(key_package, tweak_by)
-    result = curve.round1_commit(key_package.signing_share)
-    nonce_repo.set(f"{result.commitments.binding}-{result.commitments.hiding}", result.nonces.model_dump(mode="python"))
+                return tweak_key_package(curve, key_package, tweak_by)
+    return key_package
+
+
+def nonce_key(node_id: NodeID, commitment: Commitment) -> str:
+    return f"{node_id}{commitment.binding}-{commitment.hiding}"
+
+
+def _store_nonce(node_id: NodeID, nonce_repo: NonceRepository, result) -> Commitment:
+    nonce_repo.set(nonce_key(node_id, result.commitments), result.nonces.model_dump(mode="python"))
     return result.commitments
 
 
-def sign(
+def _commit(
+    node_id: NodeID, curve: BaseCryptoCurve, key_package: PrivateKeyPackage, nonce_repo: NonceRepository
+) -> Commitment:
+    return _store_nonce(node_id, nonce_repo, call_curve(curve, "round1_commit", key_package.signing_share))
+
+
+def commitment(
+    node_id: NodeID,
     curve: BaseCryptoCurve,
+    pubkey_package: PublicKeyPackage,
+    key_repo: KeyRepository,
+    nonce_repo: NonceRepository,
+    tweak_by: TweakBy | None = None,
+    key_cache: KeyPackageCache | None = None,
+) -> Commitment:
+    key_package = load_key_package(node_id, pubkey_package, key_repo, key_cache)
+    key_package = _tweak_key_package(curve, key_package, tweak_by)
+    return _commit(node_id, curve, key_package, nonce_repo)
+
+
+def batch_commitment(
     node_id: NodeID,
+    curve: BaseCryptoCurve,
     pubkey_package: PublicKeyPackage,
+    key_repo: KeyRepository,
+    nonce_repo: NonceRepository,
+    entries: list[tuple[TweakBy | None, int]],
+    key_cache: KeyPackageCache | None = None,
+) -> list[list[Commitment]]:
+    """
+    Generate `count` commitments for every (tweak_by, count) entry.
+    The key package is loaded once and tweaked once per entry.
+    """
+    key_package = load_key_package(node_id, pubkey_package, key_repo, key_cache)
+    result = []
+    for tweak_by, count in entries:
+        tweaked_key_package = _tweak_key_package(curve, key_package, tweak_by)
+        commit_results = map_curve(curve, "round1_commit", [(tweaked_key_package.signing_share,)] * count)
+        result.append([_store_nonce(node_id, nonce_repo, commit_result) for commit_result in commit_results])
+    return result
+
+
+def _sign(
+    curve: BaseCryptoCurve,
+    node_id: NodeID,
+    key_package: PrivateKeyPackage,
     commitments: dict[NodeID, Commitment],
     message: bytes,
-    key_repo: KeyRepository,
     nonce_repo: NonceRepository,
-    tweak_by: TweakBy | None = None,
 ) -> SharePackage:
     commitment = commitments[node_id]
-    key_package = key_repo.get(node_id + pubkey_package.verifying_key)
-    assert key_package is not None, "Key not found"
-    nonce = nonce_repo.pop(f"{commitment.binding}-{commitment.hiding}")
+    nonce = nonce_repo.pop(nonce_key(node_id, commitment))
     assert nonce is not None, "Nonce not found"
-    key_package = PrivateKeyPackage.model_validate(key_package)
     nonce = Nonce.model_validate(nonce)
     signing_package = curve.signing_package_new(commitments, message)
     match curve:
         case BaseCurveWithTweakedSign():
-            key_package = curve.key_package_tweak(key_package, tweak_by)
-            result = curve.round2_sign_with_tweak(signing_package, nonce, key_package, None)
+            result = call_curve(curve, "round2_sign_with_tweak", signing_package, nonce, key_package, None)
         case BaseCryptoCurve():
-            if tweak_by is not None:
-                key_package = curve.key_package_tweak(key_package, tweak_by)
-            result = curve.round2_sign(signing_package, nonce, key_package)
+            result = call_curve(curve, "round2_sign", signing_package, nonce, key_package)
+    return result
+
+
+def sign(
+    curve: BaseCryptoCurve,
+    node_id: NodeID,
+    pubkey_package: PublicKeyPackage,
+    commitments: dict[NodeID, Commitment],
+    message: bytes,
+    key_repo: KeyRepository,
+    nonce_repo: NonceRepository,
+    tweak_by: TweakBy | None = None,
+    key_cache: KeyPackageCache | None = None,
+) -> SharePackage:
+    key_package = load_key_package(node_id, pubkey_package, key_repo, key_cache)
+    key_package = _tweak_key_package(curve, key_package, tweak_by)
+    return _sign(curve, node_id, key_package, commitments, message, nonce_repo)
+
+
+def group_by_tweak(
+    signings_data: dict[SignatureID, SigningData],
+) -> dict[TweakBy | None, dict[SignatureID, SigningData]]:
+    result: dict[TweakBy | None, dict[SignatureID, SigningData]] = {}
+    for sig_id, signing_data in signings_data.items():
+        result.setdefault(signing_data.tweak_by, {})[sig_id] = signing_data
+    return result
+
+
+def sign_group(
+    curve: BaseCryptoCurve,
+    node_id: NodeID,
+    key_package: PrivateKeyPackage,
+    tweak_by: TweakBy | None,
+    signings_data: dict[SignatureID, SigningData],
+    messages: dict[SignatureID, bytes],
+    nonce_repo: NonceRepository,
+) -> SigningResponse:
+    """
+    Sign every entry sharing `tweak_by` with a key package that is tweaked once for the whole group.
+    """
+    key_package = _tweak_key_package(curve, key_package, tweak_by)
+    return {
+        sig_id: _sign(curve, node_id, key_package, signing_data.commitments, messages[sig_id], nonce_repo)
+        for sig_id, signing_data in signings_data.items()
+    }
+
+
+def batch_sign(
+    curve: BaseCryptoCurve,
+    node_id: NodeID,
+    pubkey_package: PublicKeyPackage,
+    signings_data: dict[SignatureID, SigningData],
+    messages: dict[SignatureID, bytes],
+    key_repo: KeyRepository,
+    nonce_repo: NonceRepository,
+    key_cache: KeyPackageCache | None = None,
+) -> SigningResponse:
+    key_package = load_key_package(node_id, pubkey_package, key_repo, key_cache)
+    result: SigningResponse = {}
+    for tweak_by, group in group_by_tweak(signings_data).items():
+        result.update(sign_group(curve, node_id, key_package, tweak_by, group, messages, nonce_repo))
     return result
@@ -0,0 +1,12 @@
+from .mmap_key import MmapKeyRepository
+from .nonce import TTLNonceRepository
+from .sqlite import SQLiteDKGRepository, SQLiteRepository
+from .write_behind import WriteBehindRepository
+
+__all__ = [
+    "MmapKeyRepository",
+    "TTLNonceRepository",
+    "SQLiteRepository",
+    "SQLiteDKGRepository",
+    "WriteBehindRepository",
+]
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+
+_DATA_MAGIC = b"ZFKEYS01"
+_INDEX_MAGIC = b"ZFKIDX01"
+# magic, record size, record count
+_DATA_HEADER = struct.Struct("<8sIxxxxQ")
+# magic, slot count, used slots (live + tombstones), live slots
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+# flags, key length, value length
+_RECORD_HEADER = struct.Struct("<BxHI")
+# tag, record number
+_SLOT = struct.Struct("<QQ")
+
+_LIVE = 0
+_DELETED = 1
+_EMPTY_TAG = 0
+_TOMBSTONE_TAG = 1
+
+
+def _tag(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") | 2
+
+
+def _encode_key(key: str) -> bytes:
+    try:
+        return b"h" + bytes.fromhex(key)
+    except ValueError:
+        return b"s" + key.encode()
+
+
+class MmapKeyRepository:
+    """
+    Key repository backed by a memory-mapped, append-only file of fixed-width records.
+
+    Meant for nodes holding a very large number of key packages: nothing is loaded at startup,
+    both files are only mapped. Each record holds the key (hex keys are stored as raw bytes)
+    and the compact JSON of the key package, padded to `record_size`. An open-addressing hash
+    index in `<path>.idx`, also mapped, points from the key to its record, so a lookup reads one
+    record straight from the mapping. Overwrites append a new record and mark the old one as
+    deleted; if the index file is lost it is rebuilt by scanning the records.
+
+    Reads are not zero-copy: the record bytes are copied out of the mapping and parsed with
+    `json.loads` on every `get`. With `durable=True` (the default) every `set` and `delete`
+    msyncs the dirty pages before returning, so a key package acknowledged by DKG round 3
+    survives a crash; with `durable=False` changes reach the disk on `flush` or `close`.
+
+    A store must be opened by a single process; threads may share it.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        record_size: int = 512,
+        initial_capacity: int = 1024,
+        durable: bool = True,
+    ):
+        if record_size <= _RECORD_HEADER.size or initial_capacity <= 0:
+            raise ValueError("record_size and initial_capacity must be positive")
+        self.path = os.fspath(path)
+        self.index_path = self.path + ".idx"
+        self.durable = durable
+        self._lock = threading.RLock()
+        self._data_file, self._data = self._open(self.path, _DATA_HEADER.size + record_size * initial_capacity)
+        if self._data[:8] == _DATA_MAGIC:
+            _, self.record_size, self._count = _DATA_HEADER.unpack_from(self._data)
+        else:
+            self.record_size, self._count = record_size, 0
+            self._write_data_header()
+        rebuild = not os.path.exists(self.index_path)
+        self._index_file, self._index = self._open(
+            self.index_path, _INDEX_HEADER.size + _SLOT.size * 2 * initial_capacity
+        )
+        if rebuild or self._index[:8] != _INDEX_MAGIC:
+            self._rebuild_index(max(2 * initial_capacity, 4 * self._count))
+        else:
+            _, self._slots, self._used, self._live = _INDEX_HEADER.unpack_from(self._index)
+
+    @staticmethod
+    def _open(path: str, size: int):
+        file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b")
+        if os.fstat(file.fileno()).st_size == 0:
+            file.truncate(size)
+        return file, mmap.mmap(file.fileno(), 0)
+
+    def _write_data_header(self) -> None:
+        _DATA_HEADER.pack_into(self._data, 0, _DATA_MAGIC, self.record_size, self._count)
+
+    def _write_index_header(self) -> None:
+        _INDEX_HEADER.pack_into(self._index, 0, _INDEX_MAGIC, self._slots, self._used, self._live)
+
+    def _record_offset(self, number: int) -> int:
+        return _DATA_HEADER.size + number * self.record_size
+
+    def _read_record(self, number: int) -> tuple[int, bytes, int]:
+        """Returns the flags, the key and the offset of the value of a record."""
+        offset = self._record_offset(number)
+        flags, key_length, _ = _RECORD_HEADER.unpack_from(self._data, offset)
+        offset += _RECORD_HEADER.size
+        return flags, self._data[offset : offset + key_length], offset + key_length
+
+    def _read_value(self, number: int) -> dict:
+        offset = self._record_offset(number)
+        _, key_length, value_length = _RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + _RECORD_HEADER.size + key_length
+        return json.loads(self._data[start : start + value_length])
+
+    def _append_record(self, key: bytes, value: bytes) -> int:
+        if _RECORD_HEADER.size + len(key) + len(value) > self.record_size:
+            raise ValueError(f"Record does not fit in {self.record_size} bytes")
+        number = self._count
+        end = self._record_offset(number + 1)
+        if end > len(self._data):
+            self._data = self._remap(self._data_file, self._data, max(end, 2 * len(self._data)))
+        offset = self._record_offset(number)
+        _RECORD_HEADER.pack_into(self._data, offset, _LIVE, len(key), len(value))
+        offset += _RECORD_HEADER.size
+        self._data[offset : offset + len(key)] = key
+        self._data[offset + len(key) : offset + len(key) + len(value)] = value
+        self._count += 1
+        self._write_data_header()
+        return number
+
+    @staticmethod
+    def _remap(file, mapping: mmap.mmap, size: int) -> mmap.mmap:
+        mapping.flush()
+        mapping.close()
+        file.truncate(size)
+        return mmap.mmap(file.fileno(), 0)
+
+    def _slot(self, position: int) -> tuple[int, int]:
+        return _SLOT.unpack_from(self._index, _INDEX_HEADER.size + position * _SLOT.size)
+
+    def _set_slot(self, position: int, tag: int, number: int) -> None:
+        _SLOT.pack_into(self._index, _INDEX_HEADER.size + position * _SLOT.size, tag, number)
+
+    def _find(self, key: bytes) -> tuple[int | None, int]:
+        """Returns the slot holding the key (or None) and the first reusable slot on its probe path."""
+        tag = _tag(key)
+        position = tag % self._slots
+        free = None
+        while True:
+            slot_tag, number = self._slot(position)
+            if slot_tag == _EMPTY_TAG:
+                return None, position if free is None else free
+            if slot_tag == _TOMBSTONE_TAG:
+                if free is None:
+                    free = position
+            elif slot_tag == tag and self._read_record(number)[1] == key:
+                return position, position
+            position = (position + 1) % self._slots
+
+    def _rebuild_index(self, slots: int) -> None:
+        """Rebuild the index from the live records, e.g. to grow it or after losing the index file."""
+        self._index = self._remap(self._index_file, self._index, _INDEX_HEADER.size + _SLOT.size * slots)
+        self._index[_INDEX_HEADER.size :] = bytes(len(self._index) - _INDEX_HEADER.size)
+        self._slots, self._used, self._live = slots, 0, 0
+        for number in range(self._count):
+            flags, key, _ = self._read_record(number)
+            if flags != _LIVE:
+                continue
+            found, position = self._find(key)
+            if found is not None:
+                # A record superseded by an interrupted overwrite.
+                self._mark_deleted(self._slot(found)[1])
+            else:
+                self._used += 1
+                self._live += 1
+            self._set_slot(position, _tag(key), number)
+        self._write_index_header()
+
+    def _mark_deleted(self, number: int) -> None:
+        self._data[self._record_offset(number)] = _DELETED
+
+    def __len__(self) -> int:
+        return self._live
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            position, _ = self._find(_encode_key(key))
+            if position is None:
+                return None
+            return self._read_value(self._slot(position)[1])
+
+    def set(self, key: str, value: dict) -> None:
+        encoded_key = _encode_key(key)
+        encoded_value = json.dumps(value, separators=(",", ":")).encode()
+        with self._lock:
+            number = self._append_record(encoded_key, encoded_value)
+            found, position = self._find(encoded_key)
+            if found is not None:
+                self._mark_deleted(self._slot(found)[1])
+            else:
+                if self._slot(position)[0] == _EMPTY_TAG:
+                    self._used += 1
+                self._live += 1
+            self._set_slot(position, _tag(encoded_key), number)
+            if 2 * self._used >= self._slots:
+                self._rebuild_index(max(2 * self._slots, 4 * self._live))
+            else:
+                self._write_index_header()
+            if self.durable:
+                self.flush()
+
+    def pop(self, key: str) -> dict | None:
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                self.delete(key)
+            return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            position, _ = self._find(_encode_key(key))
+            if position is None:
+                return
+            self._mark_deleted(self._slot(position)[1])
+            self._set_slot(position, _TOMBSTONE_TAG, 0)
+            self._live -= 1
+            self._write_index_header()
+            if self.durable:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the mapped pages to disk."""
+        with self._lock:
+            self._data.flush()
+            self._index.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._data.close()
+            self._index.close()
+            self._data_file.close()
+            self._index_file.close()
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class _Shard:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.expired = 0
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def purge_expired(self, now: float) -> int:
+        purged = 0
+        while self.data:
+            key, (expires_at, _) = next(iter(self.data.items()))
+            if expires_at > now:
+                break
+            del self.data[key]
+            purged += 1
+        self.expired += purged
+        return purged
+
+
+class TTLNonceRepository:
+    """
+    In-memory nonce repository with per-entry TTL and a hard cap on entries.
+
+    Nonces whose signing round never arrives expire after `ttl` seconds instead of staying
+    forever. Keys are spread over `shards` independently locked shards so concurrent
+    commitment and sign requests do not contend on one lock. When a shard is full the
+    oldest nonce is evicted. Expirations and evictions are counted in `metrics()`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 1_000_000,
+        shards: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl <= 0 or max_entries <= 0 or shards <= 0:
+            raise ValueError("ttl, max_entries and shards must be positive")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        capacity = -(-max_entries // shards)
+        self._shards = tuple(_Shard(capacity) for _ in range(shards))
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: str) -> dict | None:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                shard.misses += 1
+                return None
+            shard.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: dict) -> None:
+        shard = self._shard(key)
+        now = self._clock()
+        with shard.lock:
+            shard.purge_expired(now)
+            shard.data[key] = (now + self.ttl, value)
+            shard.data.move_to_end(key)
+            while len(shard.data) > shard.capacity:
+                shard.data.popitem(last=False)
+                shard.evicted += 1
+
+    def pop(self, key: str) -> dict | None:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.data.pop(key, None)
+            if entry is None:
+                shard.misses += 1
+                return None
+            if entry[0] <= self._clock():
+                shard.expired += 1
+                shard.misses += 1
+                return None
+            shard.hits += 1
+            return entry[1]
+
+    def delete(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.data.pop(key, None)
+
+    def sweep(self) -> int:
+        """Drop every expired nonce. Returns the number of dropped nonces."""
+        now = self._clock()
+        purged = 0
+        for shard in self._shards:
+            with shard.lock:
+                purged += shard.purge_expired(now)
+        return purged
+
+    def __len__(self) -> int:
+        return sum(len(shard.data) for shard in self._shards)
+
+    def metrics(self) -> dict[str, int]:
+        result = {"size": 0, "expired": 0, "evicted": 0, "hits": 0, "misses": 0}
+        for shard in self._shards:
+            with shard.lock:
+                result["size"] += len(shard.data)
+                result["expired"] += shard.expired
+                result["evicted"] += shard.evicted
+                result["hits"] += shard.hits
+                result["misses"] += shard.misses
+        return result
@@ -0,0 +1,232 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from typing import Literal
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class SQLiteRepository[_VALUET]:
+    """
+    RepositoryProtocol backed by a table of a SQLite database in WAL mode.
+
+    The database is a local file that every worker process of a node can open, so a nonce
+    issued by one worker can be consumed by another. Values are stored as JSON. `pop` is a
+    single `DELETE ... RETURNING` statement and therefore atomic across processes. Entries
+    may expire after `ttl` seconds; expired entries are invisible and removed by `sweep`.
+
+    Statements are built once per repository so sqlite3's statement cache reuses them, and
+    the `*_many` methods run in a single transaction.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        table: str,
+        ttl: float | None = None,
+        timeout: float = 30,
+        synchronous: Literal["OFF", "NORMAL", "FULL"] = "NORMAL",
+    ):
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = os.fspath(path)
+        self.table = table
+        self.ttl = ttl
+        self.timeout = timeout
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._prepare()
+        self._connection().executescript(self._schema())
+
+    def _schema(self) -> str:
+        return f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL);"
+
+    def _prepare(self) -> None:
+        table = self.table
+        self._get_sql = f"SELECT value FROM {table} WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)"
+        self._set_sql = (
+            f"INSERT INTO {table} (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"
+        )
+        self._pop_sql = f"DELETE FROM {table} WHERE key = ? RETURNING value, expires_at"
+        self._delete_sql = f"DELETE FROM {table} WHERE key = ?"
+        self._sweep_sql = f"DELETE FROM {table} WHERE expires_at <= ?"
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """Writes take the write lock up front; reads use a deferred transaction for a consistent snapshot."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN DEFERRED")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _expires_at(self) -> float | None:
+        return None if self.ttl is None else time.time() + self.ttl
+
+    def _set_params(self, key: str, value: _VALUET, expires_at: float | None) -> tuple:
+        return (key, json.dumps(value), expires_at)
+
+    def _decode_popped(self, row: tuple | None, now: float) -> _VALUET | None:
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        return json.loads(row[0])
+
+    def get(self, key: str) -> _VALUET | None:
+        row = self._connection().execute(self._get_sql, (key, time.time())).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: _VALUET) -> None:
+        self._connection().execute(self._set_sql, self._set_params(key, value, self._expires_at()))
+
+    def pop(self, key: str) -> _VALUET | None:
+        return self._decode_popped(self._connection().execute(self._pop_sql, (key,)).fetchone(), time.time())
+
+    def delete(self, key: str) -> None:
+        self._connection().execute(self._delete_sql, (key,))
+
+    def get_many(self, keys: Sequence[str]) -> list[_VALUET | None]:
+        now = time.time()
+        with self._transaction(immediate=False) as connection:
+            rows = [connection.execute(self._get_sql, (key, now)).fetchone() for key in keys]
+        return [None if row is None else json.loads(row[0]) for row in rows]
+
+    def set_many(self, items: Mapping[str, _VALUET]) -> None:
+        expires_at = self._expires_at()
+        params = [self._set_params(key, value, expires_at) for key, value in items.items()]
+        with self._transaction() as connection:
+            connection.executemany(self._set_sql, params)
+
+    def pop_many(self, keys: Sequence[str]) -> list[_VALUET | None]:
+        now = time.time()
+        with self._transaction() as connection:
+            rows = [connection.execute(self._pop_sql, (key,)).fetchone() for key in keys]
+        return [self._decode_popped(row, now) for row in rows]
+
+    def sweep(self) -> int:
+        """Delete expired entries. Returns the number of deleted entries."""
+        return self._connection().execute(self._sweep_sql, (time.time(),)).rowcount
+
+    def close(self) -> None:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class SQLiteDKGRepository(SQLiteRepository[dict]):
+    """
+    Durable DKG session store.
+
+    Sessions are stored under `settings.ID + dkg_id.hex` like any DKG repository, with the node
+    id, the DKG id and the last completed round kept in indexed columns. `in_flight` lists the
+    stored sessions of a node so a restarted node can recover them at startup, and
+    `last_updated` their write times, which the session sweepers of all workers expire them by.
+    Writes are fsynced (`synchronous=FULL`) by default so an acknowledged round survives a crash.
+
+    Every write bumps a per-session version. `get_versioned` and `compare_and_set` let a round
+    store its result only if no other worker process changed the session since it was loaded.
+    """
+
+    DKG_ID_LENGTH = 32
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        table: str = "dkg_session",
+        timeout: float = 30,
+        synchronous: Literal["OFF", "NORMAL", "FULL"] = "FULL",
+    ):
+        super().__init__(path, table, timeout=timeout, synchronous=synchronous)
+        connection = self._connection()
+        columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        if "version" not in columns:
+            # Created before sessions were versioned.
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _schema(self) -> str:
+        table = self.table
+        return (
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, node_id TEXT NOT NULL, dkg_id TEXT NOT NULL, round INTEGER NOT NULL, "
+            "value TEXT NOT NULL, expires_at REAL, updated_at REAL NOT NULL, version INTEGER NOT NULL DEFAULT 0);"
+            f"CREATE INDEX IF NOT EXISTS {table}_node_updated_at ON {table} (node_id, updated_at);"
+            f"CREATE INDEX IF NOT EXISTS {table}_updated_at ON {table} (updated_at);"
+        )
+
+    def _prepare(self) -> None:
+        super()._prepare()
+        table = self.table
+        insert_sql = (
+            f"INSERT INTO {table} (key, node_id, dkg_id, round, value, expires_at, updated_at, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 1) "
+        )
+        self._set_sql = insert_sql + (
+            "ON CONFLICT (key) DO UPDATE SET round = excluded.round, value = excluded.value, "
+            "expires_at = excluded.expires_at, updated_at = excluded.updated_at, version = version + 1"
+        )
+        self._insert_new_sql = insert_sql + "ON CONFLICT (key) DO NOTHING"
+        self._update_version_sql = (
+            f"UPDATE {table} SET round = ?, value = ?, expires_at = ?, updated_at = ?, version = version + 1 "
+            "WHERE key = ? AND version = ?"
+        )
+        self._get_versioned_sql = f"SELECT value, version FROM {table} WHERE key = ?"
+        self._in_flight_sql = f"SELECT dkg_id FROM {table} WHERE node_id = ? ORDER BY updated_at"
+        self._last_updated_sql = f"SELECT dkg_id, updated_at FROM {table} WHERE node_id = ?"
+
+    @staticmethod
+    def completed_round(value: dict) -> int:
+        if value.get("round2_result") is not None:
+            return 2
+        if value.get("round1_result") is not None:
+            return 1
+        return 0
+
+    def _set_params(self, key: str, value: dict, expires_at: float | None) -> tuple:
+        node_id, dkg_id = key[: -self.DKG_ID_LENGTH], key[-self.DKG_ID_LENGTH :]
+        return (key, node_id, dkg_id, self.completed_round(value), json.dumps(value), expires_at, time.time())
+
+    def get_versioned(self, key: str) -> tuple[dict, int] | None:
+        """The session and its version, which `compare_and_set` expects back."""
+        row = self._connection().execute(self._get_versioned_sql, (key,)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def compare_and_set(self, key: str, value: dict, version: int) -> bool:
+        """
+        Store the session only if its version is still `version`, 0 meaning it must not exist yet.
+        Returns whether it was stored; the stored version is then `version + 1`.
+        """
+        params = self._set_params(key, value, None)
+        if version == 0:
+            cursor = self._connection().execute(self._insert_new_sql, params)
+        else:
+            _, _, _, round, data, expires_at, updated_at = params
+            cursor = self._connection().execute(
+                self._update_version_sql, (round, data, expires_at, updated_at, key, version)
+            )
+        return cursor.rowcount == 1
+
+    def in_flight(self, node_id: str) -> list[str]:
+        """DKG ids (hex) of the sessions stored for the node, oldest first."""
+        return [row[0] for row in self._connection().execute(self._in_flight_sql, (node_id,)).fetchall()]
+
+    def last_updated(self, node_id: str) -> dict[str, float]:
+        """Wall-clock time of the last write of each session stored for the node, by DKG id (hex)."""
+        return dict(self._connection().execute(self._last_updated_sql, (node_id,)).fetchall())
@@ -0,0 +1,126 @@
+import logging
+import threading
+
+from zexfrost.repository import RepositoryProtocol
+
+logger = logging.getLogger(__name__)
+
+_DELETED = object()
+
+
+class WriteBehindRepository[_VALUET]:
+    """
+    Repository wrapper that acknowledges writes from memory and persists them in the background.
+
+    With `durable=True` (the default) every write reaches the wrapped repository before
+    `set`/`delete`/`pop` return. With `durable=False` writes to the same key are coalesced until
+    a background thread flushes them to the wrapped repository every `flush_interval` seconds;
+    reads see the pending values. Once `max_pending` keys are waiting the writer flushes itself.
+    A failed flush is logged and retried. A crash loses the pending writes, so the non-durable
+    mode is only for state that can be recomputed, such as DKG sessions, and must not wrap the
+    key or nonce repository.
+    """
+
+    def __init__(
+        self,
+        repository: RepositoryProtocol[_VALUET],
+        durable: bool = True,
+        flush_interval: float = 0.05,
+        max_pending: int = 10_000,
+    ):
+        if flush_interval <= 0 or max_pending <= 0:
+            raise ValueError("flush_interval and max_pending must be positive")
+        self.repository = repository
+        self.durable = durable
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[str, object] = {}
+        self._writing: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        if not durable:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed")
+
+    def _write(self, key: str, value: object) -> None:
+        if value is _DELETED:
+            self.repository.delete(key)
+        else:
+            self.repository.set(key, value)  # type: ignore[arg-type]
+
+    def _enqueue(self, key: str, value: object) -> None:
+        if self.durable:
+            with self._flush_lock:
+                with self._lock:
+                    self._pending.pop(key, None)
+                self._write(key, value)
+            return
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every pending change to the wrapped repository."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+            try:
+                for key, value in batch.items():
+                    self._write(key, value)
+            except BaseException:
+                with self._lock:
+                    self._pending = {**batch, **self._pending}
+                raise
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def get(self, key: str) -> _VALUET | None:
+        with self._lock:
+            value = self._pending.get(key, self._writing.get(key))
+        if value is None:
+            return self.repository.get(key)
+        return None if value is _DELETED else value  # type: ignore[return-value]
+
+    def set(self, key: str, value: _VALUET) -> None:
+        self._enqueue(key, value)
+
+    def pop(self, key: str) -> _VALUET | None:
+        """Atomic among the users of the wrapper: concurrent pops of a key return its value once."""
+        if self.durable:
+            with self._flush_lock:
+                return self.repository.pop(key)
+        with self._lock:
+            value = self._pending.get(key, self._writing.get(key))
+            if value is None:
+                value = self.repository.get(key)
+            if value is None or value is _DELETED:
+                return None
+            self._pending[key] = _DELETED
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+        return value  # type: ignore[return-value]
+
+    def delete(self, key: str) -> None:
+        self._enqueue(key, _DELETED)
+
+    def close(self) -> None:
+        """Stop the background thread and flush the remaining changes."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
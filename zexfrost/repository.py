@@ -1,4 +1,7 @@
-from typing import Protocol
+import asyncio
+import inspect
+from collections.abc import Mapping, Sequence
+from typing import Any, Protocol, TypeGuard
 
 
 class RepositoryProtocol[_VALUET](Protocol):
@@ -20,3 +23,91 @@ class RepositoryProtocol[_VALUET](Protocol):
     def delete(self, key: str) -> None:
         """Delete the value for the key"""
         ...
+
+
+class AsyncRepositoryProtocol[_VALUET](Protocol):
+    async def get(self, key: str) -> _VALUET | None:
+        """Get value for the key"""
+        ...
+
+    async def set(self, key: str, value: _VALUET) -> None:
+        """Set value for the key"""
+        ...
+
+    async def pop(self, key: str) -> _VALUET | None:
+        """Get and delete the value for the key"""
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Delete the value for the key"""
+        ...
+
+    async def get_many(self, keys: Sequence[str]) -> list[_VALUET | None]:
+        """Get values for the keys, in order"""
+        ...
+
+    async def set_many(self, items: Mapping[str, _VALUET]) -> None:
+        """Set all the values in one round trip"""
+        ...
+
+    async def pop_many(self, keys: Sequence[str]) -> list[_VALUET | None]:
+        """Get and delete values for the keys, in order"""
+        ...
+
+
+def is_async_repository(repository: Any) -> TypeGuard[AsyncRepositoryProtocol]:
+    return inspect.iscoroutinefunction(getattr(repository, "get", None))
+
+
+class MemoryRepository[_VALUET]:
+    """Dict backed repository."""
+
+    def __init__(self, data: dict[str, _VALUET] | None = None):
+        self.data: dict[str, _VALUET] = {} if data is None else data
+
+    def get(self, key: str) -> _VALUET | None:
+        return self.data.get(key)
+
+    def set(self, key: str, value: _VALUET) -> None:
+        self.data[key] = value
+
+    def pop(self, key: str) -> _VALUET | None:
+        return self.data.pop(key, None)
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+class AsyncRepositoryAdapter[_VALUET]:
+    """
+    AsyncRepositoryProtocol over a sync repository.
+    Every call runs in a worker thread, and a bulk call costs a single thread hop.
+    """
+
+    def __init__(self, repository: RepositoryProtocol[_VALUET]):
+        self.repository = repository
+
+    async def get(self, key: str) -> _VALUET | None:
+        return await asyncio.to_thread(self.repository.get, key)
+
+    async def set(self, key: str, value: _VALUET) -> None:
+        await asyncio.to_thread(self.repository.set, key, value)
+
+    async def pop(self, key: str) -> _VALUET | None:
+        return await asyncio.to_thread(self.repository.pop, key)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.repository.delete, key)
+
+    async def get_many(self, keys: Sequence[str]) -> list[_VALUET | None]:
+        return await asyncio.to_thread(lambda: [self.repository.get(key) for key in keys])
+
+    async def set_many(self, items: Mapping[str, _VALUET]) -> None:
+        def _set_many() -> None:
+            for key, value in items.items():
+                self.repository.set(key, value)
+
+        await asyncio.to_thread(_set_many)
+
+    async def pop_many(self, keys: Sequence[str]) -> list[_VALUET | None]:
+        return await asyncio.to_thread(lambda: [self.repository.pop(key) for key in keys])
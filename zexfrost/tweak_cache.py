@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from zexfrost.custom_types import BaseCryptoCurve, PrivateKeyPackage, PublicKeyPackage, TweakBy
+
+
+class TweakCache[_PACKAGET]:
+    """
+    Bounded LRU cache of tweaked key packages.
+
+    `hits` and `misses` are kept so the cache can be sized from the hit ratio.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, _PACKAGET] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], _PACKAGET]) -> _PACKAGET:
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+key_package_tweak_cache: TweakCache[PrivateKeyPackage] = TweakCache()
+pubkey_package_tweak_cache: TweakCache[PublicKeyPackage] = TweakCache()
+
+
+def tweak_key_package(
+    curve: BaseCryptoCurve, key_package: PrivateKeyPackage, tweak_by: TweakBy | None
+) -> PrivateKeyPackage:
+    """`curve.key_package_tweak` memoized by (curve, verifying key, signer identifier, tweak_by)."""
+    return key_package_tweak_cache.get_or_compute(
+        (curve.name, key_package.verifying_key, key_package.identifier, tweak_by),
+        lambda: curve.key_package_tweak(key_package, tweak_by),
+    )
+
+
+def tweak_pubkey_package(
+    curve: BaseCryptoCurve, pubkey_package: PublicKeyPackage, tweak_by: TweakBy | None = None
+) -> PublicKeyPackage:
+    """`curve.pubkey_package_tweak` memoized by (curve, verifying key, tweak_by)."""
+    return pubkey_package_tweak_cache.get_or_compute(
+        (curve.name, pubkey_package.verifying_key, tweak_by),
+        lambda: curve.pubkey_package_tweak(pubkey_package, tweak_by),
+    )
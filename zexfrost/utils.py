@@ -1,17 +1,32 @@
 import base64
+import hashlib
 import json
+import os
 import random
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
 
 import frost_lib
 from cryptography.fernet import Fernet
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from fastecdsa.curve import secp256k1 as fastecdsa_secp256k1
 from fastecdsa.encoding.sec1 import SEC1Encoder
 from fastecdsa.point import Point
 
-from zexfrost.custom_types import BaseCryptoCurve, CurveName, HexStr, Node
+from zexfrost.canonical import canonical_bytes
+from zexfrost.custom_types import (
+    BaseCryptoCurve,
+    CurveName,
+    DKGRound1NodeResponse,
+    EncryptionVersion,
+    HexStr,
+    Node,
+    NodeID,
+)
 
 
 def get_curve(curve: CurveName | BaseCryptoCurve) -> BaseCryptoCurve:
@@ -36,7 +51,7 @@ def code_to_pub(key: HexStr) -> Point:
 
 
 def dict_to_bytes(data: dict) -> bytes:
-    return json.dumps(data, sort_keys=True).encode("utf-8")
+    return canonical_bytes(data)
 
 
 def single_sign_data(curve: BaseCryptoCurve | CurveName, private_key: HexStr, data: bytes | dict) -> HexStr:
@@ -63,7 +78,7 @@ def single_verify_data(
     """
     match data:
         case dict():
-            data = json.dumps(data, sort_keys=True).encode("utf-8")
+            data = dict_to_bytes(data)
         case bytes():
             ...
         case _:
@@ -72,6 +87,46 @@ def single_verify_data(
     return result
 
 
+# (curve, public key, data, signature)
+type VerifyItem = tuple[BaseCryptoCurve | CurveName, HexStr, bytes | dict, HexStr]
+
+_BATCH_VERIFY_INLINE = 4
+_verify_executor: ThreadPoolExecutor | None = None
+_verify_executor_lock = threading.Lock()
+
+
+def _verify_bytes(curve: CurveName, public_key: HexStr, data: bytes, signature: HexStr) -> bool:
+    return get_curve(curve).single_verify(signature, data, public_key)
+
+
+def batch_verify_data(items: Iterable[VerifyItem], executor: Executor | None = None) -> list[bool]:
+    """
+    Verify many signatures at once. Returns one result per item, in order, so the bad signers
+    can be reported. Dict data is canonicalized up front and the checks run in parallel on
+    `executor` (a process pool works too), or on a shared thread pool by default.
+    """
+    global _verify_executor
+    args_list = [
+        (get_curve(curve).name, public_key, dict_to_bytes(data) if isinstance(data, dict) else data, signature)
+        for curve, public_key, data, signature in items
+    ]
+    if executor is None:
+        if len(args_list) <= _BATCH_VERIFY_INLINE:
+            return [_verify_bytes(*args) for args in args_list]
+        with _verify_executor_lock:
+            if _verify_executor is None:
+                _verify_executor = ThreadPoolExecutor(thread_name_prefix="verify")
+        executor = _verify_executor
+    return list(executor.map(_verify_bytes, *zip(*args_list, strict=True))) if args_list else []
+
+
+def broadcast_digest(broadcast_data: dict[NodeID, DKGRound1NodeResponse]) -> HexStr:
+    """SHA-256 of the canonical encoding of a round-1 broadcast."""
+    return hashlib.sha256(
+        canonical_bytes({node_id: response.model_dump(mode="json") for node_id, response in broadcast_data.items()})
+    ).hexdigest()
+
+
 def generate_hkdf_key(key: HexStr) -> bytes:
     hkdf = HKDF(
         algorithm=hashes.SHA256(),
@@ -83,15 +138,50 @@ def generate_hkdf_key(key: HexStr) -> bytes:
     return hkdf.derive(bytes.fromhex(key))
 
 
-def encrypt(data: str | dict, key: bytes) -> str:
+ENCRYPTION_VERSIONS: tuple[EncryptionVersion, ...] = ("v2", "v1")
+"""Supported encryption envelopes, preferred first."""
+
+_AEAD_NONCE_SIZE = 12
+
+
+def _aead(key: bytes) -> ChaCha20Poly1305:
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=b"",
+        info=b"zexfrost-aead-v2",
+        backend=default_backend(),
+    )
+    return ChaCha20Poly1305(hkdf.derive(key))
+
+
+def negotiate_encryption_version(versions: Iterable[str]) -> EncryptionVersion:
+    """The preferred envelope version supported by both sides."""
+    return next((version for version in ENCRYPTION_VERSIONS if version in versions), "v1")
+
+
+def encrypt(data: str | dict, key: bytes, version: EncryptionVersion = "v1") -> str:
+    """
+    Encrypt with a symmetric key. "v1" is a Fernet token; "v2" is "v2:" followed by the
+    base64 of a random nonce and the ChaCha20-Poly1305 ciphertext.
+    """
     if not isinstance(data, str):
         data = json.dumps(data)
+    if version == "v2":
+        nonce = os.urandom(_AEAD_NONCE_SIZE)
+        ciphertext = _aead(key).encrypt(nonce, data.encode(), None)
+        return "v2:" + base64.b64encode(nonce + ciphertext).decode()
     key = base64.b64encode(key)
     fernet = Fernet(key)
     return fernet.encrypt(data.encode()).decode(encoding="utf-8")
 
 
 def decrypt(data: str, key: bytes) -> str:
+    """Decrypt data produced by `encrypt`, of any supported version."""
+    if data.startswith("v2:"):
+        payload = base64.b64decode(data[3:])
+        nonce, ciphertext = payload[:_AEAD_NONCE_SIZE], payload[_AEAD_NONCE_SIZE:]
+        return _aead(key).decrypt(nonce, ciphertext, None).decode()
     encoded_data = data.encode("utf-8")
     key = base64.b64encode(key)
     fernet = Fernet(key)
@@ -102,16 +192,19 @@ def hexstr_to_int(hexstr: HexStr) -> int:
     return int(hexstr, 16)
 
 
-def encrypt_with_joint_key(data: str, secret: HexStr, receiver_pubkey: HexStr) -> str:
-    encryption_joint_key = pub_to_code(int(secret, 16) * code_to_pub(receiver_pubkey))
-    encryption_key = generate_hkdf_key(encryption_joint_key)
-    return encrypt(data, encryption_key)
+def derive_joint_key(secret: HexStr, public_key: HexStr) -> bytes:
+    """ECDH shared point of `secret` and `public_key`, stretched with HKDF into a symmetric key."""
+    return generate_hkdf_key(pub_to_code(int(secret, 16) * code_to_pub(public_key)))
+
+
+def encrypt_with_joint_key(
+    data: str, secret: HexStr, receiver_pubkey: HexStr, version: EncryptionVersion = "v1"
+) -> str:
+    return encrypt(data, derive_joint_key(secret, receiver_pubkey), version)
 
 
 def decrypt_with_joint_key(data: str, secret: HexStr, sender_pubkey: HexStr) -> str:
-    encryption_joint_key = pub_to_code(int(secret, 16) * code_to_pub(sender_pubkey))
-    encryption_key = generate_hkdf_key(encryption_joint_key)
-    return decrypt(data, encryption_key)
+    return decrypt(data, derive_joint_key(secret, sender_pubkey))
 
 
 def get_random_party(party: tuple[Node, ...], size: int) -> tuple[Node, ...]: